@@ -0,0 +1,52 @@
+"""Benchmark replay sampling cost as buffer capacity grows"""
+
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.agent.buffer import G2048ReplayBuffer, PrioritizedReplayBuffer
+
+CAPACITIES = [10_000, 100_000, 1_000_000, 4_000_000]
+BATCH_SIZE = 64
+ROUNDS = 500
+
+
+def fill(buffer, chunk: int = 100_000):
+    """Fill a buffer to capacity with random transitions"""
+    rng = np.random.default_rng(0)
+    remaining = buffer.capacity
+    while remaining:
+        n = min(chunk, remaining)
+        boards = rng.integers(0, 12, size=(n, 4, 4)).astype(np.uint8)
+        buffer.add_batch(boards, rng.integers(0, 4, n), rng.random(n), boards,
+                         np.zeros(n, dtype=bool), np.full(n, 15))
+        remaining -= n
+
+
+def time_sampling(buffer) -> float:
+    """Mean microseconds per sampled transition, including priority updates"""
+    rng = np.random.default_rng(1)
+    start = time.perf_counter()
+    for _ in range(ROUNDS):
+        _, _, indices = buffer.sample_with_weights(BATCH_SIZE)
+        buffer.update_priorities(indices, rng.random(BATCH_SIZE))
+    return (time.perf_counter() - start) / (ROUNDS * BATCH_SIZE) * 1e6
+
+
+def main():
+    print(f"{'capacity':>10} {'uniform us/sample':>18} {'prioritized us/sample':>22}")
+    for capacity in CAPACITIES:
+        results = []
+        for cls in (G2048ReplayBuffer, PrioritizedReplayBuffer):
+            buffer = cls(capacity, seed=0)
+            fill(buffer)
+            results.append(time_sampling(buffer))
+        print(f"{capacity:>10} {results[0]:>18.3f} {results[1]:>22.3f}")
+
+
+if __name__ == "__main__":
+    main()
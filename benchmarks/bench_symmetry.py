@@ -0,0 +1,45 @@
+"""Benchmark board canonicalizations per second (packed and batched)"""
+
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.game.symmetry import canonical_key, canonicalize, canonicalize_batch
+
+SINGLE_BOARDS = 100_000
+BATCH_SIZES = [64, 1024, 16384]
+ROUNDS = 20
+
+
+def random_boards(n: int):
+    """n random exponent boards and their packed forms"""
+    rng = np.random.default_rng(0)
+    exponents = rng.integers(0, 12, size=(n, 16)).astype(np.uint8)
+    packed = (exponents.astype(np.uint64) << np.arange(0, 64, 4, dtype=np.uint64)).sum(axis=1, dtype=np.uint64)
+    return exponents, [int(b) for b in packed]
+
+
+def main():
+    _, packed = random_boards(SINGLE_BOARDS)
+    for name, function in (("canonical_key", canonical_key), ("canonicalize", canonicalize)):
+        start = time.perf_counter()
+        for board in packed:
+            function(board)
+        elapsed = time.perf_counter() - start
+        print(f"{name:>20}: {SINGLE_BOARDS / elapsed:>12,.0f} boards/s")
+
+    for batch_size in BATCH_SIZES:
+        exponents, _ = random_boards(batch_size)
+        start = time.perf_counter()
+        for _ in range(ROUNDS):
+            canonicalize_batch(exponents)
+        elapsed = time.perf_counter() - start
+        print(f"{'batch ' + str(batch_size):>20}: {ROUNDS * batch_size / elapsed:>12,.0f} boards/s")
+
+
+if __name__ == "__main__":
+    main()
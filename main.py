@@ -2,11 +2,23 @@
 
 import customtkinter as ctk
 from src.agent.agent import G2048Agent
+from src.agent.expectimax import ExpectimaxAgent
+from src.agent.ntuple import NTupleAgent
 from src.ui.gui import GameGUI
+from src.utils.helpers import load_config
 from src.utils.logger import get_logger
 
 logger = get_logger(__name__)
 
+def create_agent():
+    """Create the automated player selected by play.agent in the config"""
+    play_config = (load_config() or {}).get('play', {})
+    if play_config.get('agent', 'dqn') == 'expectimax':
+        return ExpectimaxAgent()
+    if play_config.get('agent', 'dqn') == 'ntuple':
+        return NTupleAgent()
+    return G2048Agent(is_training=False)
+
 def main():
     """Start the 2048 game"""
     logger.info("Initializing 2048 Game")
@@ -18,7 +30,7 @@ def main():
     root = ctk.CTk()
     
     # Create and run GUI
-    gui = GameGUI(root, G2048Agent(is_training=False))
+    gui = GameGUI(root, create_agent())
     gui.run()
 
 if __name__ == "__main__":
@@ -1,8 +1,14 @@
+import os
 import random
+import numpy as np
 from src.agent.ai import Q2048
-from src.agent.buffer import G2048ReplayBuffer
+from src.agent.buffer import G2048ReplayBuffer, MemmapReplayBuffer, PrioritizedReplayBuffer
+from src.agent.checkpoint import (CHECKPOINT_VERSION, CheckpointWriter, atomic_save, capture_rng_state,
+                                  load_checkpoint, restore_rng_state, snapshot)
+from src.game.batch import BatchGameManager
 from src.game.game import GameManager
-from src.utils.helpers import convert_action_to_numeric, load_config, plot_loss_curve
+from src.utils.constants import DIRECTIONS
+from src.utils.helpers import load_config, mask_to_list, plot_loss_curve
 
 config = load_config()
 
@@ -15,10 +21,10 @@ training_config = config['training']
 class G2048Agent:
     """Agent for playing 2048 game automatically"""
     
-    def __init__(self, game_manager: GameManager = None, is_training: bool = True):
+    def __init__(self, game_manager: GameManager = None, is_training: bool = True, device: str = None):
         
-        # Determine device
-        config_device = training_config.get('device', 'auto')
+        # Determine device (an explicit device overrides the config)
+        config_device = device or training_config.get('device', 'auto')
         if config_device == 'auto':
             if torch.cuda.is_available():
                 self.device = torch.device("cuda")
@@ -32,10 +38,11 @@ class G2048Agent:
         print(f"Using device: {self.device}")
 
         # Reference to the game manager
-        self.game_manager = game_manager if game_manager else GameManager()
+        self.game_manager = game_manager if game_manager else GameManager(seed=training_config.get('seed'))
+        self.board_size = self.game_manager.board.size
         
         # Initialize the AI model and move to device
-        self.ai_model = Q2048().to(self.device)
+        self.ai_model = Q2048(board_size=self.board_size).to(self.device)
         
         if not is_training:
             self.epsilon = training_config.get('epsilon_end', 0.05)   # No exploration during evaluation
@@ -46,78 +53,106 @@ class G2048Agent:
             # Epsilon for exploration-exploitation trade-off
             self.epsilon = training_config.get('epsilon_start', 1.0)
         
-    def select_move(self, game_manager: GameManager) -> str:
-        actions = ['up', 'down', 'left', 'right']
+    def select_move(self, game_manager: GameManager, valid_mask: int = None) -> str:
+        """
+        Select a move for the current board (epsilon-greedy).
+        
+        Args:
+            game_manager: Game to play
+            valid_mask: Legal-move bitmask from the last step(), computed if omitted
+            
+        Returns:
+            The chosen direction
+        """
+        if valid_mask is None:
+            valid_mask = game_manager.get_valid_mask()
+        valid_moves = mask_to_list(valid_mask)
+        
         if random.random() < self.epsilon: 
-            action = random.choice(actions)
-            # Verify action is valid
-            valid_moves = game_manager.get_valid_moves()
-            while not valid_moves[actions.index(action)]:
-                action = random.choice(actions)
-            return action
+            # Random choice among the valid moves
+            choices = [action for action, valid in zip(DIRECTIONS, valid_moves) if valid]
+            return random.choice(choices or DIRECTIONS)
         else :
             with torch.no_grad():
                 board_tensor = torch.tensor(game_manager.get_board(), dtype=torch.float32, device=self.device)
                 board_tensor = board_tensor.unsqueeze(0).unsqueeze(0)  # Add batch and channel dimensions
                 
-                # Get valid moves
-                valid_moves = game_manager.get_valid_moves()
-                
                 # Get Q-values from the model
                 q_values = self.ai_model(board_tensor)
                 
                 # Mask invalid moves
-                for i in range(len(actions)):
+                for i in range(len(DIRECTIONS)):
                     if not valid_moves[i]:
                         q_values[0][i] = -1000.0
                 
                 # Select the action with the highest Q-value
                 _, predicted_action = torch.max(q_values, dim=1)
                 
-                return actions[predicted_action.item()]
+                return DIRECTIONS[predicted_action.item()]
         
-    def train_model(self):
-
+    def select_moves(self, boards: np.ndarray, valid_moves: np.ndarray) -> np.ndarray:
+        """
+        Select one action per board with a single batched forward pass.
+        
+        Args:
+            boards: (N, size, size) tile values
+            valid_moves: (N, 4) legal-action mask in DIRECTIONS order
+            
+        Returns:
+            (N,) action indices in DIRECTIONS order
+        """
+        valid_moves = np.asarray(valid_moves, dtype=bool)
+        with torch.no_grad():
+            board_tensor = torch.as_tensor(boards, dtype=torch.float32, device=self.device).unsqueeze(1)
+            q_values = self.ai_model(board_tensor)
+            q_values = q_values.masked_fill(~torch.as_tensor(valid_moves, device=self.device), -1000.0)
+            actions = q_values.argmax(dim=1).cpu().numpy()
+        
+        # Epsilon-greedy: uniform choice among the valid moves of exploring boards
+        explore = np.random.random(len(actions)) < self.epsilon
+        if explore.any():
+            random_actions = np.argmax(np.random.random(valid_moves.shape) * valid_moves, axis=1)
+            actions = np.where(explore, random_actions, actions)
+        return actions
+        
+    def train_model(self, resume: bool = False):
+        """
+        Train the model with the serial DQN loop.
+        
+        Args:
+            resume: Continue from training.checkpoint_path when it exists
+        """
         # Target network and move to device
-        target_net = Q2048().to(self.device)
+        target_net = Q2048(board_size=self.board_size).to(self.device)
         
         # Copy weights from policy to target network
         target_net.load_state_dict(self.ai_model.state_dict())
 
-        # Warm-up steps
-        self.game_manager.restart()
-        
-        # Get initial state
-        state = self.game_manager.get_board()
-        
-        # 
-        replay_buffer_size = training_config.get('replay_buffer_size', 10000)
-        
         # Min batch size before training starts
         b_min = training_config.get('b_min', 1000)
         
         # Replay buffer
-        replay_buffer = G2048ReplayBuffer(capacity=replay_buffer_size)
+        replay_buffer = self.create_replay_buffer()
         
         # Optimizer
         optimizer = torch.optim.Adam(self.ai_model.parameters(), lr=training_config.get('learning_rate', 0.001))
         
-        while len(replay_buffer) < b_min:
-            # Select action
-            action = self.select_move(self.game_manager)
-            
-            # Take action
-            next_state, reward,  done = self.game_manager.step(action)
-            
-            # Get valid moves for next state
-            next_valid_moves = self.game_manager.get_valid_moves()
-            
-            # Store transition in replay buffer
-            replay_buffer.add(state, action, reward, next_state, done, next_valid_moves)
-            state = next_state
-            if done:
-                self.game_manager.restart()
-                state = self.game_manager.get_board()
+        # Progress counters, restored when resuming
+        start_episode = 0
+        step_count = 0
+        losses = []
+        
+        checkpoint_path = training_config.get('checkpoint_path', 'models/g2048_checkpoint.pt')
+        if resume and os.path.exists(checkpoint_path):
+            start_episode, step_count, losses = self.restore_checkpoint(
+                checkpoint_path, target_net, optimizer, replay_buffer)
+            print(f"Resumed from {checkpoint_path} at episode {start_episode}, "
+                  f"step {step_count}, {len(replay_buffer)} buffered transitions")
+        
+        # Warm-up collection runs many games at once with batched inference
+        # (skipped when a restored buffer already holds b_min transitions)
+        if len(replay_buffer) < b_min:
+            self.warm_up(replay_buffer, b_min)
                 
         # Training loop would go here
         episodes = training_config.get('episodes', 1000)
@@ -129,14 +164,11 @@ class G2048Agent:
         # Frequency training occurs
         train_freq = training_config.get('train_freq', 100)
         
-        # Losses
-        losses = []
-        
-        # 
-        step_count = 0
+        # Checkpoints are written by a background thread
+        checkpoint_writer = CheckpointWriter()
         
         # loops
-        for episode in range(episodes):
+        for episode in range(start_episode, episodes):
             
             if (episode + 1) % 10 == 0:
                 print(f"Starting episode {episode + 1}/{episodes}, Epsilon: {self.epsilon:.4f}")
@@ -146,38 +178,27 @@ class G2048Agent:
             
             # Get initial state
             state = self.game_manager.get_board()
+            valid_mask = self.game_manager.get_valid_mask()
             
             # Initialize done flag
             done = False
             
             while not done:
                 # Select action
-                action = self.select_move(self.game_manager)
-                
-                # Take action
-                next_state, reward,  done = self.game_manager.step(action)
+                action = self.select_move(self.game_manager, valid_mask)
                 
-                # Get valid moves for next state
-                next_valid_moves = self.game_manager.get_valid_moves()
+                # Take action (returns the legal-move mask of the next state)
+                next_state, reward,  done, next_valid_mask = self.game_manager.step(action)
                 
                 # Store transition in replay buffer
-                replay_buffer.add(state, action, reward, next_state, done, next_valid_moves)
+                replay_buffer.add(state, action, reward, next_state, done, next_valid_mask)
                 
                 state = next_state
+                valid_mask = next_valid_mask
                 
                 # Training
                 if len(replay_buffer) > b_min and step_count % train_freq == 0:
-                    batch = replay_buffer.sample(training_config.get('batch_size', 64))
-                    
-                    # Loss calculation and backpropagation would go here
-                    loss = self.compute_loss(batch, target_net)
-                    
-                    optimizer.zero_grad()
-                    loss.backward()
-                    torch.nn.utils.clip_grad_norm_(self.ai_model.parameters(), max_norm=1.0)
-                    optimizer.step()
-                    # print(f"Episode {episode + 1}, Step {step_count}, Loss: {loss.item():.4f}")
-                    losses.append(loss.item())
+                    losses.append(self.train_step(replay_buffer, target_net, optimizer))
                 
                 # Update target network periodically
                 if step_count > 0 and step_count % target_update_freq == 0:
@@ -193,69 +214,190 @@ class G2048Agent:
                 )
 
             if episode % training_config.get('checkpoint_freq', 10) == 0:
-                self.save_model(training_config.get('model_save_path', 'g2048_model.pth'))
+                self.save_checkpoint(checkpoint_writer, checkpoint_path, episode + 1, step_count,
+                                     losses, target_net, optimizer, replay_buffer)
+
+        self.save_checkpoint(checkpoint_writer, checkpoint_path, episodes, step_count,
+                             losses, target_net, optimizer, replay_buffer)
 
-        self.save_model(training_config.get('model_save_path', 'g2048_model.pth'))
+        # Flush pending checkpoint writes before returning
+        checkpoint_writer.close()
+        print(f"Checkpoint saved to {checkpoint_path}")
         plot_loss_curve(losses)
-                
-    def compute_loss(self, batch, target_net: Q2048) -> torch.Tensor:
-        """Compute the loss for a batch of transitions"""
+    
+    def warm_up(self, replay_buffer: G2048ReplayBuffer, b_min: int):
+        """Fill the replay buffer to b_min transitions with batched self-play"""
+        envs = BatchGameManager(training_config.get('num_envs', 64), seed=training_config.get('seed'),
+                                size=self.board_size)
+        boards = envs.get_boards()
+        valid_moves = envs.get_valid_moves()
+        while len(replay_buffer) < b_min:
+            actions = self.select_moves(boards, valid_moves)
+            next_boards, rewards, dones, next_valid_moves = envs.step(actions)
+            next_valid_masks = next_valid_moves @ (1 << np.arange(4))
+            replay_buffer.add_batch(boards, actions, rewards, next_boards, dones, next_valid_masks)
+            boards = envs.get_boards()
+            valid_moves = envs.get_valid_moves()
+    
+    def save_checkpoint(self, writer: CheckpointWriter, checkpoint_path: str, episode: int, step_count: int,
+                        losses: list, target_net: Q2048, optimizer, replay_buffer: G2048ReplayBuffer):
+        """
+        Snapshot the full training state and hand it to the background writer.
+        
+        The policy weights are also written to training.model_save_path so
+        that the GUI keeps loading the latest model.
+        
+        Args:
+            writer: Background checkpoint writer
+            checkpoint_path: Destination of the full checkpoint
+            episode: Next episode to run when resuming
+            step_count: Environment steps taken so far
+            losses: Loss history
+            target_net: Target network
+            optimizer: Optimizer of the policy network
+            replay_buffer: Replay buffer, saved with its contents
+        """
+        model_state = snapshot(self.ai_model.state_dict())
+        checkpoint = {
+            "version": CHECKPOINT_VERSION,
+            "episode": episode,
+            "step_count": step_count,
+            "epsilon": self.epsilon,
+            "best_score": self.game_manager.get_best_score(),
+            "model": model_state,
+            "target_model": snapshot(target_net.state_dict()),
+            "optimizer": snapshot(optimizer.state_dict()),
+            "replay_buffer": replay_buffer.state_dict(),
+            "rng": capture_rng_state(),
+            "game_rng": self.game_manager.board.rng.bit_generator.state,
+            "losses": list(losses),
+        }
+        writer.save({
+            checkpoint_path: checkpoint,
+            training_config.get('model_save_path', 'models/g2048_model.pth'): model_state,
+        })
+    
+    def restore_checkpoint(self, checkpoint_path: str, target_net: Q2048, optimizer,
+                           replay_buffer: G2048ReplayBuffer) -> tuple:
+        """
+        Restore the training state written by ``save_checkpoint``.
+        
+        Returns:
+            (episode to start from, step count, loss history)
+        """
+        checkpoint = load_checkpoint(checkpoint_path, map_location=self.device)
+        self.ai_model.load_state_dict(checkpoint["model"])
+        target_net.load_state_dict(checkpoint["target_model"])
+        optimizer.load_state_dict(checkpoint["optimizer"])
+        replay_buffer.load_state_dict(checkpoint["replay_buffer"])
+        restore_rng_state(checkpoint["rng"])
+        if "game_rng" in checkpoint:
+            self.game_manager.board.rng.bit_generator.state = checkpoint["game_rng"]
+        self.epsilon = checkpoint["epsilon"]
+        self.game_manager.best_score = checkpoint["best_score"]
+        return checkpoint["episode"], checkpoint["step_count"], checkpoint["losses"]
+        
+    def create_replay_buffer(self) -> G2048ReplayBuffer:
+        """Create the replay buffer selected in the config (in memory, memory-mapped or prioritized)"""
+        replay_buffer_size = training_config.get('replay_buffer_size', 10000)
+        augment = training_config.get('symmetry_augmentation', False)
+        if training_config.get('replay_storage', 'memory') == 'mmap':
+            if training_config.get('prioritized_replay', False):
+                print("prioritized_replay is not supported with the mmap store; sampling uniformly")
+            return MemmapReplayBuffer(
+                capacity=replay_buffer_size,
+                directory=config['paths'].get('replay_buffer_dir', 'data/replay_buffer/'),
+                augment=augment,
+                board_size=self.board_size,
+            )
+        if training_config.get('prioritized_replay', False):
+            return PrioritizedReplayBuffer(
+                capacity=replay_buffer_size,
+                alpha=training_config.get('per_alpha', 0.6),
+                beta_start=training_config.get('per_beta_start', 0.4),
+                beta_steps=training_config.get('per_beta_steps', 100000),
+                epsilon=training_config.get('per_epsilon', 1e-6),
+                augment=augment,
+                board_size=self.board_size,
+            )
+        return G2048ReplayBuffer(capacity=replay_buffer_size, augment=augment, board_size=self.board_size)
+    
+    def train_step(self, replay_buffer: G2048ReplayBuffer, target_net: Q2048, optimizer) -> float:
+        """Sample a batch, take one gradient step and refresh priorities; returns the loss"""
+        batch, weights, indices = replay_buffer.sample_with_weights(training_config.get('batch_size', 64))
+        
+        # Loss calculation and backpropagation
+        loss, td_errors = self.compute_loss(batch, target_net, weights)
+        replay_buffer.update_priorities(indices, td_errors)
+        
+        optimizer.zero_grad()
+        loss.backward()
+        torch.nn.utils.clip_grad_norm_(self.ai_model.parameters(), max_norm=1.0)
+        optimizer.step()
+        return loss.item()
+    
+    def train_parallel(self):
+        """Train with actor processes feeding a single learner (see src.agent.parallel)"""
+        from src.agent.parallel import train_actor_learner
+        train_actor_learner(self)
+    
+    def compute_loss(self, batch, target_net: Q2048, weights: torch.Tensor = None) -> tuple:
+        """
+        Compute the loss for a batch of transitions.
+        
+        Args:
+            batch: Tensors returned by the replay buffer
+            target_net: Network used for the bootstrap targets
+            weights: Optional importance-sampling weights per transition
+            
+        Returns:
+            (loss, absolute TD errors as a NumPy array for priority updates)
+        """
         
         states, actions, rewards, next_states, dones, next_valid_moves = batch
         
-        # Convert to tensors on the correct device
-        state_batch = torch.tensor(states, dtype=torch.float32, device=self.device)
-        state_batch = state_batch.unsqueeze(1)  # Add channel dimension
+        # Move the buffer's CPU tensors to the correct device
+        state_batch = states.to(self.device).unsqueeze(1)  # Add channel dimension
         
         # 
         q_values = self.ai_model(state_batch)
         
-        # 
-        actions_numeric = convert_action_to_numeric(actions)  # Convertit ['left', 'right', ...] 
-        
-        q_sa = q_values.gather(1, torch.tensor(actions_numeric, dtype=torch.long, device=self.device).unsqueeze(1)).squeeze(1)
+        q_sa = q_values.gather(1, actions.to(self.device).unsqueeze(1)).squeeze(1)
         
         with torch.no_grad():
-            next_q = target_net(torch.tensor(next_states, dtype=torch.float32, device=self.device).unsqueeze(1))
+            next_q = target_net(next_states.to(self.device).unsqueeze(1))
             
             # Mask invalid moves in next states to avoid overestimation
-            # We need valid moves for each state in the batch
-            next_valid_moves_tensor = torch.tensor(next_valid_moves, dtype=torch.bool, device=self.device)
+            next_valid_moves_tensor = next_valid_moves.to(self.device)
             next_q[next_valid_moves_tensor == False] = -1000.0  # Masking manually to be safe with different torch versions
 
             max_next_q = next_q.max(1)[0]
             
-            target = torch.tensor(rewards, dtype=torch.float32, device=self.device) + \
-                     training_config.get('gamma', 0.99) * max_next_q * (1 - torch.tensor(dones, dtype=torch.float32, device=self.device))
+            target = rewards.to(self.device) + \
+                     training_config.get('gamma', 0.99) * max_next_q * (1 - dones.to(self.device))
         
         # Use Huber Loss (SmoothL1Loss) which is more robust to outliers than MSE
-        loss_fn = torch.nn.MSELoss()
-        loss = loss_fn(q_sa, target)
-        return loss
+        loss_fn = torch.nn.MSELoss(reduction='none')
+        losses = loss_fn(q_sa, target)
+        if weights is not None:
+            losses = losses * weights.to(self.device)
+        loss = losses.mean()
+        
+        td_errors = (q_sa - target).detach().abs().cpu().numpy()
+        return loss, td_errors
         
     def save_model(self, filepath: str):
         """Save the model weights to a file."""
-        torch.save(self.ai_model.state_dict(), filepath)
+        atomic_save(self.ai_model.state_dict(), filepath)
         print(f"Model saved to {filepath}")
 
-        def load_model(self, filepath: str):
-
-            """Load the model weights from a file."""
-
-            try:
-
-                self.ai_model.load_state_dict(torch.load(filepath, map_location=self.device))
-
-                self.ai_model.eval()
-
-                print(f"Model loaded from {filepath} onto {self.device}")
-
-            except FileNotFoundError:
-
-                print(f"Error: Model file not found at {filepath}")
-
-            except Exception as e:
-
-                print(f"Error loading model: {e}")
-
-    
\ No newline at end of file
+    def load_model(self, filepath: str):
+        """Load the model weights from a file."""
+        try:
+            self.ai_model.load_state_dict(torch.load(filepath, map_location=self.device))
+            self.ai_model.eval()
+            print(f"Model loaded from {filepath} onto {self.device}")
+        except FileNotFoundError:
+            print(f"Error: Model file not found at {filepath}")
+        except Exception as e:
+            print(f"Error loading model: {e}")
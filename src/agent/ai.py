@@ -1,20 +1,23 @@
 import torch 
 import torch.nn as nn
 
+from src.utils.constants import BOARD_SIZE
+
 class Q2048(nn.Module):
     """AI agent for playing 2048 game"""
     
-    def __init__(self, num_actions: int = 4):
+    def __init__(self, num_actions: int = 4, board_size: int = BOARD_SIZE):
       
         super(Q2048, self).__init__()
+        self.board_size = board_size
         
         # Convolutional layers to process the board state
         self.conv1 = nn.Conv2d(in_channels=1, out_channels=64, kernel_size=2, padding=1)
         
         self.conv2 = nn.Conv2d(in_channels=64, out_channels=128, kernel_size=2, padding=1)
         
-        # Fully connected layers to decide the best move
-        self.fc1 = nn.Linear(128 * 6 * 6, 256)
+        # Fully connected layers to decide the best move (each padded conv grows the side by 1)
+        self.fc1 = nn.Linear(128 * (board_size + 2) ** 2, 256)
         
         self.fc2 = nn.Linear(256, num_actions)
         
@@ -1,18 +1,402 @@
-import random
-from collections import deque
+import json
+import os
+from pathlib import Path
+
+import numpy as np
+import torch
+
+from src.game.symmetry import ACTION_MAPS, NUM_SYMMETRIES, transform_batch, transform_moves
+from src.utils.constants import BOARD_SIZE, DIRECTIONS
+
+# Tile value of every exponent (0 is an empty cell); boards past 5x5 have no
+# 4-bit cap, so this reaches past 2 ** 15
+EXPONENT_VALUES = np.array([0] + [2 ** e for e in range(1, 32)], dtype=np.float32)
+
+
+def to_exponents(boards) -> np.ndarray:
+    """Convert tile values (..., size, size) to uint8 exponents"""
+    boards = np.asarray(boards, dtype=np.int64)
+    exponents = np.zeros(boards.shape, dtype=np.uint8)
+    filled = boards > 0
+    exponents[filled] = np.log2(boards[filled]).astype(np.uint8)
+    return exponents
+
+
+def to_action_indices(actions) -> np.ndarray:
+    """Convert direction strings or indices to an int8 array"""
+    actions = np.atleast_1d(np.asarray(actions))
+    if actions.dtype.kind in "US":
+        actions = np.array([DIRECTIONS.index(a) for a in actions])
+    return actions.astype(np.int8)
+
 
 class G2048ReplayBuffer:
-    def __init__(self, capacity):
-        self.buffer = deque(maxlen=capacity)
+    """
+    Ring buffer of transitions held in preallocated contiguous arrays.
+
+    Boards are stored as uint8 exponents (16 bytes each on 4x4), actions as
+    int8, legal-move masks as the 4-bit mask in one byte and rewards as
+    float32, so a transition costs 39 bytes instead of a tuple of nested lists.
+
+    With ``augment`` every sampled transition is replayed under a random
+    rotation or reflection of the board, its action and next legal moves
+    permuted to match.
+    """
+
+    def __init__(self, capacity, seed=None, augment=False, board_size=BOARD_SIZE):
+        self.capacity = capacity
+        self.position = 0
+        self.size = 0
+        self.augment = augment
+        self.board_size = board_size
+        self._allocate(capacity)
+        self.rng = np.random.default_rng(seed)
+
+    def _allocate(self, capacity):
+        """Create the storage arrays"""
+        shape = (capacity, self.board_size, self.board_size)
+        self.states = np.zeros(shape, dtype=np.uint8)
+        self.next_states = np.zeros(shape, dtype=np.uint8)
+        self.actions = np.zeros(capacity, dtype=np.int8)
+        self.rewards = np.zeros(capacity, dtype=np.float32)
+        self.dones = np.zeros(capacity, dtype=np.bool_)
+        self.next_valid_masks = np.zeros(capacity, dtype=np.uint8)
+
+    def add(self, state, action, reward, next_state, done, next_valid_mask):
+        i = self.position
+        self.states[i] = to_exponents(state)
+        self.next_states[i] = to_exponents(next_state)
+        self.actions[i] = DIRECTIONS.index(action) if isinstance(action, str) else action
+        self.rewards[i] = reward
+        self.dones[i] = done
+        self.next_valid_masks[i] = next_valid_mask
+        self.position = (i + 1) % self.capacity
+        self.size = min(self.size + 1, self.capacity)
+
+    def add_batch(self, states, actions, rewards, next_states, dones, next_valid_masks):
+        """Add N transitions at once (boards as tile values or exponents)"""
+        states = np.asarray(states)
+        next_states = np.asarray(next_states)
+        if states.dtype != np.uint8:
+            states = to_exponents(states)
+        if next_states.dtype != np.uint8:
+            next_states = to_exponents(next_states)
+        n = len(states)
+        idx = (self.position + np.arange(n)) % self.capacity
+        self.states[idx] = states
+        self.next_states[idx] = next_states
+        self.actions[idx] = to_action_indices(actions)
+        self.rewards[idx] = rewards
+        self.dones[idx] = dones
+        self.next_valid_masks[idx] = next_valid_masks
+        self.position = int((self.position + n) % self.capacity)
+        self.size = min(self.size + n, self.capacity)
 
-    def add(self, state, action, reward, next_state, done, next_valid_moves):
-        self.buffer.append((state, action, reward, next_state, done, next_valid_moves))
-        
+    def sample_indices(self, batch_size):
+        """Draw uniform random transition indices"""
+        return self.rng.integers(0, self.size, size=batch_size)
+
+    def gather(self, idx):
+        """
+        Build training tensors for the given transition indices.
+
+        Returns:
+            tuple of CPU tensors: states and next_states (B, size, size) float32
+            tile values, actions (B,) int64, rewards (B,) float32, dones
+            (B,) float32 and next_valid_moves (B, 4) bool
+        """
+        states = self.states[idx]
+        next_states = self.next_states[idx]
+        actions = self.actions[idx].astype(np.int64)
+        masks = self.next_valid_masks[idx]
+        next_valid_moves = ((masks[:, None] >> np.arange(4, dtype=np.uint8)) & 1).astype(np.bool_)
+
+        if self.augment:
+            symmetry = self.rng.integers(NUM_SYMMETRIES, size=len(states))
+            states = transform_batch(states, symmetry)
+            next_states = transform_batch(next_states, symmetry)
+            actions = ACTION_MAPS[symmetry, actions]
+            next_valid_moves = transform_moves(next_valid_moves, symmetry)
+
+        return (
+            torch.from_numpy(EXPONENT_VALUES[states]),
+            torch.from_numpy(actions),
+            torch.from_numpy(self.rewards[idx]),
+            torch.from_numpy(EXPONENT_VALUES[next_states]),
+            torch.from_numpy(self.dones[idx].astype(np.float32)),
+            torch.from_numpy(next_valid_moves),
+        )
 
     def sample(self, batch_size):
-        batch = random.sample(self.buffer, batch_size)
-        states, actions, rewards, next_states, dones, next_valid_moves = zip(*batch)
-        return states, actions, rewards, next_states, dones, next_valid_moves
+        return self.gather(self.sample_indices(batch_size))
+
+    def sample_with_weights(self, batch_size):
+        """
+        Sample a batch together with importance-sampling weights.
+
+        Returns:
+            (batch, weights, indices); uniform sampling uses unit weights
+        """
+        idx = self.sample_indices(batch_size)
+        return self.gather(idx), torch.ones(batch_size), idx
+
+    def update_priorities(self, indices, td_errors):
+        """Uniform sampling ignores TD errors"""
+
+    def state_dict(self):
+        """Copy of the stored transitions and sampling state, for checkpoints"""
+        return {
+            "capacity": self.capacity,
+            "states": self.states[:self.size].copy(),
+            "next_states": self.next_states[:self.size].copy(),
+            "actions": self.actions[:self.size].copy(),
+            "rewards": self.rewards[:self.size].copy(),
+            "dones": self.dones[:self.size].copy(),
+            "next_valid_masks": self.next_valid_masks[:self.size].copy(),
+            "position": self.position,
+            "size": self.size,
+            "rng": self.rng.bit_generator.state,
+        }
+
+    def load_state_dict(self, state):
+        """Restore transitions saved by ``state_dict`` (capacity must match)"""
+        if state["capacity"] != self.capacity:
+            raise ValueError(f"Buffer capacity {self.capacity} does not match checkpoint {state['capacity']}")
+        size = state["size"]
+        self.states[:size] = state["states"]
+        self.next_states[:size] = state["next_states"]
+        self.actions[:size] = state["actions"]
+        self.rewards[:size] = state["rewards"]
+        self.dones[:size] = state["dones"]
+        self.next_valid_masks[:size] = state["next_valid_masks"]
+        self.position = state["position"]
+        self.size = size
+        self.rng.bit_generator.state = state["rng"]
 
     def __len__(self):
-        return len(self.buffer)
+        return self.size
+
+
+def record_dtype(board_size: int = BOARD_SIZE) -> np.dtype:
+    """Fixed-width record of one transition in the memory-mapped store"""
+    return np.dtype([
+        ("state", np.uint8, (board_size, board_size)),
+        ("next_state", np.uint8, (board_size, board_size)),
+        ("action", np.int8),
+        ("reward", np.float32),
+        ("done", np.bool_),
+        ("next_valid_mask", np.uint8),
+    ])
+
+
+# 39 bytes per 4x4 transition
+RECORD_DTYPE = record_dtype(4)
+MEMMAP_FORMAT_VERSION = 1
+
+
+class MemmapReplayBuffer(G2048ReplayBuffer):
+    """
+    Replay buffer stored in a memory-mapped file of fixed-width records.
+
+    The directory holds ``transitions.bin`` (``capacity`` records of
+    ``record_dtype(board_size)``) and ``meta.json`` (ring position and fill level). Only
+    the pages that are touched stay in RAM, so the capacity is bounded by
+    disk rather than memory, and sampled batches are read through the page
+    cache. Opening a directory that already holds a buffer of the same
+    capacity reuses its transitions, so runs can share one store.
+    """
+
+    def __init__(self, capacity, directory, seed=None, augment=False, board_size=BOARD_SIZE):
+        self.directory = Path(directory)
+        self.data_path = self.directory / "transitions.bin"
+        self.meta_path = self.directory / "meta.json"
+        self.record_dtype = record_dtype(board_size)
+        super().__init__(capacity, seed=seed, augment=augment, board_size=board_size)
+
+    def _allocate(self, capacity):
+        self.directory.mkdir(parents=True, exist_ok=True)
+        meta = self._read_meta()
+        expected_bytes = capacity * self.record_dtype.itemsize
+        reopen = (meta is not None and meta["capacity"] == capacity
+                  and meta["version"] == MEMMAP_FORMAT_VERSION
+                  and meta.get("board_size", 4) == self.board_size
+                  and self.data_path.exists() and self.data_path.stat().st_size == expected_bytes)
+
+        self.records = np.memmap(self.data_path, dtype=self.record_dtype, mode="r+" if reopen else "w+",
+                                 shape=(capacity,))
+        if reopen:
+            self.position = meta["position"]
+            self.size = meta["size"]
+        elif meta is not None:
+            print(f"Replay store in {self.directory} has a different layout; starting empty")
+
+        # Field views write straight through to the mapped records
+        self.states = self.records["state"]
+        self.next_states = self.records["next_state"]
+        self.actions = self.records["action"]
+        self.rewards = self.records["reward"]
+        self.dones = self.records["done"]
+        self.next_valid_masks = self.records["next_valid_mask"]
+        self._write_meta()
+
+    def _read_meta(self):
+        try:
+            with open(self.meta_path, "r") as f:
+                return json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return None
+
+    def _write_meta(self):
+        """Atomically record the ring position and fill level"""
+        meta = {"version": MEMMAP_FORMAT_VERSION, "capacity": self.capacity,
+                "position": self.position, "size": self.size,
+                "board_size": self.board_size, "record_bytes": self.record_dtype.itemsize}
+        tmp_path = self.meta_path.with_name(self.meta_path.name + ".tmp")
+        with open(tmp_path, "w") as f:
+            json.dump(meta, f)
+        os.replace(tmp_path, self.meta_path)
+
+    def flush(self):
+        """Write dirty pages and the metadata to disk"""
+        self.records.flush()
+        self._write_meta()
+
+    def close(self):
+        self.flush()
+        del self.states, self.next_states, self.actions, self.rewards, self.dones, self.next_valid_masks
+        del self.records
+
+    def state_dict(self):
+        # The transitions already live on disk; checkpoints only keep the pointers
+        self.flush()
+        return {
+            "capacity": self.capacity,
+            "directory": str(self.directory),
+            "position": self.position,
+            "size": self.size,
+            "rng": self.rng.bit_generator.state,
+        }
+
+    def load_state_dict(self, state):
+        if state["capacity"] != self.capacity:
+            raise ValueError(f"Buffer capacity {self.capacity} does not match checkpoint {state['capacity']}")
+        self.position = state["position"]
+        self.size = state["size"]
+        self.rng.bit_generator.state = state["rng"]
+
+
+class SumTree:
+    """
+    Binary tree over the leaf priorities where each node stores the sum of
+    its children, giving O(log n) proportional sampling and updates. The
+    tree lives in one flat array (root at 1, leaves at ``[leaf_count, 2 *
+    leaf_count)``) and every operation is vectorized over a batch.
+    """
+
+    def __init__(self, capacity):
+        self.leaf_count = 1
+        while self.leaf_count < capacity:
+            self.leaf_count *= 2
+        self.depth = self.leaf_count.bit_length() - 1
+        self.tree = np.zeros(2 * self.leaf_count, dtype=np.float64)
+
+    @property
+    def total(self):
+        return self.tree[1]
+
+    def update(self, indices, priorities):
+        """Set leaf priorities and refresh their ancestors level by level"""
+        nodes = np.asarray(indices, dtype=np.int64) + self.leaf_count
+        self.tree[nodes] = priorities
+        if nodes.size == 1:
+            # Scalar walk is much cheaper than NumPy calls for the per-step add
+            tree = self.tree
+            node = int(nodes[0]) // 2
+            while node:
+                tree[node] = tree[2 * node] + tree[2 * node + 1]
+                node //= 2
+            return
+        for _ in range(self.depth):
+            nodes = np.unique(nodes // 2)
+            self.tree[nodes] = self.tree[2 * nodes] + self.tree[2 * nodes + 1]
+
+    def find(self, values):
+        """Descend from the root to the leaves whose prefix-sum ranges hold ``values``"""
+        values = np.array(values, dtype=np.float64)
+        nodes = np.ones(len(values), dtype=np.int64)
+        for _ in range(self.depth):
+            left = self.tree[2 * nodes]
+            go_right = values >= left
+            values -= np.where(go_right, left, 0.0)
+            nodes = 2 * nodes + go_right
+        return nodes - self.leaf_count
+
+    def get(self, indices):
+        return self.tree[np.asarray(indices, dtype=np.int64) + self.leaf_count]
+
+
+class PrioritizedReplayBuffer(G2048ReplayBuffer):
+    """
+    Proportional prioritized replay: transitions are drawn with probability
+    p_i^alpha / sum(p^alpha) where p_i is the last absolute TD error, and
+    the bias is corrected with weights (N * P(i))^-beta, beta annealed to 1.
+    """
+
+    def __init__(self, capacity, alpha=0.6, beta_start=0.4, beta_steps=100000,
+                 epsilon=1e-6, seed=None, augment=False, board_size=BOARD_SIZE):
+        super().__init__(capacity, seed=seed, augment=augment, board_size=board_size)
+        self.tree = SumTree(capacity)
+        self.alpha = alpha
+        self.beta_start = beta_start
+        self.beta_steps = beta_steps
+        self.epsilon = epsilon
+        self.max_priority = 1.0
+        self.sample_count = 0
+
+    @property
+    def beta(self):
+        progress = min(1.0, self.sample_count / max(1, self.beta_steps))
+        return self.beta_start + progress * (1.0 - self.beta_start)
+
+    def add(self, state, action, reward, next_state, done, next_valid_mask):
+        # New transitions get the highest priority so they are replayed at least once
+        i = self.position
+        super().add(state, action, reward, next_state, done, next_valid_mask)
+        self.tree.update([i], self.max_priority ** self.alpha)
+
+    def add_batch(self, states, actions, rewards, next_states, dones, next_valid_masks):
+        idx = (self.position + np.arange(len(states))) % self.capacity
+        super().add_batch(states, actions, rewards, next_states, dones, next_valid_masks)
+        self.tree.update(idx, self.max_priority ** self.alpha)
+
+    def sample_indices(self, batch_size):
+        """Stratified proportional sampling: one draw per equal slice of the total"""
+        segment = self.tree.total / batch_size
+        values = (np.arange(batch_size) + self.rng.random(batch_size)) * segment
+        return np.minimum(self.tree.find(values), self.size - 1)
+
+    def sample_with_weights(self, batch_size):
+        idx = self.sample_indices(batch_size)
+        probabilities = self.tree.get(idx) / self.tree.total
+        weights = (self.size * probabilities) ** -self.beta
+        weights /= weights.max()
+        self.sample_count += 1
+        return self.gather(idx), torch.from_numpy(weights.astype(np.float32)), idx
+
+    def state_dict(self):
+        state = super().state_dict()
+        state.update(tree=self.tree.tree.copy(), max_priority=self.max_priority,
+                     sample_count=self.sample_count)
+        return state
+
+    def load_state_dict(self, state):
+        super().load_state_dict(state)
+        self.tree.tree[:] = state["tree"]
+        self.max_priority = state["max_priority"]
+        self.sample_count = state["sample_count"]
+
+    def update_priorities(self, indices, td_errors):
+        """Set priorities from the absolute TD errors of a trained batch"""
+        priorities = np.abs(np.asarray(td_errors, dtype=np.float64)) + self.epsilon
+        self.max_priority = max(self.max_priority, float(priorities.max()))
+        self.tree.update(indices, priorities ** self.alpha)
@@ -0,0 +1,123 @@
+"""Full training checkpoints written atomically on a background thread"""
+
+import os
+import queue
+import random
+import threading
+import time
+from pathlib import Path
+
+import numpy as np
+import torch
+
+CHECKPOINT_VERSION = 1
+
+
+def atomic_save(obj, filepath: str):
+    """Write ``obj`` with torch.save to a temp file, fsync it, then rename over ``filepath``"""
+    path = Path(filepath)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(path.name + ".tmp")
+    with open(tmp_path, "wb") as f:
+        torch.save(obj, f)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+
+def snapshot(value):
+    """Deep-copy tensors and arrays so training can keep mutating the originals"""
+    if isinstance(value, torch.Tensor):
+        return value.detach().to("cpu", copy=True)
+    if isinstance(value, np.ndarray):
+        return value.copy()
+    if isinstance(value, dict):
+        return {k: snapshot(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return type(value)(snapshot(v) for v in value)
+    return value
+
+
+def capture_rng_state() -> dict:
+    """Collect the Python, NumPy and torch global RNG states"""
+    return {
+        "python": random.getstate(),
+        "numpy": np.random.get_state(),
+        "torch": torch.get_rng_state(),
+    }
+
+
+def restore_rng_state(state: dict):
+    """Restore RNG states captured by ``capture_rng_state``"""
+    random.setstate(state["python"])
+    np.random.set_state(state["numpy"])
+    torch.set_rng_state(state["torch"])
+
+
+def load_checkpoint(filepath: str, map_location=None) -> dict:
+    """Load a checkpoint written by ``CheckpointWriter`` (trusted, local files only)"""
+    checkpoint = torch.load(filepath, map_location=map_location, weights_only=False)
+    if checkpoint.get("version") != CHECKPOINT_VERSION:
+        raise ValueError(f"Unsupported checkpoint version: {checkpoint.get('version')}")
+    return checkpoint
+
+
+class CheckpointWriter:
+    """
+    Writes checkpoints on a daemon thread so the training loop never waits
+    on disk. Only the newest pending request is kept: if a write is still
+    in progress when another checkpoint is requested, the older pending one
+    is dropped.
+    """
+
+    def __init__(self):
+        self._pending = queue.Queue(maxsize=1)
+        self._lock = threading.Lock()
+        self.last_write_seconds = 0.0
+        self.writes = 0
+        self.error = None
+        self._thread = threading.Thread(target=self._run, name="checkpoint-writer", daemon=True)
+        self._thread.start()
+
+    def save(self, files: dict):
+        """
+        Queue a checkpoint.
+
+        Args:
+            files: Mapping of file path to object; objects must already be
+                snapshots (see ``snapshot``) that training no longer mutates
+        """
+        with self._lock:
+            try:
+                self._pending.get_nowait()
+                self._pending.task_done()
+            except queue.Empty:
+                pass
+            self._pending.put(files)
+
+    def _run(self):
+        while True:
+            files = self._pending.get()
+            if files is None:
+                self._pending.task_done()
+                return
+            start = time.perf_counter()
+            try:
+                for filepath, obj in files.items():
+                    atomic_save(obj, filepath)
+                self.writes += 1
+            except Exception as e:
+                self.error = e
+                print(f"Error writing checkpoint: {e}")
+            self.last_write_seconds = time.perf_counter() - start
+            self._pending.task_done()
+
+    def flush(self):
+        """Block until every queued checkpoint is on disk"""
+        self._pending.join()
+
+    def close(self):
+        """Flush pending writes and stop the thread"""
+        self.flush()
+        self._pending.put(None)
+        self._thread.join()
@@ -0,0 +1,145 @@
+"""Expectimax search player over the packed bitboard engine"""
+
+import time
+from typing import Dict, Optional, Tuple
+
+from src.game.bitboard import get_tables, legal_moves_mask, move_packed, pack, spawn_outcomes
+from src.game.game import GameManager
+from src.game.heuristics import load_heuristic
+from src.game.symmetry import canonical_key
+from src.utils.constants import DIRECTIONS
+from src.utils.helpers import load_config
+
+config = load_config() or {}
+
+# Retrieve search configuration
+expectimax_config = config.get('expectimax', {})
+
+# Default evaluation (nneonneo's weights, empty cells and sum counted on rows
+# and columns there, hence doubled here); override under heuristics.expectimax
+EXPECTIMAX_TERMS = {'empty': 540.0, 'merges': 700.0, 'monotonicity': -47.0, 'sum': -22.0}
+EXPECTIMAX_CONSTANT = 1600000.0  # Keeps every live board above the 0 of a lost one
+
+
+class SearchTimeout(Exception):
+    """Raised inside the search when the per-move budget is spent"""
+
+
+class ExpectimaxAgent:
+    """
+    Expectimax player: max nodes pick a direction, chance nodes average over
+    every spawn (2 with SPAWN_PROBABILITY, else 4) in every empty cell.
+
+    Branches whose cumulative probability falls below ``min_probability``
+    are cut off and scored with the heuristic. Searches deepen one ply at a
+    time until ``time_budget_ms`` runs out; the deepest finished iteration
+    decides the move. A transposition table keyed on the canonical board
+    (see ``canonical_key``) avoids re-searching positions reached through
+    different spawn orders or as mirror images; the heuristic is symmetric.
+    """
+
+    def __init__(self, time_budget_ms: Optional[float] = None, max_depth: Optional[int] = None,
+                 min_probability: Optional[float] = None):
+        """
+        Initialize the search player.
+
+        Args:
+            time_budget_ms: Search time per move (default from config)
+            max_depth: Deepest iteration, in moves (default from config)
+            min_probability: Cumulative probability below which a branch is cut
+        """
+        self.time_budget_ms = time_budget_ms if time_budget_ms is not None else expectimax_config.get('time_budget_ms', 50)
+        self.max_depth = max_depth if max_depth is not None else expectimax_config.get('max_depth', 8)
+        self.min_probability = min_probability if min_probability is not None else expectimax_config.get('min_probability', 1e-4)
+
+        get_tables()
+        self.heuristic = load_heuristic('expectimax', EXPECTIMAX_TERMS, EXPECTIMAX_CONSTANT)
+        self._evaluate = self.heuristic.evaluate_packed
+        self._table: Dict[int, Tuple[int, float]] = {}
+        self._deadline = 0.0
+        self._nodes = 0
+
+        # Statistics of the last search
+        self.last_depth = 0
+        self.last_nodes = 0
+
+    def select_move(self, game_manager: GameManager) -> str:
+        """Pick the direction with the best expected value for the current board"""
+        board = game_manager.board
+        if board.size != 4:
+            raise ValueError(f"Expectimax search runs on 4x4 boards, got size={board.size}")
+        packed = board.state if hasattr(board, "state") else pack(board.grid)
+        return DIRECTIONS[self.best_action(packed)]
+
+    def best_action(self, board: int) -> int:
+        """
+        Search a packed board under the time budget.
+
+        Returns:
+            Index into DIRECTIONS of the chosen move (a legal one when any exists)
+        """
+        mask = legal_moves_mask(board)
+        legal = [a for a in range(4) if mask >> a & 1]
+        if len(legal) <= 1:
+            return legal[0] if legal else 0
+
+        self._deadline = time.perf_counter() + self.time_budget_ms / 1000.0
+        self._table = {}
+        self._nodes = 0
+        best = legal[0]
+        self.last_depth = 0
+
+        for depth in range(1, self.max_depth + 1):
+            try:
+                best = self._search_root(board, depth, legal)
+            except SearchTimeout:
+                break
+            self.last_depth = depth
+        self.last_nodes = self._nodes
+        return best
+
+    def _search_root(self, board: int, depth: int, legal) -> int:
+        best_action = legal[0]
+        best_value = float("-inf")
+        for action in legal:
+            moved = move_packed(board, DIRECTIONS[action])[0]
+            value = self._chance_node(moved, depth, 1.0)
+            if value > best_value:
+                best_value = value
+                best_action = action
+        return best_action
+
+    def _max_node(self, board: int, depth: int, probability: float) -> float:
+        best = 0.0
+        for direction in DIRECTIONS:
+            moved = move_packed(board, direction)[0]
+            if moved != board:
+                value = self._chance_node(moved, depth, probability)
+                if value > best:
+                    best = value
+        return best
+
+    def _chance_node(self, board: int, depth: int, probability: float) -> float:
+        depth -= 1
+        if depth <= 0 or probability < self.min_probability:
+            return self._evaluate(board)
+
+        key = canonical_key(board)
+        cached = self._table.get(key)
+        if cached is not None and cached[0] >= depth:
+            return cached[1]
+
+        self._nodes += 1
+        if self._nodes & 63 == 0 and time.perf_counter() > self._deadline:
+            raise SearchTimeout()
+
+        outcomes = spawn_outcomes(board)
+        if not outcomes:
+            return self._evaluate(board)
+
+        value = 0.0
+        for outcome, outcome_probability in outcomes:
+            value += outcome_probability * self._max_node(outcome, depth, probability * outcome_probability)
+
+        self._table[key] = (depth, value)
+        return value
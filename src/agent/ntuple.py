@@ -0,0 +1,250 @@
+"""N-tuple network value function trained by TD(0) on afterstates"""
+
+import os
+import time
+from pathlib import Path
+from typing import List, Optional, Sequence
+
+import numpy as np
+
+from src.game.batch import BatchGameManager
+from src.game.bitboard import move_packed, pack
+from src.game.game import GameManager
+from src.game.symmetry import PERMUTATIONS
+from src.utils.constants import DIRECTIONS
+from src.utils.helpers import load_config
+
+config = load_config() or {}
+
+# Retrieve n-tuple configuration
+ntuple_config = config.get('ntuple', {})
+
+# Four 6-tuples covering the board edge and the next line in (Szubert & Jaśkowski)
+DEFAULT_PATTERNS = [
+    (0, 1, 2, 3, 4, 5),
+    (4, 5, 6, 7, 8, 9),
+    (0, 1, 2, 4, 5, 6),
+    (4, 5, 6, 8, 9, 10),
+]
+
+_BOARD_SHIFTS = np.arange(0, 64, 4, dtype=np.uint64)
+
+
+def unpack_exponents(boards: Sequence[int]) -> np.ndarray:
+    """Unpack packed boards into an (M, 16) array of exponents"""
+    packed = np.array(boards, dtype=np.uint64).reshape(-1, 1)
+    return ((packed >> _BOARD_SHIFTS) & np.uint64(0xF)).astype(np.uint8)
+
+
+class NTupleNetwork:
+    """
+    Sum of lookup tables indexed by the exponents under fixed cell patterns.
+
+    Each pattern of length L owns one float32 table with 16**L entries. With
+    ``symmetric`` the pattern is read under all eight board symmetries and
+    every reading adds a weight from that same shared table.
+    """
+
+    def __init__(self, patterns: Optional[Sequence[Sequence[int]]] = None, symmetric: bool = True):
+        """
+        Initialize zeroed tables.
+
+        Args:
+            patterns: Cell tuples (flat indices 0-15); defaults to DEFAULT_PATTERNS
+            symmetric: Share each table across the eight board symmetries
+        """
+        self.patterns = [tuple(int(c) for c in p) for p in (patterns or DEFAULT_PATTERNS)]
+        self.symmetric = symmetric
+        for pattern in self.patterns:
+            if len(set(pattern)) != len(pattern) or not all(0 <= c < 16 for c in pattern):
+                raise ValueError(f"Invalid pattern: {pattern}")
+
+        symmetries = PERMUTATIONS if symmetric else PERMUTATIONS[:1]
+        # (S, L) cells read for each symmetry, and the nibble shift of each position
+        self._cells = [symmetries[:, list(pattern)] for pattern in self.patterns]
+        self._shifts = [np.arange(0, 4 * len(pattern), 4, dtype=np.int64) for pattern in self.patterns]
+        self.num_features = sum(len(cells) for cells in self._cells)
+        self.tables = [np.zeros(16 ** len(pattern), dtype=np.float32) for pattern in self.patterns]
+
+    def indices(self, boards: np.ndarray) -> List[np.ndarray]:
+        """
+        Table indices of every feature.
+
+        Args:
+            boards: (M, 16) exponent boards
+
+        Returns:
+            One (M, S) index array per pattern
+        """
+        return [(boards[:, cells].astype(np.int64) << shifts).sum(axis=2)
+                for cells, shifts in zip(self._cells, self._shifts)]
+
+    def value(self, boards: np.ndarray) -> np.ndarray:
+        """Value of each (M, 16) exponent board"""
+        boards = boards.reshape(-1, 16)
+        values = np.zeros(len(boards), dtype=np.float32)
+        for table, idx in zip(self.tables, self.indices(boards)):
+            values += table[idx].sum(axis=1)
+        return values
+
+    def td_update(self, boards: np.ndarray, targets: np.ndarray, learning_rate: float) -> np.ndarray:
+        """
+        Move the value of each board towards its target.
+
+        The step is split evenly over the features, so ``learning_rate`` is
+        the fraction of the error removed for a board seen once. Boards that
+        share features in one batch accumulate their updates.
+
+        Returns:
+            The TD errors before the update
+        """
+        boards = boards.reshape(-1, 16)
+        if not len(boards):
+            return np.zeros(0, dtype=np.float32)
+        all_indices = self.indices(boards)
+        values = np.zeros(len(boards), dtype=np.float32)
+        for table, idx in zip(self.tables, all_indices):
+            values += table[idx].sum(axis=1)
+        errors = np.asarray(targets, dtype=np.float32) - values
+
+        step = (learning_rate / self.num_features) * errors
+        for table, idx in zip(self.tables, all_indices):
+            np.add.at(table, idx.ravel(), np.repeat(step, idx.shape[1]))
+        return errors
+
+    def save(self, filepath: str):
+        """Write the patterns and raw float32 tables to an .npz file atomically"""
+        path = Path(filepath)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_name(path.name + ".tmp")
+        arrays = {f"table_{i}": table for i, table in enumerate(self.tables)}
+        with open(tmp_path, "wb") as f:
+            np.savez(f, pattern_lengths=np.array([len(p) for p in self.patterns], dtype=np.int64),
+                     pattern_cells=np.array([c for p in self.patterns for c in p], dtype=np.int64),
+                     symmetric=np.array(self.symmetric), **arrays)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, filepath: str) -> "NTupleNetwork":
+        """Load a network written by ``save``"""
+        with np.load(filepath) as data:
+            cells = data["pattern_cells"].tolist()
+            patterns = []
+            for length in data["pattern_lengths"].tolist():
+                patterns.append(tuple(cells[:length]))
+                cells = cells[length:]
+            network = cls(patterns, symmetric=bool(data["symmetric"]))
+            for i, table in enumerate(network.tables):
+                stored = data[f"table_{i}"]
+                if stored.shape != table.shape:
+                    raise ValueError(f"Table {i} has shape {stored.shape}, expected {table.shape}")
+                network.tables[i] = stored.astype(np.float32, copy=False)
+        return network
+
+
+class NTupleAgent:
+    """
+    Greedy afterstate player: picks the move maximizing gain + V(afterstate).
+
+    ``train`` runs TD(0) over many games at once with BatchGameManager; the
+    reward is the raw score gain of each move and games play on past 2048.
+    """
+
+    def __init__(self, network: Optional[NTupleNetwork] = None, learning_rate: Optional[float] = None):
+        """
+        Initialize the agent.
+
+        Args:
+            network: Value function (default: loaded from ntuple.table_path if
+                the file exists, else a new network with the configured patterns)
+            learning_rate: TD step size (default from config)
+        """
+        self.table_path = ntuple_config.get('table_path', 'models/ntuple.npz')
+        if network is None:
+            if os.path.exists(self.table_path):
+                network = NTupleNetwork.load(self.table_path)
+                print(f"N-tuple tables loaded from {self.table_path}")
+            else:
+                network = NTupleNetwork(ntuple_config.get('patterns'), ntuple_config.get('symmetric', True))
+        self.network = network
+        self.learning_rate = learning_rate if learning_rate is not None else ntuple_config.get('learning_rate', 0.1)
+
+    def select_move(self, game_manager: GameManager) -> str:
+        """Pick the direction with the best afterstate value for the current board"""
+        board = game_manager.board
+        if board.size != 4:
+            raise ValueError(f"N-tuple patterns are defined on 4x4 boards, got size={board.size}")
+        packed = board.state if hasattr(board, "state") else pack(board.grid)
+        afterstates = []
+        gains = []
+        for direction in DIRECTIONS:
+            moved, gain, _ = move_packed(packed, direction)
+            afterstates.append(moved)
+            gains.append(gain if moved != packed else float("-inf"))
+        values = self.network.value(unpack_exponents(afterstates))
+        return DIRECTIONS[int(np.argmax(np.array(gains) + values))]
+
+    def train(self, episodes: Optional[int] = None, num_envs: Optional[int] = None,
+              seed: Optional[int] = None, report_freq: Optional[int] = None) -> List[int]:
+        """
+        Train by self-play until ``episodes`` games have finished.
+
+        Args:
+            episodes: Games to play (default from config)
+            num_envs: Games stepped together (default from config)
+            seed: Seed for the tile-spawn generator
+            report_freq: Finished games between progress lines and table saves
+
+        Returns:
+            The final score of every finished game
+        """
+        episodes = episodes or ntuple_config.get('episodes', 100000)
+        num_envs = num_envs or ntuple_config.get('num_envs', 256)
+        report_freq = report_freq or ntuple_config.get('report_freq', 1000)
+        env = BatchGameManager(num_envs, seed=seed if seed is not None else ntuple_config.get('seed'),
+                               end_on_win=False, size=4)
+        rows = np.arange(num_envs)
+
+        previous = np.zeros((num_envs, 16), dtype=np.uint8)
+        has_previous = np.zeros(num_envs, dtype=bool)
+        scores: List[int] = []
+        moves = 0
+        next_report = report_freq
+        start = time.perf_counter()
+
+        while len(scores) < episodes:
+            afterstates, gains, moved = env.afterstates()
+            values = self.network.value(afterstates).reshape(num_envs, 4)
+            q = np.where(moved, gains + values, -np.inf)
+            actions = q.argmax(axis=1)
+            chosen = afterstates[rows, actions]
+
+            # V(previous afterstate) <- gain + V(best afterstate reached from it)
+            if has_previous.any():
+                targets = gains[rows, actions] + values[rows, actions]
+                self.network.td_update(previous[has_previous], targets[has_previous], self.learning_rate)
+
+            final_scores = env.scores + gains[rows, actions]
+            _, _, dones, _ = env.step(actions)
+            moves += num_envs
+
+            # Afterstates that lead to a lost game are worth nothing
+            if dones.any():
+                self.network.td_update(chosen[dones], np.zeros(int(dones.sum())), self.learning_rate)
+                scores.extend(final_scores[dones].tolist())
+
+            previous = chosen
+            has_previous = ~dones
+
+            if len(scores) >= next_report:
+                elapsed = time.perf_counter() - start
+                recent = scores[-report_freq:]
+                print(f"Episodes {len(scores)}/{episodes}, mean score {np.mean(recent):.0f}, "
+                      f"max {max(recent)}, {moves / elapsed:.0f} moves/s")
+                self.network.save(self.table_path)
+                next_report += report_freq
+
+        self.network.save(self.table_path)
+        return scores
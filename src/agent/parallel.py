@@ -0,0 +1,230 @@
+"""Actor/learner training: worker processes play, one learner trains"""
+
+import queue
+import random
+import time
+
+import numpy as np
+import torch
+import torch.multiprocessing as mp
+
+from src.agent.ai import Q2048
+from src.agent.buffer import to_exponents
+from src.utils.constants import DIRECTIONS
+from src.utils.helpers import load_config, plot_loss_curve, spawn_generators
+
+config = load_config()
+
+# Retrieve training configuration
+training_config = config['training']
+
+
+def run_actor(worker_id: int, shared_model: Q2048, weights_version, transitions: mp.Queue,
+              stop_event, rng: np.random.Generator, chunk_size: int, sync_freq: int):
+    """
+    Play games with a local copy of the policy and ship transitions to the learner.
+
+    Args:
+        worker_id: Index of this actor
+        shared_model: Policy weights in shared memory, refreshed by the learner
+        weights_version: Shared counter bumped on every weight broadcast
+        transitions: Queue receiving chunks of transitions
+        stop_event: Set by the learner when training is finished
+        rng: This actor's independent stream; drives the tile spawns and seeds exploration
+        chunk_size: Transitions per queued chunk
+        sync_freq: Steps between checks for new weights
+    """
+    # Imported here so spawned workers build their own agent and game
+    from src.agent.agent import G2048Agent
+    from src.game.game import GameManager
+
+    torch.set_num_threads(1)
+    seed = int(rng.integers(2 ** 31))
+    random.seed(seed)
+    np.random.seed(seed)
+    torch.manual_seed(seed)
+
+    game_manager = GameManager(seed=rng)
+    agent = G2048Agent(game_manager, is_training=True, device="cpu")
+    local_version = -1
+
+    chunk = {"states": [], "actions": [], "rewards": [], "next_states": [],
+             "dones": [], "next_valid_masks": []}
+    episodes = 0
+    steps = 0
+
+    def flush():
+        nonlocal episodes
+        if not chunk["states"]:
+            return
+        payload = {
+            "worker_id": worker_id,
+            "episodes": episodes,
+            "states": to_exponents(chunk["states"]),
+            "actions": np.array(chunk["actions"], dtype=np.int8),
+            "rewards": np.array(chunk["rewards"], dtype=np.float32),
+            "next_states": to_exponents(chunk["next_states"]),
+            "dones": np.array(chunk["dones"], dtype=np.bool_),
+            "next_valid_masks": np.array(chunk["next_valid_masks"], dtype=np.uint8),
+        }
+        while not stop_event.is_set():
+            try:
+                transitions.put(payload, timeout=0.5)
+                break
+            except queue.Full:
+                continue
+        for values in chunk.values():
+            values.clear()
+        episodes = 0
+
+    while not stop_event.is_set():
+        game_manager.restart()
+        state = game_manager.get_board()
+        valid_mask = game_manager.get_valid_mask()
+        done = False
+
+        while not done and not stop_event.is_set():
+            # Pick up the latest broadcast weights
+            if steps % sync_freq == 0 and weights_version.value != local_version:
+                with weights_version.get_lock():
+                    agent.ai_model.load_state_dict(shared_model.state_dict())
+                    local_version = weights_version.value
+
+            action = agent.select_move(game_manager, valid_mask)
+            next_state, reward, done, next_valid_mask = game_manager.step(action)
+
+            chunk["states"].append(state)
+            chunk["actions"].append(DIRECTIONS.index(action))
+            chunk["rewards"].append(reward)
+            chunk["next_states"].append(next_state)
+            chunk["dones"].append(done)
+            chunk["next_valid_masks"].append(next_valid_mask)
+
+            state = next_state
+            valid_mask = next_valid_mask
+            steps += 1
+            if len(chunk["states"]) >= chunk_size:
+                flush()
+
+        if done:
+            episodes += 1
+            # Decay epsilon (exponential decay), per actor as in train_model
+            agent.epsilon = max(
+                training_config.get('epsilon_end', 0.05),
+                agent.epsilon * training_config.get('epsilon_decay', 0.995)
+            )
+
+    flush()
+
+
+def train_actor_learner(agent):
+    """
+    Train ``agent`` with ``training.num_workers`` actor processes.
+
+    Actors run their own GameManager and a CPU copy of Q2048 that they
+    refresh from shared memory. The learner (this process) appends their
+    transitions to the replay buffer, performs one gradient step per
+    ``train_freq`` received transitions and broadcasts its weights every
+    ``weight_sync_freq`` gradient steps.
+
+    Args:
+        agent: The G2048Agent whose model is trained
+    """
+    ctx = mp.get_context("spawn")
+    num_workers = training_config.get('num_workers', 4)
+    episodes = training_config.get('episodes', 1000)
+    b_min = training_config.get('b_min', 1000)
+    train_freq = training_config.get('train_freq', 4)
+    target_update_freq = training_config.get('target_update_freq', 500)
+    weight_sync_freq = training_config.get('weight_sync_freq', 50)
+    checkpoint_freq = training_config.get('checkpoint_freq', 10)
+    model_save_path = training_config.get('model_save_path', 'g2048_model.pth')
+
+    # Policy weights broadcast to the actors through shared memory
+    shared_model = Q2048(board_size=agent.board_size)
+    shared_model.load_state_dict(agent.ai_model.state_dict())
+    shared_model.share_memory()
+    weights_version = ctx.Value("i", 0)
+
+    transitions = ctx.Queue(maxsize=num_workers * 8)
+    stop_event = ctx.Event()
+    # Independent, reproducible streams split from training.seed
+    worker_rngs = spawn_generators(training_config.get('seed', None), num_workers)
+
+    workers = []
+    for worker_id in range(num_workers):
+        worker = ctx.Process(
+            target=run_actor,
+            args=(worker_id, shared_model, weights_version, transitions, stop_event,
+                  worker_rngs[worker_id], training_config.get('actor_chunk_size', 256),
+                  training_config.get('actor_sync_freq', 100)),
+            daemon=True,
+        )
+        worker.start()
+        workers.append(worker)
+    print(f"Started {num_workers} actor processes")
+
+    target_net = Q2048(board_size=agent.board_size).to(agent.device)
+    target_net.load_state_dict(agent.ai_model.state_dict())
+    replay_buffer = agent.create_replay_buffer()
+    optimizer = torch.optim.Adam(agent.ai_model.parameters(), lr=training_config.get('learning_rate', 0.001))
+
+    losses = []
+    episodes_done = 0
+    env_steps = 0
+    grad_steps = 0
+    pending_updates = 0.0
+    next_checkpoint = checkpoint_freq
+    start = time.perf_counter()
+
+    try:
+        while episodes_done < episodes:
+            try:
+                chunk = transitions.get(timeout=60)
+            except queue.Empty:
+                if not any(worker.is_alive() for worker in workers):
+                    raise RuntimeError("All actor processes exited")
+                continue
+
+            replay_buffer.add_batch(chunk["states"], chunk["actions"], chunk["rewards"],
+                                    chunk["next_states"], chunk["dones"], chunk["next_valid_masks"])
+            env_steps += len(chunk["states"])
+            episodes_done += chunk["episodes"]
+
+            if len(replay_buffer) < b_min:
+                continue
+
+            # Keep the serial ratio of one gradient step per train_freq env steps
+            pending_updates += len(chunk["states"]) / train_freq
+            while pending_updates >= 1:
+                losses.append(agent.train_step(replay_buffer, target_net, optimizer))
+                pending_updates -= 1
+                grad_steps += 1
+
+                if grad_steps % target_update_freq == 0:
+                    target_net.load_state_dict(agent.ai_model.state_dict())
+
+                if grad_steps % weight_sync_freq == 0:
+                    with weights_version.get_lock():
+                        shared_model.load_state_dict(agent.ai_model.state_dict())
+                        weights_version.value += 1
+
+            if episodes_done >= next_checkpoint:
+                elapsed = time.perf_counter() - start
+                print(f"Episodes {episodes_done}/{episodes}, "
+                      f"{env_steps / elapsed:.0f} env steps/s, {grad_steps / elapsed:.1f} grad steps/s")
+                agent.save_model(model_save_path)
+                next_checkpoint += checkpoint_freq
+    finally:
+        stop_event.set()
+        # Drain so actors blocked on a full queue can exit
+        while any(worker.is_alive() for worker in workers):
+            try:
+                transitions.get(timeout=0.1)
+            except queue.Empty:
+                pass
+            for worker in workers:
+                worker.join(timeout=0.1)
+
+    agent.save_model(model_save_path)
+    plot_loss_curve(losses)
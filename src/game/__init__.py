@@ -1,7 +1,8 @@
 """Game logic module"""
 
 from .tile import Tile
-from .board import Board
+from .board import Board, create_board
+from .bitboard import BitBoard
 from .game import GameManager
 
-__all__ = ["Tile", "Board", "GameManager"]
+__all__ = ["Tile", "Board", "BitBoard", "create_board", "GameManager"]
@@ -0,0 +1,235 @@
+"""Vectorized environment stepping many games at once"""
+
+import numpy as np
+from typing import Optional, Sequence, Tuple, Union
+from src.utils.constants import BOARD_SIZE, DIRECTIONS, SPAWN_PROBABILITY
+from src.utils.helpers import load_config
+from src.utils.logger import get_logger
+from .bitboard import get_tables
+from .game import REWARD_MERGE_WEIGHT, REWARD_TERMS
+from .heuristics import load_heuristic
+from .packed import can_slide_left, get_size_tables, slide_rows_left
+
+logger = get_logger(__name__)
+
+
+def orientations(size: int) -> np.ndarray:
+    """
+    Flat cell permutations that orient each direction as a left move, in
+    DIRECTIONS order: oriented[:, k] = flat[:, orientations(size)[action, k]]
+    """
+    cells = np.arange(size * size).reshape(size, size)
+    return np.stack([
+        cells.T.ravel(),                  # up: columns read top to bottom
+        cells[::-1].T.ravel(),            # down: columns read bottom to top
+        cells.ravel(),                    # left
+        cells[:, ::-1].ravel(),           # right
+    ])
+
+
+ORIENTATIONS = orientations(4)
+
+
+class BatchGameManager:
+    """
+    Holds N games in one array and steps them with vectorized calls.
+
+    Rows slide through lookup tables when the board size has them (see
+    ``get_size_tables``) and through ``slide_rows_left`` otherwise.
+    """
+
+    def __init__(self, num_envs: int, seed: Optional[int] = None, end_on_win: bool = True,
+                 size: Optional[int] = None):
+        """
+        Initialize the batched environment.
+
+        Args:
+            num_envs: Number of games played in parallel
+            seed: Optional seed for the tile-spawn generator
+            end_on_win: Finish a game when it reaches 2048 (False plays on until no move is left)
+            size: Board size (default environment.board_size from the config)
+        """
+        config = load_config() or {}
+        if size is None:
+            size = config.get('environment', {}).get('board_size', BOARD_SIZE)
+        if size == 4:
+            tables = get_tables()
+            tables = {name: tables[f"{name}_np"] for name in ("left", "score", "merge_log", "can_left", "can_right")}
+        else:
+            tables = get_size_tables(size)
+        self._tables = tables is not None
+        if self._tables:
+            self._left = tables["left"]
+            self._score = tables["score"]
+            self._merge_log = tables["merge_log"]
+            self._can_left = tables["can_left"]
+            self._can_right = tables["can_right"]
+        self._reward_heuristic = load_heuristic('reward', REWARD_TERMS, size=size)
+        heuristics_config = config.get('heuristics', {})
+        self._merge_weight = heuristics_config.get('reward_merge_weight', REWARD_MERGE_WEIGHT)
+
+        self.num_envs = num_envs
+        self.end_on_win = end_on_win
+        self.size = size
+        self._cells = size * size
+        self._orientations = orientations(size)
+        self._shifts = np.arange(0, 4 * size, 4, dtype=np.uint32)
+        self.rng = np.random.default_rng(seed)
+        self.exponents = np.zeros((num_envs, size, size), dtype=np.uint8)
+        self.scores = np.zeros(num_envs, dtype=np.int64)
+        self.move_counts = np.zeros(num_envs, dtype=np.int64)
+        self.best_score = 0
+        self.episodes_finished = 0
+        self.reset()
+        logger.info(f"BatchGameManager initialized with {num_envs} games")
+
+    def reset(self, env_mask: Optional[np.ndarray] = None):
+        """
+        Start new games.
+
+        Args:
+            env_mask: Boolean mask of games to reset (default all)
+        """
+        if env_mask is None:
+            env_mask = np.ones(self.num_envs, dtype=bool)
+        if not env_mask.any():
+            return
+        self.exponents[env_mask] = 0
+        self.scores[env_mask] = 0
+        self.move_counts[env_mask] = 0
+        flat = self.exponents.reshape(self.num_envs, self._cells)
+        self._spawn(flat, env_mask)
+        self._spawn(flat, env_mask)
+
+    def _spawn(self, flat: np.ndarray, env_mask: np.ndarray):
+        """Add one random tile to each selected board that has an empty cell"""
+        empty = flat == 0
+        env_mask = env_mask & empty.any(axis=1)
+        if not env_mask.any():
+            return
+        keys = self.rng.random(empty.shape)
+        keys[~empty] = -1.0
+        cells = keys.argmax(axis=1)
+        values = np.where(self.rng.random(self.num_envs) > SPAWN_PROBABILITY, 2, 1)
+        rows = np.flatnonzero(env_mask)
+        flat[rows, cells[rows]] = values[rows]
+
+    def _slide(self, flat: np.ndarray, actions: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Slide every board in its own direction, through the row tables when there are any"""
+        size = self.size
+        order = self._orientations[actions]
+        oriented = np.take_along_axis(flat, order, axis=1).reshape(-1, size, size)
+        if self._tables:
+            rows = (oriented.astype(np.uint32) << self._shifts).sum(axis=2)
+            slid = ((self._left[rows].astype(np.uint32)[..., None] >> self._shifts) & 0xF).astype(np.uint8)
+            gains = self._score[rows].sum(axis=1)
+            merge_log = self._merge_log[rows].sum(axis=1)
+        else:
+            slid, gains, merge_log = slide_rows_left(oriented.reshape(-1, size))
+            gains = gains.reshape(-1, size).sum(axis=1)
+            merge_log = merge_log.reshape(-1, size).sum(axis=1)
+
+        result = np.empty_like(flat)
+        np.put_along_axis(result, order, slid.reshape(-1, self._cells), axis=1)
+        return result, gains, merge_log
+
+    def _legal_mask(self, exponents: np.ndarray) -> np.ndarray:
+        """Compute the (N, 4) legal-action mask in DIRECTIONS order"""
+        if not self._tables:
+            size = self.size
+            columns = exponents.transpose(0, 2, 1).reshape(-1, size)
+            rows = exponents.reshape(-1, size)
+            return np.stack([
+                can_slide_left(columns).reshape(-1, size).any(axis=1),
+                can_slide_left(columns[:, ::-1]).reshape(-1, size).any(axis=1),
+                can_slide_left(rows).reshape(-1, size).any(axis=1),
+                can_slide_left(rows[:, ::-1]).reshape(-1, size).any(axis=1),
+            ], axis=1)
+        rows = (exponents.astype(np.uint32) << self._shifts).sum(axis=2)
+        columns = (exponents.transpose(0, 2, 1).astype(np.uint32) << self._shifts).sum(axis=2)
+        return np.stack([
+            self._can_left[columns].any(axis=1),
+            self._can_right[columns].any(axis=1),
+            self._can_left[rows].any(axis=1),
+            self._can_right[rows].any(axis=1),
+        ], axis=1)
+
+    def _rewards(self, exponents: np.ndarray, merge_log: np.ndarray, moved: np.ndarray,
+                 game_over: np.ndarray) -> np.ndarray:
+        """Vectorized GameManager.reward for every board"""
+        rewards = self._merge_weight * merge_log + self._reward_heuristic.evaluate_batch(exponents)
+        rewards = np.where(game_over, -10.0, np.clip(rewards, -10, 10))
+        return np.where(moved, rewards, 0.0).astype(np.float32)
+
+    def step(self, actions: Union[np.ndarray, Sequence]) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Apply one action to every game.
+
+        Args:
+            actions: N action indices (DIRECTIONS order) or direction strings
+
+        Returns:
+            tuple: (states, rewards, dones, valid_moves)
+                - states: (N, size, size) boards after the move, before auto-reset
+                - rewards: (N,) rewards, matching GameManager.step
+                - dones: (N,) whether each game was lost or won
+                - valid_moves: (N, 4) legal-action masks for ``states``
+            Finished games are reset afterwards; ``get_boards()`` and
+            ``get_valid_moves()`` return the boards to act on next.
+        """
+        actions = self._to_indices(actions)
+        flat = self.exponents.reshape(self.num_envs, self._cells)
+        result, gains, merge_log = self._slide(flat, actions)
+        moved = (result != flat).any(axis=1)
+
+        self._spawn(result, moved)
+        self.scores += np.where(moved, gains, 0)
+        self.move_counts += moved
+
+        exponents = result.reshape(-1, self.size, self.size)
+        valid_moves = self._legal_mask(exponents)
+        game_over = moved & ~valid_moves.any(axis=1)
+        dones = game_over
+        if self.end_on_win:
+            dones = dones | (moved & (exponents == 11).any(axis=(1, 2)))
+        rewards = self._rewards(exponents, merge_log, moved, game_over)
+
+        self.exponents = exponents
+        states = self.get_boards()
+        if dones.any():
+            self.best_score = max(self.best_score, int(self.scores[dones].max()))
+            self.episodes_finished += int(dones.sum())
+            self.reset(dones)
+        return states, rewards, dones, valid_moves
+
+    def afterstates(self) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Slide every current board in all four directions without spawning.
+
+        Returns:
+            tuple: (afterstates, gains, moved)
+                - afterstates: (N, 4, size * size) flat exponent boards, DIRECTIONS order
+                - gains: (N, 4) score gained by each slide
+                - moved: (N, 4) whether each slide changed the board (legal move)
+        """
+        flat = self.exponents.reshape(self.num_envs, self._cells)
+        repeated = np.repeat(flat, 4, axis=0)
+        actions = np.tile(np.arange(4), self.num_envs)
+        result, gains, _ = self._slide(repeated, actions)
+        moved = (result != repeated).any(axis=1)
+        return (result.reshape(self.num_envs, 4, self._cells), gains.reshape(self.num_envs, 4),
+                moved.reshape(self.num_envs, 4))
+
+    def _to_indices(self, actions: Union[np.ndarray, Sequence]) -> np.ndarray:
+        """Convert direction strings or indices to an index array"""
+        if len(actions) and isinstance(actions[0], str):
+            return np.array([DIRECTIONS.index(a) for a in actions], dtype=np.int64)
+        return np.asarray(actions, dtype=np.int64)
+
+    def get_boards(self) -> np.ndarray:
+        """Get the current boards as an (N, size, size) array of tile values"""
+        return np.where(self.exponents > 0, np.left_shift(1, self.exponents, dtype=np.int32), 0)
+
+    def get_valid_moves(self) -> np.ndarray:
+        """Get the (N, 4) legal-action mask of the current boards"""
+        return self._legal_mask(self.exponents)
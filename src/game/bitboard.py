@@ -0,0 +1,454 @@
+"""Packed 64-bit board engine driven by precomputed row tables"""
+
+import numpy as np
+from typing import List, Tuple, Optional
+from src.utils.constants import BOARD_SIZE, DIRECTIONS, SPAWN_PROBABILITY
+from .board import Seed
+
+# Layout: cell (row, col) is the 4-bit exponent at bit 4 * (4 * row + col),
+# so row ``r`` occupies bits 16r..16r+15 with column 0 in the lowest nibble.
+# An exponent of 0 is an empty cell, ``e`` is the tile ``2 ** e``.
+ROW_MASK = 0xFFFF
+CELL_MASK = 0xF
+MAX_EXPONENT = 15  # 32768 is the largest tile a nibble can hold
+
+_tables = None
+
+
+def _slide_row_left(cells: List[int]) -> Tuple[List[int], int, Tuple[int, ...]]:
+    """Slide and merge a row of exponents towards column 0"""
+    non_zero = [c for c in cells if c]
+    result = []
+    gain = 0
+    merged = []
+    i = 0
+    while i < len(non_zero):
+        if (i + 1 < len(non_zero) and non_zero[i] == non_zero[i + 1]
+                and non_zero[i] < MAX_EXPONENT):
+            value = 1 << (non_zero[i] + 1)
+            result.append(non_zero[i] + 1)
+            merged.append(value)
+            gain += value
+            i += 2
+        else:
+            result.append(non_zero[i])
+            i += 1
+    result += [0] * (len(cells) - len(result))
+    return result, gain, tuple(merged)
+
+
+def _row_to_column(row: int) -> int:
+    """Spread a 16-bit row into column 0 of a packed board"""
+    return ((row & 0xF) | ((row >> 4) & 0xF) << 16
+            | ((row >> 8) & 0xF) << 32 | ((row >> 12) & 0xF) << 48)
+
+
+def _build_tables():
+    """
+    Build the 65536-entry row tables.
+
+    Returns:
+        dict with ``left``/``right`` result rows, ``up``/``down`` result
+        columns, ``score`` gains, ``merged_*`` tile values, ``empty``
+        nibble offsets of the empty cells and ``can_left``/``can_right``
+        legality flags, as Python lists (fast scalar lookups), plus ``*_np`` NumPy arrays for vectorized lookups
+        (including the ``merge_log`` and ``can_left``/``can_right`` row
+        summaries used by the batched environment).
+    """
+    left = [0] * 65536
+    right = [0] * 65536
+    score = [0] * 65536
+    merged_left = [()] * 65536
+    merged_right = [()] * 65536
+    up = [0] * 65536
+    down = [0] * 65536
+    empty = [()] * 65536
+
+    for row in range(65536):
+        cells = [(row >> (4 * c)) & CELL_MASK for c in range(4)]
+
+        result, gain, merged = _slide_row_left(cells)
+        left[row] = result[0] | (result[1] << 4) | (result[2] << 8) | (result[3] << 12)
+        score[row] = gain
+        merged_left[row] = merged
+
+        result, _, merged = _slide_row_left(cells[::-1])
+        right[row] = result[3] | (result[2] << 4) | (result[1] << 8) | (result[0] << 12)
+        merged_right[row] = merged
+
+        empty[row] = tuple(4 * c for c in range(4) if not cells[c])
+
+    # Column tables: the row result spread into column 0 of a packed board,
+    # so a transposed board's rows map straight back to columns.
+    for row in range(65536):
+        up[row] = _row_to_column(left[row])
+        down[row] = _row_to_column(right[row])
+
+    return {
+        "left": left,
+        "right": right,
+        "score": score,
+        "up": up,
+        "down": down,
+        "merged_left": merged_left,
+        "merged_right": merged_right,
+        "empty": empty,
+        "can_left": [left[row] != row for row in range(65536)],
+        "can_right": [right[row] != row for row in range(65536)],
+        "left_np": np.array(left, dtype=np.uint16),
+        "right_np": np.array(right, dtype=np.uint16),
+        "score_np": np.array(score, dtype=np.int64),
+        "merge_log_np": np.array([sum(v.bit_length() - 1 for v in m) for m in merged_left],
+                                 dtype=np.float32),
+        "can_left_np": np.array(left, dtype=np.int64) != np.arange(65536),
+        "can_right_np": np.array(right, dtype=np.int64) != np.arange(65536),
+    }
+
+
+def get_tables() -> dict:
+    """Get the row tables, building them on first use"""
+    global _tables
+    if _tables is None:
+        _tables = _build_tables()
+    return _tables
+
+
+def transpose(board: int) -> int:
+    """Transpose a packed board (swap rows and columns)"""
+    a1 = board & 0xF0F00F0FF0F00F0F
+    a2 = board & 0x0000F0F00000F0F0
+    a3 = board & 0x0F0F00000F0F0000
+    a = a1 | (a2 << 12) | (a3 >> 12)
+    b1 = a & 0xFF00FF0000FF00FF
+    b2 = a & 0x00FF00FF00000000
+    b3 = a & 0x00000000FF00FF00
+    return b1 | (b2 >> 24) | (b3 << 24)
+
+
+def _apply_rows(board: int, table: list, merged_table: list, score: list) -> Tuple[int, int, List[int]]:
+    """Apply a row table to the four rows of a packed board"""
+    r0 = board & ROW_MASK
+    r1 = (board >> 16) & ROW_MASK
+    r2 = (board >> 32) & ROW_MASK
+    r3 = (board >> 48) & ROW_MASK
+    result = table[r0] | (table[r1] << 16) | (table[r2] << 32) | (table[r3] << 48)
+    gain = score[r0] + score[r1] + score[r2] + score[r3]
+    merged = []
+    if gain:
+        merged.extend(merged_table[r0])
+        merged.extend(merged_table[r1])
+        merged.extend(merged_table[r2])
+        merged.extend(merged_table[r3])
+    return result, gain, merged
+
+
+def _apply_columns(board: int, table: list, merged_table: list, score: list) -> Tuple[int, int, List[int]]:
+    """Apply a column table to the four columns of a packed board"""
+    t = transpose(board)
+    r0 = t & ROW_MASK
+    r1 = (t >> 16) & ROW_MASK
+    r2 = (t >> 32) & ROW_MASK
+    r3 = (t >> 48) & ROW_MASK
+    result = table[r0] | (table[r1] << 4) | (table[r2] << 8) | (table[r3] << 12)
+    gain = score[r0] + score[r1] + score[r2] + score[r3]
+    merged = []
+    if gain:
+        merged.extend(merged_table[r0])
+        merged.extend(merged_table[r1])
+        merged.extend(merged_table[r2])
+        merged.extend(merged_table[r3])
+    return result, gain, merged
+
+
+def move_packed(board: int, direction: str) -> Tuple[int, int, List[int]]:
+    """
+    Slide a packed board without spawning a tile.
+
+    Args:
+        board: Packed 64-bit board
+        direction: 'up', 'down', 'left', or 'right'
+
+    Returns:
+        (new board, score gain, merged tile values)
+    """
+    tables = _tables or get_tables()
+    if direction == "left":
+        return _apply_rows(board, tables["left"], tables["merged_left"], tables["score"])
+    if direction == "right":
+        return _apply_rows(board, tables["right"], tables["merged_right"], tables["score"])
+    if direction == "up":
+        return _apply_columns(board, tables["up"], tables["merged_left"], tables["score"])
+    if direction == "down":
+        return _apply_columns(board, tables["down"], tables["merged_right"], tables["score"])
+    raise ValueError(f"Invalid direction: {direction}")
+
+
+def has_empty_cell(board: int) -> bool:
+    """Check for an empty cell with a branch-free zero-nibble test"""
+    return bool((board - 0x1111111111111111) & ~board & 0x8888888888888888)
+
+
+def has_exponent(board: int, exponent: int) -> bool:
+    """Check whether any cell holds the given exponent"""
+    return has_empty_cell(board ^ (0x1111111111111111 * exponent))
+
+
+def can_slide(board: int) -> bool:
+    """Check whether any direction changes the board"""
+    if has_empty_cell(board):
+        return True
+    tables = _tables or get_tables()
+    left, right = tables["left"], tables["right"]
+    for packed in (board, transpose(board)):
+        for shift in (0, 16, 32, 48):
+            row = (packed >> shift) & ROW_MASK
+            if left[row] != row or right[row] != row:
+                return True
+    return False
+
+
+def legal_moves_mask(board: int) -> int:
+    """
+    Compute which directions change a packed board, in a single pass.
+
+    Args:
+        board: Packed 64-bit board
+
+    Returns:
+        Bitmask with bit i set when DIRECTIONS[i] is a legal move
+    """
+    tables = _tables or get_tables()
+    can_left, can_right = tables["can_left"], tables["can_right"]
+    r0 = board & ROW_MASK
+    r1 = (board >> 16) & ROW_MASK
+    r2 = (board >> 32) & ROW_MASK
+    r3 = (board >> 48) & ROW_MASK
+    t = transpose(board)
+    c0 = t & ROW_MASK
+    c1 = (t >> 16) & ROW_MASK
+    c2 = (t >> 32) & ROW_MASK
+    c3 = (t >> 48) & ROW_MASK
+    return ((can_left[c0] or can_left[c1] or can_left[c2] or can_left[c3])
+            | (can_right[c0] or can_right[c1] or can_right[c2] or can_right[c3]) << 1
+            | (can_left[r0] or can_left[r1] or can_left[r2] or can_left[r3]) << 2
+            | (can_right[r0] or can_right[r1] or can_right[r2] or can_right[r3]) << 3)
+
+
+def empty_mask(board: int) -> int:
+    """Bit 4*i is set for every empty cell i"""
+    occupied = board | (board >> 1)
+    occupied |= occupied >> 2
+    return ~occupied & 0x1111111111111111
+
+
+def spawn_tile(board: int, rng: np.random.Generator) -> int:
+    """
+    Place a random 2 (or 4) tile in an empty cell.
+
+    Draws exactly like ``Board._add_random_tile`` (one uniform value picks
+    the k-th empty cell in row-major order and, from its fraction, the
+    tile), so both engines replay the same game from the same seed.
+
+    Args:
+        board: Packed 64-bit board
+        rng: Generator for the spawn
+
+    Returns:
+        The packed board with the new tile, unchanged if it is full
+    """
+    count = empty_mask(board).bit_count()
+    if not count:
+        return board
+    draw = rng.random() * count
+    index = int(draw)
+    exponent = 2 if draw - index > SPAWN_PROBABILITY else 1
+
+    # Walk the rows' precomputed empty offsets to the index-th empty cell
+    empty = (_tables or get_tables())["empty"]
+    for shift in (0, 16, 32, 48):
+        offsets = empty[(board >> shift) & ROW_MASK]
+        if index < len(offsets):
+            break
+        index -= len(offsets)
+    return board | (exponent << (shift + offsets[index]))
+
+
+def spawn_outcomes(board: int) -> List[Tuple[int, float]]:
+    """
+    Enumerate every tile spawn on a packed board.
+
+    Args:
+        board: Packed 64-bit board (usually an afterstate from ``move_packed``)
+
+    Returns:
+        (board with the new tile, probability) for each empty cell and tile
+        value; probabilities sum to 1 unless the board is full
+    """
+    empty = (_tables or get_tables())["empty"]
+    offsets = [shift + cell for shift in (0, 16, 32, 48) for cell in empty[(board >> shift) & ROW_MASK]]
+    if not offsets:
+        return []
+    p2 = SPAWN_PROBABILITY / len(offsets)
+    p4 = (1 - SPAWN_PROBABILITY) / len(offsets)
+    outcomes = []
+    for offset in offsets:
+        outcomes.append((board | (1 << offset), p2))
+        outcomes.append((board | (2 << offset), p4))
+    return outcomes
+
+
+def pack(grid) -> int:
+    """Pack a 4x4 grid of tile values into a 64-bit integer"""
+    board = 0
+    for i, value in enumerate(np.asarray(grid, dtype=np.int64).ravel()):
+        if value:
+            board |= min(int(value).bit_length() - 1, MAX_EXPONENT) << (4 * i)
+    return board
+
+
+def unpack(board: int) -> np.ndarray:
+    """Unpack a 64-bit board into a 4x4 grid of tile values"""
+    exponents = np.array([(board >> (4 * i)) & CELL_MASK for i in range(16)], dtype=np.int32)
+    grid = np.where(exponents > 0, np.left_shift(1, exponents), 0).astype(np.int32)
+    return grid.reshape(4, 4)
+
+
+def empty_positions(board: int) -> List[int]:
+    """Get the cell indices (0-15) of all empty cells"""
+    return [i for i in range(16) if not (board >> (4 * i)) & CELL_MASK]
+
+
+class BitBoard:
+    """Drop-in replacement for ``Board`` backed by a packed 64-bit integer"""
+
+    def __init__(self, size: int = BOARD_SIZE, seed: Seed = None):
+        """
+        Initialize the packed board.
+
+        Args:
+            size: The size of the board (only 4 is supported)
+            seed: Seed or Generator for the tile spawns (see ``Board``)
+        """
+        if size != 4:
+            raise ValueError(f"BitBoard only supports 4x4 boards, got size={size}")
+        get_tables()
+        self.size = size
+        self.rng = np.random.default_rng(seed)
+        self.state = 0
+        self.previous_state: Optional[int] = None
+        self.merged_values = []
+
+        self.score = 0
+        self.move_count = 0
+        self._add_random_tile()
+        self._add_random_tile()
+
+    @property
+    def grid(self) -> np.ndarray:
+        """The board as a 4x4 array of tile values"""
+        return unpack(self.state)
+
+    @grid.setter
+    def grid(self, value):
+        self.state = pack(value)
+
+    @property
+    def previous_grid(self) -> Optional[np.ndarray]:
+        """The board before the last move, as a 4x4 array"""
+        if self.previous_state is None:
+            return None
+        return unpack(self.previous_state)
+
+    def _add_random_tile(self):
+        """Add a random tile (2 or 4) to an empty cell"""
+        self.state = spawn_tile(self.state, self.rng)
+
+    def _get_empty_cells(self) -> List[Tuple[int, int]]:
+        """Get list of all empty cells"""
+        return [divmod(i, 4) for i in empty_positions(self.state)]
+
+    def move(self, direction: str) -> bool:
+        """
+        Move tiles in the specified direction.
+
+        Args:
+            direction: 'up', 'down', 'left', or 'right'
+
+        Returns:
+            True if a move was made, False otherwise
+        """
+        self.previous_state = self.state
+        self.merged_values = []
+        try:
+            new_state, gain, merged = move_packed(self.state, direction)
+        except ValueError:
+            return False
+
+        if new_state == self.state:
+            return False
+
+        self.state = new_state
+        self.score += gain
+        self.merged_values = merged
+        self.move_count += 1
+        self._add_random_tile()
+        return True
+
+    def afterstate(self, direction: str) -> Tuple[int, int, List[int]]:
+        """Slide the board without spawning a tile: (packed board, score gain, merged values)"""
+        return move_packed(self.state, direction)
+
+    def spawn_outcomes(self, state: Optional[int] = None) -> List[Tuple[int, float]]:
+        """Every (packed board, probability) spawn on ``state`` (default the current board)"""
+        return spawn_outcomes(self.state if state is None else state)
+
+    def legal_moves_mask(self) -> int:
+        """Bitmask with bit i set when DIRECTIONS[i] is a legal move"""
+        return legal_moves_mask(self.state)
+
+    def can_move(self, direction: str) -> bool:
+        """Check if a move in the specified direction is possible"""
+        if direction not in DIRECTIONS:
+            return False
+        return bool(legal_moves_mask(self.state) >> DIRECTIONS.index(direction) & 1)
+
+    def get_neighbors(self, row: int, col: int) -> List[Tuple[int, int]]:
+        """Get valid neighbor positions for a given cell"""
+        neighbors = []
+        for dr, dc in [(-1, 0), (1, 0), (0, -1), (0, 1)]:
+            r, c = row + dr, col + dc
+            if 0 <= r < self.size and 0 <= c < self.size:
+                neighbors.append((r, c))
+        return neighbors
+
+    def is_game_over(self) -> bool:
+        """Check if the game is over (no more moves possible)"""
+        return not can_slide(self.state)
+
+    def has_won(self) -> bool:
+        """Check if the player has reached 2048"""
+        return has_exponent(self.state, 11)
+
+    def get_grid(self) -> List[List[int]]:
+        """Get a copy of the current grid as list of lists"""
+        return unpack(self.state).tolist()
+
+    def reset(self):
+        """Reset the board for a new game"""
+        self.state = 0
+        self.score = 0
+        self.move_count = 0
+        self._add_random_tile()
+        self._add_random_tile()
+
+    def get_previous_grid(self) -> Optional[List[List[int]]]:
+        """Get the previous grid state as list of lists"""
+        if self.previous_state is not None:
+            return unpack(self.previous_state).tolist()
+        return None
+
+    def grid_changed(self) -> bool:
+        """Check if the grid has changed since the last move"""
+        if self.previous_state is None:
+            return True
+        return self.state != self.previous_state
@@ -1,25 +1,30 @@
 """Board class managing the game grid"""
 
-import random
 import numpy as np
-from typing import List, Tuple, Optional
-from src.utils.constants import BOARD_SIZE, SPAWN_TILE_VALUES, SPAWN_PROBABILITY
+from typing import List, Tuple, Optional, Union
+from src.utils.constants import BOARD_SIZE, DIRECTIONS, SPAWN_TILE_VALUES, SPAWN_PROBABILITY
 from src.utils.logger import get_logger
 from .tile import Tile
 
 logger = get_logger(__name__)
 
+# Anything np.random.default_rng accepts: None (fresh entropy), an int, a SeedSequence or a Generator
+Seed = Optional[Union[int, np.random.SeedSequence, np.random.Generator]]
+
 class Board:
     """Manages the 2048 game board"""
     
-    def __init__(self, size: int = BOARD_SIZE):
+    def __init__(self, size: int = BOARD_SIZE, seed: Seed = None):
         """
         Initialize the game board.
         
         Args:
             size: The size of the board (default 4x4)
+            seed: Seed or Generator for the tile spawns; the same seed and
+                moves replay the same game
         """
         self.size = size
+        self.rng = np.random.default_rng(seed)
         self.grid: np.ndarray = np.zeros((size, size), dtype=np.int32)
         self.previous_grid: Optional[np.ndarray] = None
         self.merged_values = []
@@ -31,16 +36,18 @@ class Board:
     
     def _add_random_tile(self):
         """Add a random tile (2 or 4) to an empty cell"""
-        empty_cells = self._get_empty_cells()
+        empty_cells = np.flatnonzero(self.grid == 0)
         
-        if not empty_cells:
+        if not len(empty_cells):
             logger.warning("No empty cells available")
             return
         
-        row, col = random.choice(empty_cells)
-        value = 4 if random.random() > SPAWN_PROBABILITY else 2
-        self.grid[row][col] = value
-        logger.debug(f"Added tile with value {value} at ({row}, {col})")
+        # One draw picks the cell (integer part) and the value (fraction)
+        draw = self.rng.random() * len(empty_cells)
+        index = int(draw)
+        value = 4 if draw - index > SPAWN_PROBABILITY else 2
+        self.grid.flat[empty_cells[index]] = value
+        logger.debug(f"Added tile with value {value} at {divmod(int(empty_cells[index]), self.size)}")
     
     def _get_empty_cells(self) -> List[Tuple[int, int]]:
         """Get list of all empty cells"""
@@ -57,79 +64,87 @@ class Board:
         Returns:
             True if a move was made, False otherwise
         """
-        # Storing
-        old_grid = self.grid.copy()
-        
         # Store previous grid state
-        self.previous_grid = old_grid
+        self.previous_grid = self.grid.copy()
         
         # Reset merged values
         self.merged_values = []
         
-        if direction == "up":
-            self._move_up()
-        elif direction == "down":
-            self._move_down()
-        elif direction == "left":
-            self._move_left()
-        elif direction == "right":
-            self._move_right()
-        else:
+        try:
+            new_grid, gain, merged = self.afterstate(direction)
+        except ValueError:
             logger.warning(f"Invalid direction: {direction}")
             return False
         
         # Check if board changed
-        if not np.array_equal(old_grid, self.grid):
+        if not np.array_equal(new_grid, self.grid):
+            self.grid = new_grid
+            self.score += gain
+            self.merged_values = merged
             self.move_count += 1
             self._add_random_tile()
             return True
         
         return False
     
-    def _move_left(self):
-        """Move tiles to the left"""
-        for i in range(self.size):
-            self.grid[i] = self._compress_and_merge(self.grid[i])
-    
-    def _move_right(self):
-        """Move tiles to the right"""
+    def afterstate(self, direction: str) -> Tuple[np.ndarray, int, List[int]]:
+        """
+        Slide the board without spawning a tile or changing this Board.
+        
+        Args:
+            direction: 'up', 'down', 'left', or 'right'
+            
+        Returns:
+            (new grid, score gain, merged tile values)
+        """
+        if direction not in DIRECTIONS:
+            raise ValueError(f"Invalid direction: {direction}")
+        
+        # Orient the grid so every direction is a left slide
+        transposed = direction in ("up", "down")
+        reversed_lines = direction in ("down", "right")
+        grid = np.asarray(self.grid)
+        lines = grid.T if transposed else grid
+        if reversed_lines:
+            lines = lines[:, ::-1]
+        
+        result = np.zeros_like(lines)
+        gain = 0
+        merged = []
         for i in range(self.size):
-            self.grid[i] = self._compress_and_merge(self.grid[i][::-1])[::-1]
-    
-    def _move_up(self):
-        """Move tiles up"""
-        for j in range(self.size):
-            column = self.grid[:, j].copy()
-            self.grid[:, j] = self._compress_and_merge(column)
-    
-    def _move_down(self):
-        """Move tiles down"""
-        for j in range(self.size):
-            column = self.grid[:, j].copy()
-            self.grid[:, j] = self._compress_and_merge(column[::-1])[::-1]
+            line, line_gain, line_merged = self._compress_and_merge(lines[i])
+            result[i] = line
+            gain += line_gain
+            merged.extend(line_merged)
+        
+        if reversed_lines:
+            result = result[:, ::-1]
+        if transposed:
+            result = result.T
+        return np.ascontiguousarray(result), gain, merged
     
-    def _compress_and_merge(self, line: np.ndarray) -> np.ndarray:
+    def _compress_and_merge(self, line: np.ndarray) -> Tuple[np.ndarray, int, List[int]]:
         """
-        Compress and merge a line.
+        Compress and merge a line towards its start.
         
         Args:
             line: A row or column of the board
             
         Returns:
-            The processed line as numpy array
+            (processed line, score gain, merged tile values)
         """
         # Remove zeros
         non_zero = line[line != 0]
         
         # Merge adjacent equal values
         merged = []
+        merged_values = []
         i = 0
         while i < len(non_zero):
             if i + 1 < len(non_zero) and non_zero[i] == non_zero[i + 1]:
                 merged_value = int(non_zero[i] * 2)
-                self.merged_values.append(merged_value)
+                merged_values.append(merged_value)
                 merged.append(merged_value)
-                self.score += merged_value
                 i += 2
             else:
                 merged.append(int(non_zero[i]))
@@ -138,14 +153,57 @@ class Board:
         # Pad with zeros
         result = np.zeros(self.size, dtype=np.int32)
         result[:len(merged)] = merged
-        return result
+        return result, sum(merged_values), merged_values
+    
+    def spawn_outcomes(self, grid: Optional[np.ndarray] = None) -> List[Tuple[np.ndarray, float]]:
+        """
+        Enumerate every tile spawn on a grid (an afterstate by default the current one).
+        
+        Args:
+            grid: Grid to spawn on (default the current grid)
+            
+        Returns:
+            (grid with the new tile, probability) for each empty cell and
+            tile value; probabilities sum to 1 unless the grid is full
+        """
+        grid = np.asarray(self.grid if grid is None else grid)
+        empty_cells = np.argwhere(grid == 0)
+        outcomes = []
+        for row, col in empty_cells:
+            for value, probability in zip(SPAWN_TILE_VALUES, (SPAWN_PROBABILITY, 1 - SPAWN_PROBABILITY)):
+                outcome = grid.copy()
+                outcome[row, col] = value
+                outcomes.append((outcome, probability / len(empty_cells)))
+        return outcomes
+    
+    def legal_moves_mask(self) -> int:
+        """
+        Compute which directions change the board, in a single pass.
+        
+        Returns:
+            Bitmask with bit i set when DIRECTIONS[i] is a legal move
+        """
+        grid = np.asarray(self.grid)
+        empty = grid == 0
+        row_merge = ((grid[:, :-1] == grid[:, 1:]) & ~empty[:, 1:]).any()
+        col_merge = ((grid[:-1] == grid[1:]) & ~empty[1:]).any()
+        
+        mask = 0
+        if col_merge or (empty[:-1] & ~empty[1:]).any():
+            mask |= 1  # up
+        if col_merge or (~empty[:-1] & empty[1:]).any():
+            mask |= 2  # down
+        if row_merge or (empty[:, :-1] & ~empty[:, 1:]).any():
+            mask |= 4  # left
+        if row_merge or (~empty[:, :-1] & empty[:, 1:]).any():
+            mask |= 8  # right
+        return mask
     
     def can_move(self, direction: str) -> bool:
         """Check if a move in the specified direction is possible"""
-        test_board = Board(self.size)
-        test_board.grid = self.grid.copy()
-        moved = test_board.move(direction)
-        return moved
+        if direction not in DIRECTIONS:
+            return False
+        return bool(self.legal_moves_mask() >> DIRECTIONS.index(direction) & 1)
     
     def get_neighbors(self, row: int, col: int) -> List[Tuple[int, int]]:
         """Get valid neighbor positions for a given cell"""
@@ -205,3 +263,37 @@ class Board:
         if self.previous_grid is None:
             return True
         return not np.array_equal(self.grid, self.previous_grid)
+
+
+ENGINES = ("numpy", "bitboard")
+
+
+def create_board(engine: str = "numpy", size: int = BOARD_SIZE, seed: Seed = None):
+    """
+    Create a board using the requested engine.
+    
+    Both engines consume the generator the same way, so a seed replays the
+    same game on either. The packed engine is the 64-bit BitBoard at size 4
+    and a PackedBoard on its own row tables for other sizes up to
+    TABLE_MAX_SIZE; larger boards fall back to the NumPy Board.
+    
+    Args:
+        engine: 'numpy' for the reference Board, 'bitboard' for the packed engine
+        size: The size of the board
+        seed: Seed or Generator for the tile spawns
+        
+    Returns:
+        A Board, BitBoard or PackedBoard instance
+    """
+    if engine == "numpy":
+        return Board(size, seed)
+    if engine == "bitboard":
+        if size == 4:
+            from .bitboard import BitBoard
+            return BitBoard(size, seed)
+        from .packed import TABLE_MAX_SIZE, PackedBoard
+        if size <= TABLE_MAX_SIZE:
+            return PackedBoard(size, seed)
+        logger.info(f"No row tables for {size}x{size} boards; using the numpy engine")
+        return Board(size, seed)
+    raise ValueError(f"Unknown board engine: {engine}")
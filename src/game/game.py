@@ -3,22 +3,62 @@ import numpy as np
 
 
 from typing import Optional
-from src.utils.helpers import find_empty_cells
+from src.utils.constants import BOARD_SIZE, WINNING_TILE
+from src.utils.helpers import find_empty_cells, load_config, mask_to_list
 from src.utils.logger import get_logger
-from .board import Board
+from .board import Seed, create_board
+from .heuristics import load_heuristic
+from .history import GameHistory
 
 
 logger = get_logger(__name__)
 
+# Default board terms of the reward: empty cells and the snake-pattern corner weights
+REWARD_TERMS = {'empty': 0.5, 'snake': 0.01}
+# Default reward per log2 of each tile merged by the move
+REWARD_MERGE_WEIGHT = 0.1
+
 class GameManager:
     """Manages the overall game state and logic"""
     
-    def __init__(self):
-        """Initialize the game manager"""
-        self.board = Board()
+    def __init__(self, engine: Optional[str] = None, seed: Seed = None, size: Optional[int] = None,
+                 database=None, agent_id: str = "human", checkpoint_id: Optional[str] = None):
+        """
+        Initialize the game manager.
+        
+        Args:
+            engine: Board engine ('numpy' or 'bitboard'). Defaults to
+                environment.engine from the config.
+            seed: Seed or Generator for the tile spawns. Every game of this
+                manager draws from the same stream, so a seed plus the moves
+                played reproduces them exactly.
+            size: Board size. Defaults to environment.board_size from the config.
+            database: Optional GameDatabase (see ``open_database``) that
+                stores every finished game and seeds ``best_score``
+            agent_id: Player name stored with the games
+            checkpoint_id: Model the agent played with, stored with the games
+        """
+        environment_config = (load_config() or {}).get('environment', {})
+        if engine is None:
+            engine = environment_config.get('engine', 'numpy')
+        if size is None:
+            size = environment_config.get('board_size', BOARD_SIZE)
+        self.engine = engine
+        self.board = create_board(engine, size, seed=seed)
         self.is_game_over = False
         self.is_won = False
         self.best_score = 0
+        self.reward_heuristic = load_heuristic('reward', REWARD_TERMS, size=size)
+        heuristics_config = (load_config() or {}).get('heuristics', {})
+        self.merge_weight = heuristics_config.get('reward_merge_weight', REWARD_MERGE_WEIGHT)
+        history_size = environment_config.get('history_size', 100000)
+        self.history = GameHistory(history_size, self.board) if history_size else None
+        self.database = database
+        self.agent_id = agent_id
+        self.checkpoint_id = checkpoint_id
+        self._stored = False
+        if database is not None:
+            self.best_score = database.best_score(board_size=size)
         logger.info("GameManager initialized")
     
     def start_new_game(self):
@@ -26,9 +66,13 @@ class GameManager:
         if self.board.score > self.best_score:
             self.best_score = self.board.score
         
+        self._store_game()
+        self._stored = False
         self.board.reset()
         self.is_game_over = False
         self.is_won = False
+        if self.history is not None:
+            self.history.reset(self.board)
         logger.info(f"New game started. Best score: {self.best_score}")
     
     def handle_move(self, direction: str) -> bool:
@@ -48,6 +92,9 @@ class GameManager:
         moved = self.board.move(direction)
         
         if moved:
+            if self.history is not None:
+                self.history.record(self.board)
+            
             # Check win condition
             if self.board.has_won():
                 self.is_won = True
@@ -56,6 +103,7 @@ class GameManager:
             # Check game over condition
             if self.board.is_game_over():
                 self.is_game_over = True
+                self._store_game()
                 logger.info(f"Game Over! Final score: {self.board.score}")
         
         return moved
@@ -72,15 +120,97 @@ class GameManager:
         """Get the current board grid"""
         return self.board.get_grid()
     
-    def undo(self):
-        """Undo the last move (if implemented)"""
-        logger.info("Undo not yet implemented")
+    def get_state(self) -> dict:
+        """
+        Snapshot of the current game as a JSON-serializable dict (see
+        SaveManager and Autosaver); ``load_state`` resumes it, spawns included.
+        """
+        return {
+            "size": self.board.size,
+            "grid": self.board.get_grid(),
+            "score": int(self.board.score),
+            "best_score": int(self.best_score),
+            "move_count": int(self.board.move_count),
+            "is_won": self.is_won,
+            "is_game_over": self.is_game_over,
+            "rng": self.board.rng.bit_generator.state,
+        }
+    
+    def load_state(self, state: dict):
+        """
+        Resume a game saved by ``get_state``.
+        
+        Raises:
+            ValueError: if the save is for another board size
+        """
+        if state["size"] != self.board.size:
+            raise ValueError(f"Save is for a {state['size']}x{state['size']} board, this game is {self.board.size}x{self.board.size}")
+        self.board.grid = np.array(state["grid"], dtype=np.int32)
+        self.board.score = state["score"]
+        self.board.move_count = state["move_count"]
+        self.board.merged_values = []
+        if state.get("rng", {}).get("bit_generator") == self.board.rng.bit_generator.state["bit_generator"]:
+            self.board.rng.bit_generator.state = state["rng"]
+        self.best_score = max(self.best_score, state.get("best_score", 0))
+        self.is_won = state.get("is_won", False)
+        self.is_game_over = state.get("is_game_over", False)
+        # A lost game was stored when it ended
+        self._stored = self.is_game_over
+        if self.history is not None:
+            self.history.reset(self.board)
+        logger.info(f"Game loaded at move {self.board.move_count}")
+    
+    def undo(self) -> bool:
+        """
+        Undo the last move, restoring the board, score and spawn generator.
+        
+        Returns:
+            True if a move was undone, False when the history is empty or disabled
+        """
+        if self.history is None or not self.history.undo(self.board):
+            logger.info("Nothing to undo")
+            return False
+        self._refresh_status()
+        return True
+    
+    def redo(self) -> bool:
+        """
+        Replay the last undone move (with the same tile spawn).
+        
+        Returns:
+            True if a move was redone, False when there is nothing to redo
+        """
+        if self.history is None or not self.history.redo(self.board):
+            logger.info("Nothing to redo")
+            return False
+        self._refresh_status()
+        return True
+    
+    def _refresh_status(self):
+        """Recompute the won / game over flags after the board was restored"""
+        self.is_won = self.board.has_won()
+        self.is_game_over = self.board.is_game_over()
+    
+    def _store_game(self):
+        """Queue the current game in the database once (games without a move are skipped)"""
+        if self.database is None or self._stored or self.board.move_count == 0:
+            return
+        self._stored = True
+        grid = self.board.get_grid()
+        max_tile = max(max(row) for row in grid)
+        self.database.add_game(score=self.board.score, max_tile=max_tile, moves=self.board.move_count,
+                               board_size=self.board.size, agent=self.agent_id, checkpoint=self.checkpoint_id,
+                               won=max_tile >= WINNING_TILE, final_grid=grid)
     
     def restart(self):
         """Restart the current game"""
+        self._store_game()
+        self._stored = False
         self.board.reset()
         self.is_game_over = False
         self.is_won = False
+        if self.history is not None:
+            self.history.reset(self.board)
         logger.info("Game restarted")
     
     def step(self, action: str) -> tuple:
@@ -91,11 +221,12 @@ class GameManager:
             action: 'up', 'down', 'left', or 'right'
             
         Returns:
-            tuple: (state, reward, done, info)
+            tuple: (state, reward, done, valid_mask)
                 - state: Current board state as list
                 - reward: Reward from this action
                 - done: Whether the game is over or won
-                - info: Additional info (score, etc.)
+                - valid_mask: Legal-move bitmask of the new state
+                  (bit i for DIRECTIONS[i]), 0 once the game is done
         """
         # Make the move
         moved = self.handle_move(action)
@@ -109,116 +240,31 @@ class GameManager:
         # Ending condition
         done = self.is_game_over or self.is_won
         
-        # 
-        return state, reward, done
+        # Legal moves of the new state, reused by the agent and replay buffer
+        valid_mask = 0 if done else self.board.legal_moves_mask()
+        return state, reward, done, valid_mask
+    
+    def get_valid_mask(self) -> int:
+        """Get the legal-move bitmask of the current state (bit i for DIRECTIONS[i])"""
+        return self.board.legal_moves_mask()
     
     def get_valid_moves(self) -> list:
         """Get a list of valid moves from the current state"""
-        valid_moves = []
-        for direction in ['up', 'down', 'left', 'right']:
-            valid_moves.append(self.board.can_move(direction))
-        return valid_moves
+        return mask_to_list(self.board.legal_moves_mask())
 
 
-    def reward(self):
-        # Si le jeu est fini, grosse pénalité
+    def reward(self) -> float:
+        """
+        Reward of the current board: a bonus per log2 of each merged tile
+        plus the ``heuristics.reward`` board terms, clipped to [-10, 10];
+        -10 once the game is lost.
+        """
         if self.is_game_over:
             return -10.0
-
-        grid = self.board.grid
-        reward = 0.0
-        
-        # 1. RÉCOMPENSE DE FUSION (Basée sur les tuiles fusionnées au dernier tour)
-        # On utilise log2 pour ne pas écraser les autres récompenses avec des chiffres énormes
-        if self.board.merged_values:
-            reward += 0.1 * sum([np.log2(v) for v in self.board.merged_values])
-
-        # 2. BONUS DE CASES VIDES
-        # Plus il y a de vide, plus l'agent est récompensé (croissance non-linéaire)
-        empty_cells = len(self.board._get_empty_cells())
-        if empty_cells > 0:
-            reward += 0.5 * empty_cells # Bonus constant par case vide
-
-        # 3. MONOTONIE (Alignement des tuiles)
-        # On vérifie si les valeurs augmentent ou diminuent de manière constante
-        # monotonicity = 0
-        # # Lignes
-        # for i in range(4):
-        #     row = grid[i, :]
-        #     # On ne compte que les cases non vides pour la monotonie
-        #     values = row[row != 0]
-        #     if len(values) > 1:
-        #         diffs = np.diff(np.log2(values))
-        #         if np.all(diffs <= 0) or np.all(diffs >= 0): # Trié dans un sens
-        #             monotonicity += sum(np.abs(diffs))
-        # # Colonnes
-        # for j in range(4):
-        #     col = grid[:, j]
-        #     values = col[col != 0]
-        #     if len(values) > 1:
-        #         diffs = np.diff(np.log2(values))
-        #         if np.all(diffs <= 0) or np.all(diffs >= 0):
-        #             monotonicity += sum(np.abs(diffs))
-        
-        # reward += 0.1 * monotonicity
-
-        # # 4. MATRICE DE POIDS (Stratégie du coin)
-        # # On veut inciter l'IA à mettre les grosses tuiles en haut à gauche
-        # weights = np.array([
-        #     [100, 50, 20, 10],
-        #     [50,  20, 10,  5],
-        #     [20,  10,  5,  2],
-        #     [10,   5,  2,  1]
-        # ])
-        
-        snake_weights =  np.log2(np.array([
-            [65536, 32768, 16384, 8192],
-            [512, 1024, 2048, 4096],
-            [256, 128, 64, 32],
-            [2, 4, 8, 16]
-        ]))
-        
-        # On multiplie log2(tuile) par le poids de sa position
-        weighted_sum = 0
-        # np.sum(np.sum(np.log2(grid) * snake_weights, axis=0))
-        for i in range(4):
-            for j in range(4):
-                if grid[i][j] > 0:
-                    weighted_sum += np.log2(grid[i][j]) * snake_weights[i][j]
-        
-        reward += 0.01 * weighted_sum
-        # print("Reward:", reward)
-        return np.clip(reward, -10, 10)
-    
-    # def reward(self) -> int:
-    #     """Calculate reward based on current board state"""
-    #     # Monotonie
-    #     # monotonity_reward = ...
-        
-    #     # Empty Cell Reward
-    #     empty_reward = len(self.board._get_empty_cells())
-        
-    #     # Weighted
-    #     weights = np.array([[65536, 32768, 16384, 8192],
-    #                         [512, 1024, 2048, 4096],
-    #                         [256, 128, 64, 32],
-    #                         [2, 4, 8, 16]])
-    #     fusion_reward = np.sum(np.log2(weights * (self.board.grid + 1)))
-        
-    #     # Smoothness 
-    #     smoothness_reward = 0
-    #     for i in range(self.board.size):
-    #         for j in range(self.board.size):
-    #             if self.board.grid[i][j] != 0:
-    #                 value = np.log2(self.board.grid[i][j])
-    #                 for neighbor in self.board.get_neighbors(i, j):
-    #                     n_value = np.log2(self.board.grid[neighbor[0]][neighbor[1]]) if self.board.grid[neighbor[0]][neighbor[1]] != 0 else 0
-    #                     smoothness_reward += abs(value - n_value)
-        
-    #     # End of game penalty
-    #     end_penalty = -10 if self.is_game_over else 0
         
-    #     # Total reward
-    #     total_reward = int(0.1 * fusion_reward + 0.5 * empty_reward - 0.1 * smoothness_reward + end_penalty) / 16
-    #     # print(f"Total Reward: {total_reward} | Fusion: {fusion_reward} | Empty: {empty_reward} | Smoothness: {smoothness_reward} | End Penalty: {end_penalty}")
-    #     return total_reward * 2
\ No newline at end of file
+        reward = self.merge_weight * sum(int(v).bit_length() - 1 for v in self.board.merged_values)
+        if hasattr(self.board, "state"):
+            reward += self.reward_heuristic.evaluate_packed(self.board.state)
+        else:
+            reward += self.reward_heuristic.evaluate(self.board.grid)
+        return max(-10.0, min(10.0, reward))
@@ -0,0 +1,216 @@
+"""Table-driven board heuristics shared by the reward and the search agents"""
+
+from typing import Dict, Optional
+
+import numpy as np
+
+from src.utils.constants import BOARD_SIZE
+from src.utils.helpers import load_config
+from .bitboard import pack, transpose
+
+# Boards up to this many cells per row get folded per-row tables (16 ** size
+# entries each); wider boards are scored directly from their exponents
+TABLE_MAX_SIZE = 4
+
+
+def snake_weights(size: int) -> np.ndarray:
+    """
+    log2 of the snake-pattern corner weights: size * size at the top-left
+    cell, then one less per step along rows that alternate direction.
+    """
+    weights = np.arange(size * size, 0, -1, dtype=np.float64).reshape(size, size)
+    weights[1::2] = weights[1::2, ::-1]
+    return weights
+
+
+# log2 of the snake-pattern corner weights used by the reward
+SNAKE_WEIGHTS = snake_weights(4)
+
+# Terms scored on rows and on columns (patterns along a line)
+LINE_TERMS = ("merges", "monotonicity", "smoothness")
+# Terms scored on rows only (per-cell quantities that columns would count twice)
+CELL_TERMS = ("empty", "sum", "snake")
+TERMS = LINE_TERMS + CELL_TERMS
+
+_term_cache: Dict[tuple, Dict[str, np.ndarray]] = {}
+_heuristic_cache: Dict[tuple, "Heuristic"] = {}
+
+
+def _line_terms(rows: np.ndarray, monotonicity_power: float, sum_power: float) -> Dict[str, np.ndarray]:
+    """Raw terms of (M, N) rows of exponents: merges, monotonicity, smoothness, empty and sum"""
+    cells = np.asarray(rows, dtype=np.float64)
+    filled = cells != 0
+    # Tiles in order once the zeros are gone
+    order = np.argsort(~filled, axis=1, kind="stable")
+    tiles = np.take_along_axis(cells, order, axis=1)
+    adjacent = (tiles[:, :-1] != 0) & (tiles[:, 1:] != 0)
+
+    # Merge potential: tiles in runs of equal neighbours, once the zeros are gone
+    equal = adjacent & (tiles[:, :-1] == tiles[:, 1:])
+    padding = np.zeros((len(cells), 1), dtype=bool)
+    merges = (np.hstack([padding, equal]) | np.hstack([equal, padding])).sum(axis=1)
+
+    # Monotonicity penalty: the smaller of the increasing and decreasing violations
+    steps = np.diff(cells ** monotonicity_power, axis=1)
+    monotonicity = np.minimum(np.maximum(steps, 0).sum(axis=1), np.maximum(-steps, 0).sum(axis=1))
+
+    smoothness = np.where(adjacent, np.abs(np.diff(tiles, axis=1)), 0).sum(axis=1)
+    return {
+        "merges": merges.astype(np.float64),
+        "monotonicity": monotonicity,
+        "smoothness": smoothness,
+        "empty": (~filled).sum(axis=1).astype(np.float64),
+        "sum": (cells ** sum_power).sum(axis=1),
+    }
+
+
+def get_term_tables(monotonicity_power: float = 4.0, sum_power: float = 3.5,
+                    size: int = 4) -> Dict[str, np.ndarray]:
+    """
+    Get the raw 16 ** size entry term tables for the given powers, building them on first use.
+
+    Returns:
+        Mapping of term name to a float64 table indexed by a packed row;
+        ``snake`` is (size, 16 ** size), one table per row index
+    """
+    key = (monotonicity_power, sum_power, size)
+    if key not in _term_cache:
+        codes = np.arange(16 ** size, dtype=np.int64)
+        rows = (codes[:, None] >> np.arange(0, 4 * size, 4)) & 0xF
+        tables = _line_terms(rows, monotonicity_power, sum_power)
+        tables["snake"] = snake_weights(size) @ rows.T.astype(np.float64)
+        _term_cache[key] = tables
+    return _term_cache[key]
+
+
+class Heuristic:
+    """
+    Weighted sum of board terms, folded into one lookup per row and column.
+
+    Line terms (merges, monotonicity, smoothness) are scored on every row
+    and every column; cell terms (empty, sum, snake) on the rows only.
+    Monotonicity, smoothness and sum are non-negative magnitudes, so they
+    take negative weights to act as penalties. Boards wider than
+    TABLE_MAX_SIZE are scored term by term instead of through tables.
+    """
+
+    def __init__(self, weights: Dict[str, float], constant: float = 0.0,
+                 monotonicity_power: float = 4.0, sum_power: float = 3.5, size: int = BOARD_SIZE):
+        """
+        Build the combined tables.
+
+        Args:
+            weights: Weight per term name (see TERMS); missing terms weigh 0
+            constant: Added to every evaluation
+            monotonicity_power: Exponent applied to tile exponents in the monotonicity term
+            sum_power: Exponent applied to tile exponents in the sum term
+            size: Board size
+        """
+        unknown = set(weights) - set(TERMS)
+        if unknown:
+            raise ValueError(f"Unknown heuristic terms: {sorted(unknown)}")
+        self.weights = dict(weights)
+        self.constant = constant
+        self.size = size
+        self.monotonicity_power = monotonicity_power
+        self.sum_power = sum_power
+        self.snake = snake_weights(size)
+        self.row_tables = None
+        self.column_table = None
+        if size > TABLE_MAX_SIZE:
+            return
+
+        terms = get_term_tables(monotonicity_power, sum_power, size)
+        entries = 16 ** size
+        line = sum((weights.get(name, 0.0) * terms[name] for name in LINE_TERMS), np.zeros(entries))
+        cells = sum((weights.get(name, 0.0) * terms[name] for name in ("empty", "sum")), np.zeros(entries))
+        # Row i table: line terms, cell terms and the snake weights of row i
+        self.row_tables = line + cells + weights.get("snake", 0.0) * terms["snake"]
+        self.column_table = line
+        self._shifts = np.arange(0, 4 * size, 4, dtype=np.uint32)
+
+        # Plain lists index faster than arrays with Python ints
+        self._rows = [table.tolist() for table in self.row_tables]
+        self._columns = self.column_table.tolist()
+
+    def evaluate_packed(self, board: int) -> float:
+        """Evaluate a packed 64-bit 4x4 board"""
+        r0, r1, r2, r3 = self._rows
+        columns = self._columns
+        t = transpose(board)
+        return (self.constant + r0[board & 0xFFFF] + r1[(board >> 16) & 0xFFFF]
+                + r2[(board >> 32) & 0xFFFF] + r3[(board >> 48) & 0xFFFF]
+                + columns[t & 0xFFFF] + columns[(t >> 16) & 0xFFFF]
+                + columns[(t >> 32) & 0xFFFF] + columns[(t >> 48) & 0xFFFF])
+
+    def evaluate_batch(self, exponents: np.ndarray) -> np.ndarray:
+        """
+        Evaluate boards of exponents.
+
+        Args:
+            exponents: (N, size, size) or (size, size) exponents
+
+        Returns:
+            (N,) float64 values (a 0-d array for a single board)
+        """
+        exponents = np.asarray(exponents)
+        single = exponents.ndim == 2
+        size = self.size
+        boards = exponents.reshape(-1, size, size)
+        if self.row_tables is None:
+            values = self.constant + self._evaluate_terms(boards)
+        else:
+            boards = boards.astype(np.uint32)
+            rows = (boards << self._shifts).sum(axis=2)
+            columns = (boards.transpose(0, 2, 1) << self._shifts).sum(axis=2)
+            values = (self.constant + self.row_tables[np.arange(size), rows].sum(axis=1)
+                      + self.column_table[columns].sum(axis=1))
+        return values[0] if single else values
+
+    def _evaluate_terms(self, boards: np.ndarray) -> np.ndarray:
+        """Weighted terms of (N, size, size) exponent boards, without tables"""
+        count, size = len(boards), self.size
+        rows = _line_terms(boards.reshape(-1, size), self.monotonicity_power, self.sum_power)
+        columns = _line_terms(boards.transpose(0, 2, 1).reshape(-1, size),
+                              self.monotonicity_power, self.sum_power)
+        values = np.zeros(count)
+        for name in LINE_TERMS:
+            weight = self.weights.get(name, 0.0)
+            values += weight * (rows[name] + columns[name]).reshape(count, size).sum(axis=1)
+        for name in ("empty", "sum"):
+            values += self.weights.get(name, 0.0) * rows[name].reshape(count, size).sum(axis=1)
+        return values + self.weights.get("snake", 0.0) * (boards * self.snake).sum(axis=(1, 2))
+
+    def evaluate(self, grid) -> float:
+        """Evaluate a size x size grid of tile values"""
+        if self.size == 4:
+            return self.evaluate_packed(pack(grid))
+        grid = np.asarray(grid, dtype=np.int64)
+        exponents = np.log2(np.maximum(grid, 1)).astype(np.uint8)
+        return float(self.evaluate_batch(exponents))
+
+
+def load_heuristic(name: str, defaults: Optional[Dict[str, float]] = None, constant: float = 0.0,
+                   size: int = BOARD_SIZE) -> Heuristic:
+    """
+    Build the heuristic configured under ``heuristics.<name>`` in config.yaml.
+
+    Args:
+        name: Config section (e.g. 'reward' or 'expectimax')
+        defaults: Weights used when the section is missing
+        constant: Constant used when the section sets none
+        size: Board size
+
+    Returns:
+        The Heuristic (shared per name and size); a ``constant`` key in the
+        section becomes its constant
+    """
+    key = (name, size)
+    if key not in _heuristic_cache:
+        heuristics_config = (load_config() or {}).get('heuristics', {})
+        weights = dict(heuristics_config.get(name, defaults or {}))
+        constant = weights.pop('constant', constant)
+        _heuristic_cache[key] = Heuristic(weights, constant,
+                                          monotonicity_power=heuristics_config.get('monotonicity_power', 4.0),
+                                          sum_power=heuristics_config.get('sum_power', 3.5), size=size)
+    return _heuristic_cache[key]
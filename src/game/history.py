@@ -0,0 +1,148 @@
+"""Bounded undo/redo history of compact board snapshots"""
+
+from typing import List, Optional
+
+import numpy as np
+
+
+class GameHistory:
+    """
+    Ring buffer of snapshots taken after every move of one board.
+
+    A snapshot is the packed board (8 bytes on the 64-bit engine, one nibble
+    per cell on PackedBoard, one exponent byte per cell on the NumPy Board),
+    the score, the move count and the spawn generator's state, so restoring
+    one replays the same spawns from there. PCG64 states are kept as two
+    64-bit words (about 40 bytes per 4x4 snapshot in total); other bit
+    generators fall back to their state dicts.
+
+    Positions are absolute: ``start`` is the oldest snapshot still held and
+    ``cursor`` the current one. Undo and redo move the cursor; recording
+    after an undo drops the redo tail, so play branches from that point.
+    Once ``capacity`` snapshots are held the oldest are overwritten.
+    """
+
+    def __init__(self, capacity: int, board):
+        """
+        Allocate the buffer and record the board as the first snapshot.
+
+        Args:
+            capacity: Snapshots kept (at least 1)
+            board: Board, BitBoard or PackedBoard whose moves are recorded
+        """
+        self.capacity = max(1, int(capacity))
+        if hasattr(board, "state"):
+            self._width = 8
+        elif hasattr(board, "packed"):
+            self._width = (board.size * board.size + 1) // 2
+        else:
+            self._width = board.size * board.size
+        self._boards = np.zeros((self.capacity, self._width), dtype=np.uint8)
+        # 64-bit boards go in as one word each
+        self._words = self._boards.view("<u8")[:, 0] if self._width == 8 else None
+        self._scores = np.zeros(self.capacity, dtype=np.int64)
+        self._move_counts = np.zeros(self.capacity, dtype=np.uint32)
+
+        state = board.rng.bit_generator.state
+        self._compact_rng = isinstance(state.get("state"), dict) and set(state["state"]) == {"state", "inc"}
+        if self._compact_rng:
+            self._rng_template = state
+            self._rng_words = np.zeros((self.capacity, 2), dtype=np.uint64)
+            self._rng_has_uint32 = np.zeros(self.capacity, dtype=np.uint8)
+            self._rng_uinteger = np.zeros(self.capacity, dtype=np.uint32)
+        else:
+            self._rng_states: List[Optional[dict]] = [None] * self.capacity
+        self.reset(board)
+
+    def reset(self, board):
+        """Forget every snapshot and record the board as the first one"""
+        self.start = 0
+        self.cursor = -1
+        self.end = 0
+        self.record(board)
+
+    def __len__(self) -> int:
+        return self.end - self.start
+
+    def can_undo(self) -> bool:
+        return self.cursor > self.start
+
+    def can_redo(self) -> bool:
+        return self.cursor < self.end - 1
+
+    def record(self, board):
+        """Append a snapshot of the board after the current one, dropping any redo tail"""
+        self.cursor += 1
+        self.end = self.cursor + 1
+        if self.end - self.start > self.capacity:
+            self.start = self.end - self.capacity
+        slot = self.cursor % self.capacity
+
+        if hasattr(board, "state"):
+            self._words[slot] = board.state
+        elif hasattr(board, "packed"):
+            self._boards[slot] = np.frombuffer(board.packed.to_bytes(self._width, "little"), dtype=np.uint8)
+        else:
+            self._boards[slot] = np.log2(np.maximum(board.grid, 1)).astype(np.uint8).ravel()
+        self._scores[slot] = board.score
+        self._move_counts[slot] = board.move_count
+
+        state = board.rng.bit_generator.state
+        if self._compact_rng:
+            value = state["state"]["state"]
+            self._rng_words[slot] = (value >> 64, value & 0xFFFFFFFFFFFFFFFF)
+            self._rng_has_uint32[slot] = state["has_uint32"]
+            self._rng_uinteger[slot] = state["uinteger"]
+        else:
+            self._rng_states[slot] = state
+
+    def undo(self, board) -> bool:
+        """Restore the snapshot before the current one; False when there is none"""
+        if not self.can_undo():
+            return False
+        self.seek(board, self.cursor - 1)
+        return True
+
+    def redo(self, board) -> bool:
+        """Restore the snapshot after the current one; False when there is none"""
+        if not self.can_redo():
+            return False
+        self.seek(board, self.cursor + 1)
+        return True
+
+    def seek(self, board, position: int):
+        """
+        Restore the snapshot at an absolute position and make it current.
+
+        Args:
+            board: Board to overwrite (the one the snapshots were taken from)
+            position: Between ``start`` and ``end - 1``
+        """
+        if not self.start <= position < self.end:
+            raise IndexError(f"History holds positions {self.start} to {self.end - 1}, got {position}")
+        self.cursor = position
+        slot = position % self.capacity
+
+        if hasattr(board, "state"):
+            board.state = int(self._words[slot])
+            board.previous_state = None
+        elif hasattr(board, "packed"):
+            board.packed = int.from_bytes(self._boards[slot].tobytes(), "little")
+            board.previous_packed = None
+        else:
+            exponents = self._boards[slot].reshape(board.size, board.size).astype(np.int64)
+            board.grid = np.where(exponents > 0, np.left_shift(1, exponents), 0).astype(board.grid.dtype)
+            board.previous_grid = None
+        board.score = int(self._scores[slot])
+        board.move_count = int(self._move_counts[slot])
+        board.merged_values = []
+
+        if self._compact_rng:
+            high, low = self._rng_words[slot].tolist()
+            state = dict(self._rng_template)
+            state["state"] = {"state": (high << 64) | low, "inc": self._rng_template["state"]["inc"]}
+            state["has_uint32"] = int(self._rng_has_uint32[slot])
+            state["uinteger"] = int(self._rng_uinteger[slot])
+            board.rng.bit_generator.state = state
+        else:
+            board.rng.bit_generator.state = self._rng_states[slot]
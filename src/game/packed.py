@@ -0,0 +1,303 @@
+"""Packed boards of any size: per-size row tables and a vectorized slide"""
+
+from functools import lru_cache
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from src.utils.constants import BOARD_SIZE, DIRECTIONS, SPAWN_PROBABILITY
+from .bitboard import MAX_EXPONENT
+from .board import Seed
+
+# Row tables hold 16 ** size entries; beyond this size they do not fit in
+# memory and callers slide rows directly with ``slide_rows_left``
+TABLE_MAX_SIZE = 5
+
+_size_tables: Dict[int, dict] = {}
+
+
+def slide_rows_left(rows: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Slide and merge rows of exponents towards column 0, vectorized.
+
+    Args:
+        rows: (M, N) uint8 exponents
+
+    Returns:
+        (slid rows, (M,) score gains, (M,) sum of log2 of the merged tiles)
+    """
+    rows = np.asarray(rows, dtype=np.uint8)
+    # Stable sort on emptiness packs the tiles to the left in order
+    order = np.argsort(rows == 0, axis=1, kind="stable")
+    packed = np.take_along_axis(rows, order, axis=1)
+
+    gains = np.zeros(len(rows), dtype=np.int64)
+    merge_log = np.zeros(len(rows), dtype=np.float32)
+    for i in range(rows.shape[1] - 1):
+        left = packed[:, i]
+        merge = (left != 0) & (left == packed[:, i + 1]) & (left < MAX_EXPONENT)
+        packed[merge, i] += 1
+        packed[merge, i + 1] = 0
+        gains[merge] += np.left_shift(1, packed[merge, i].astype(np.int64))
+        merge_log[merge] += packed[merge, i]
+
+    order = np.argsort(packed == 0, axis=1, kind="stable")
+    return np.take_along_axis(packed, order, axis=1), gains, merge_log
+
+
+def can_slide_left(rows: np.ndarray) -> np.ndarray:
+    """(M,) whether sliding each (M, N) row of exponents left changes it"""
+    filled = rows != 0
+    gap = (~filled[:, :-1] & filled[:, 1:]).any(axis=1)
+    pair = (filled[:, :-1] & (rows[:, :-1] == rows[:, 1:]) & (rows[:, :-1] < MAX_EXPONENT)).any(axis=1)
+    return gap | pair
+
+
+def row_codes(rows: np.ndarray) -> np.ndarray:
+    """Pack (M, N) exponents into row indices, column 0 in the lowest nibble"""
+    shifts = np.arange(0, 4 * rows.shape[-1], 4, dtype=np.int64)
+    return (rows.astype(np.int64) << shifts).sum(axis=-1)
+
+
+def get_size_tables(size: int) -> Optional[dict]:
+    """
+    Get the row tables for boards of ``size`` columns, building them on first use.
+
+    Returns:
+        None when 16 ** size rows do not fit (size > TABLE_MAX_SIZE), else a
+        dict of NumPy arrays ``left``/``right`` (result rows), ``score``,
+        ``merge_log``, ``can_left``/``can_right`` and ``empty_count``
+    """
+    if size > TABLE_MAX_SIZE:
+        return None
+    if size not in _size_tables:
+        codes = np.arange(16 ** size, dtype=np.int64)
+        shifts = np.arange(0, 4 * size, 4, dtype=np.int64)
+        rows = ((codes[:, None] >> shifts) & 0xF).astype(np.uint8)
+
+        left, score, merge_log = slide_rows_left(rows)
+        right = slide_rows_left(rows[:, ::-1])[0][:, ::-1]
+        left_codes = row_codes(left)
+        right_codes = row_codes(right)
+        _size_tables[size] = {
+            "left": left_codes,
+            "right": right_codes,
+            "score": score,
+            "merge_log": merge_log,
+            "can_left": left_codes != codes,
+            "can_right": right_codes != codes,
+            "empty_count": (rows == 0).sum(axis=1),
+        }
+    return _size_tables[size]
+
+
+@lru_cache(maxsize=65536)
+def _merged_values(row: Tuple[int, ...]) -> Tuple[int, ...]:
+    """Tile values merged by sliding one row of exponents left"""
+    merged = []
+    tiles = [c for c in row if c]
+    i = 0
+    while i < len(tiles):
+        if i + 1 < len(tiles) and tiles[i] == tiles[i + 1] and tiles[i] < MAX_EXPONENT:
+            merged.append(1 << (tiles[i] + 1))
+            i += 2
+        else:
+            i += 1
+    return tuple(merged)
+
+
+class PackedBoard:
+    """
+    ``Board``-compatible engine for sizes other than 4 whose row tables fit
+    in memory. The board is one Python int, ``packed``, with the 4-bit
+    exponent of cell (r, c) at bit 4 * (size * r + c); rows slide through
+    the size's tables. (``state`` stays reserved for the 64-bit 4x4 layout
+    that the search agents and ``evaluate_packed`` read.)
+    """
+
+    def __init__(self, size: int = BOARD_SIZE, seed: Seed = None):
+        """
+        Initialize the packed board.
+
+        Args:
+            size: Board size (2 to TABLE_MAX_SIZE)
+            seed: Seed or Generator for the tile spawns (see ``Board``)
+        """
+        tables = get_size_tables(size)
+        if size < 2 or tables is None:
+            raise ValueError(f"PackedBoard supports sizes 2 to {TABLE_MAX_SIZE}, got size={size}")
+        self.size = size
+        self.rng = np.random.default_rng(seed)
+        self._row_bits = 4 * size
+        self._row_mask = (1 << self._row_bits) - 1
+        self._left = tables["left"].tolist()
+        self._right = tables["right"].tolist()
+        self._score = tables["score"].tolist()
+
+        self.packed = 0
+        self.previous_packed: Optional[int] = None
+        self.merged_values = []
+        self.score = 0
+        self.move_count = 0
+        self._add_random_tile()
+        self._add_random_tile()
+
+    @property
+    def grid(self) -> np.ndarray:
+        """The board as a size x size array of tile values"""
+        return self._unpack(self.packed)
+
+    @grid.setter
+    def grid(self, value):
+        self.packed = self._pack(value)
+
+    @property
+    def previous_grid(self) -> Optional[np.ndarray]:
+        """The board before the last move"""
+        if self.previous_packed is None:
+            return None
+        return self._unpack(self.previous_packed)
+
+    def _pack(self, grid) -> int:
+        board = 0
+        for i, value in enumerate(np.asarray(grid, dtype=np.int64).ravel()):
+            if value:
+                board |= min(int(value).bit_length() - 1, MAX_EXPONENT) << (4 * i)
+        return board
+
+    def _unpack(self, board: int) -> np.ndarray:
+        exponents = np.array([(board >> (4 * i)) & 0xF for i in range(self.size * self.size)], dtype=np.int32)
+        grid = np.where(exponents > 0, np.left_shift(1, exponents), 0).astype(np.int32)
+        return grid.reshape(self.size, self.size)
+
+    def _rows(self, board: int) -> List[int]:
+        return [(board >> (self._row_bits * r)) & self._row_mask for r in range(self.size)]
+
+    def _from_rows(self, rows: List[int]) -> int:
+        board = 0
+        for r, row in enumerate(rows):
+            board |= row << (self._row_bits * r)
+        return board
+
+    def _transpose(self, board: int) -> int:
+        size = self.size
+        result = 0
+        for r in range(size):
+            for c in range(size):
+                result |= ((board >> (4 * (size * r + c))) & 0xF) << (4 * (size * c + r))
+        return result
+
+    def _add_random_tile(self):
+        """Add a random tile (2 or 4) to an empty cell, drawing like ``Board``"""
+        empty = [i for i in range(self.size * self.size) if not (self.packed >> (4 * i)) & 0xF]
+        if not empty:
+            return
+        draw = self.rng.random() * len(empty)
+        index = int(draw)
+        exponent = 2 if draw - index > SPAWN_PROBABILITY else 1
+        self.packed |= exponent << (4 * empty[index])
+
+    def _get_empty_cells(self) -> List[Tuple[int, int]]:
+        """Get list of all empty cells"""
+        return [divmod(i, self.size) for i in range(self.size * self.size)
+                if not (self.packed >> (4 * i)) & 0xF]
+
+    def afterstate(self, direction: str) -> Tuple[int, int, List[int]]:
+        """Slide the board without spawning a tile: (packed board, score gain, merged values)"""
+        if direction not in DIRECTIONS:
+            raise ValueError(f"Invalid direction: {direction}")
+        transposed = direction in ("up", "down")
+        table = self._left if direction in ("up", "left") else self._right
+        board = self._transpose(self.packed) if transposed else self.packed
+
+        rows = self._rows(board)
+        gain = 0
+        merged = []
+        for row in rows:
+            if self._score[row]:
+                gain += self._score[row]
+                cells = tuple((row >> (4 * c)) & 0xF for c in range(self.size))
+                merged.extend(_merged_values(cells if table is self._left else cells[::-1]))
+        result = self._from_rows([table[row] for row in rows])
+        return (self._transpose(result) if transposed else result), gain, merged
+
+    def move(self, direction: str) -> bool:
+        """
+        Move tiles in the specified direction.
+
+        Args:
+            direction: 'up', 'down', 'left', or 'right'
+
+        Returns:
+            True if a move was made, False otherwise
+        """
+        self.previous_packed = self.packed
+        self.merged_values = []
+        try:
+            new_state, gain, merged = self.afterstate(direction)
+        except ValueError:
+            return False
+        if new_state == self.packed:
+            return False
+
+        self.packed = new_state
+        self.score += gain
+        self.merged_values = merged
+        self.move_count += 1
+        self._add_random_tile()
+        return True
+
+    def legal_moves_mask(self) -> int:
+        """Bitmask with bit i set when DIRECTIONS[i] is a legal move"""
+        mask = 0
+        for i, direction in enumerate(DIRECTIONS):
+            if self.afterstate(direction)[0] != self.packed:
+                mask |= 1 << i
+        return mask
+
+    def can_move(self, direction: str) -> bool:
+        """Check if a move in the specified direction is possible"""
+        if direction not in DIRECTIONS:
+            return False
+        return self.afterstate(direction)[0] != self.packed
+
+    def is_game_over(self) -> bool:
+        """Check if the game is over (no more moves possible)"""
+        return not self.legal_moves_mask()
+
+    def has_won(self) -> bool:
+        """Check if the player has reached 2048"""
+        return any((self.packed >> (4 * i)) & 0xF == 11 for i in range(self.size * self.size))
+
+    def get_grid(self) -> List[List[int]]:
+        """Get a copy of the current grid as list of lists"""
+        return self.grid.tolist()
+
+    def reset(self):
+        """Reset the board for a new game"""
+        self.packed = 0
+        self.score = 0
+        self.move_count = 0
+        self._add_random_tile()
+        self._add_random_tile()
+
+    def get_previous_grid(self) -> Optional[List[List[int]]]:
+        """Get the previous grid state as list of lists"""
+        if self.previous_packed is not None:
+            return self._unpack(self.previous_packed).tolist()
+        return None
+
+    def grid_changed(self) -> bool:
+        """Check if the grid has changed since the last move"""
+        if self.previous_packed is None:
+            return True
+        return self.packed != self.previous_packed
+
+    def get_neighbors(self, row: int, col: int) -> List[Tuple[int, int]]:
+        """Get valid neighbor positions for a given cell"""
+        neighbors = []
+        for dr, dc in [(-1, 0), (1, 0), (0, -1), (0, 1)]:
+            r, c = row + dr, col + dc
+            if 0 <= r < self.size and 0 <= c < self.size:
+                neighbors.append((r, c))
+        return neighbors
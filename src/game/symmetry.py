@@ -0,0 +1,139 @@
+"""Dihedral symmetries of the board: canonical forms and action permutations"""
+
+from typing import List, Tuple, Union
+
+import numpy as np
+
+from src.utils.constants import DIRECTIONS
+from .bitboard import pack, transpose, unpack
+
+NUM_SYMMETRIES = 8
+
+_NIBBLE_SHIFTS = np.arange(0, 64, 4, dtype=np.uint64)
+
+
+def mirror(board: int) -> int:
+    """Reverse every row of a packed board (left-right reflection)"""
+    return (((board & 0x000F000F000F000F) << 12) | ((board & 0x00F000F000F000F0) << 4)
+            | ((board & 0x0F000F000F000F00) >> 4) | ((board & 0xF000F000F000F000) >> 12))
+
+
+def flip(board: int) -> int:
+    """Reverse the row order of a packed board (top-bottom reflection)"""
+    return (((board & 0xFFFF) << 48) | ((board & 0xFFFF0000) << 16)
+            | ((board >> 16) & 0xFFFF0000) | (board >> 48))
+
+
+def symmetries(board: int) -> List[int]:
+    """
+    All eight images of a packed board.
+
+    Index g is the same symmetry everywhere in this module: 0 identity,
+    1 mirror, 2 flip, 3 rotation by 180, 4-7 the same four then transposed.
+    """
+    m = mirror(board)
+    f = flip(board)
+    mf = flip(m)
+    return [board, m, f, mf, transpose(board), transpose(m), transpose(f), transpose(mf)]
+
+
+def permutations(size: int) -> np.ndarray:
+    """
+    (8, size * size) cell permutations in the order of ``symmetries``:
+    entry [g, j] is the source cell of cell j under symmetry g, so
+    flat[:, permutations(size)[g]] transforms flat (N, size * size) boards.
+    """
+    cells = np.arange(size * size).reshape(size, size)
+    images = [cells, cells[:, ::-1], cells[::-1], cells[::-1, ::-1]]
+    return np.stack([image.ravel() for image in images] + [image.T.ravel() for image in images])
+
+
+PERMUTATIONS = permutations(4)
+
+
+def _build_action_maps() -> np.ndarray:
+    """ACTION_MAPS[g, a]: the direction in the transformed board matching DIRECTIONS[a]"""
+    vectors = {"up": (-1, 0), "down": (1, 0), "left": (0, -1), "right": (0, 1)}
+    by_vector = {v: DIRECTIONS.index(d) for d, v in vectors.items()}
+    maps = np.zeros((NUM_SYMMETRIES, 4), dtype=np.int64)
+    for g, permutation in enumerate(PERMUTATIONS):
+        destination = np.argsort(permutation)
+        for a, direction in enumerate(DIRECTIONS):
+            dr, dc = vectors[direction]
+            r0, c0 = divmod(int(destination[5]), 4)
+            r1, c1 = divmod(int(destination[5 + 4 * dr + dc]), 4)
+            maps[g, a] = by_vector[(r1 - r0, c1 - c0)]
+    return maps
+
+
+ACTION_MAPS = _build_action_maps()
+# INVERSE_ACTION_MAPS[g, b]: the original direction for direction b on the transformed board
+INVERSE_ACTION_MAPS = np.argsort(ACTION_MAPS, axis=1)
+
+
+def canonicalize(board: Union[int, np.ndarray]) -> Tuple[Union[int, np.ndarray], int]:
+    """
+    Map a board to the smallest of its eight packed images.
+
+    Args:
+        board: Packed 64-bit board, or a 4x4 grid of tile values
+
+    Returns:
+        (canonical board in the same form as the input, symmetry g that
+        produced it); ACTION_MAPS[g] converts actions into its frame
+    """
+    packed = board if isinstance(board, int) else pack(board)
+    images = symmetries(packed)
+    canonical = min(images)
+    g = images.index(canonical)
+    return (canonical if isinstance(board, int) else unpack(canonical)), g
+
+
+def canonical_key(board: int) -> int:
+    """Cache key shared by the eight symmetric images of a packed board"""
+    m = mirror(board)
+    f = flip(board)
+    mf = flip(m)
+    return min(board, m, f, mf, transpose(board), transpose(m), transpose(f), transpose(mf))
+
+
+def transform_batch(boards: np.ndarray, symmetry: np.ndarray) -> np.ndarray:
+    """
+    Apply one symmetry per board.
+
+    Args:
+        boards: (N, size, size) or (N, size * size) boards (exponents or tile values)
+        symmetry: (N,) symmetry indices
+
+    Returns:
+        The transformed boards, same shape as the input
+    """
+    flat = boards.reshape(len(boards), -1)
+    cells = flat.shape[1]
+    table = PERMUTATIONS if cells == 16 else permutations(int(round(cells ** 0.5)))
+    return np.take_along_axis(flat, table[symmetry], axis=1).reshape(boards.shape)
+
+
+def transform_moves(moves: np.ndarray, symmetry: np.ndarray) -> np.ndarray:
+    """Permute (N, 4) per-direction values (legal-move masks, Q-values) into each board's frame"""
+    result = np.empty_like(moves)
+    result[np.arange(len(moves))[:, None], ACTION_MAPS[symmetry]] = moves
+    return result
+
+
+def canonicalize_batch(boards: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Vectorized ``canonicalize`` over exponent boards.
+
+    Args:
+        boards: (N, 4, 4) or (N, 16) exponent boards (values 0-15)
+
+    Returns:
+        (canonical boards with the input shape, (N,) symmetry indices)
+    """
+    flat = boards.reshape(len(boards), 16)
+    images = flat[:, PERMUTATIONS]
+    keys = (images.astype(np.uint64) << _NIBBLE_SHIFTS).sum(axis=2, dtype=np.uint64)
+    symmetry = keys.argmin(axis=1)
+    canonical = images[np.arange(len(flat)), symmetry]
+    return canonical.reshape(boards.shape), symmetry
@@ -1,5 +1,8 @@
 """Storage module for save/load functionality"""
 
+from .autosave import Autosaver
+from .database import GameDatabase, open_database
+from .records import GameRecord, GameRecorder, RecordReader, RecordWriter, replay
 from .save_manager import SaveManager
 
-__all__ = ["SaveManager"]
+__all__ = ["SaveManager", "Autosaver", "GameDatabase", "open_database", "GameRecord", "GameRecorder", "RecordReader", "RecordWriter", "replay"]
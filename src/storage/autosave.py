@@ -0,0 +1,151 @@
+"""Debounced autosave on a background thread"""
+
+import atexit
+import threading
+import time
+from typing import Dict, Optional
+
+from src.utils.helpers import load_config
+from src.utils.logger import get_logger
+from .save_manager import SaveManager
+
+logger = get_logger(__name__)
+
+
+class Autosaver:
+    """
+    Coalesces rapid save requests and writes the newest one on a daemon
+    thread, so callers (the Tk event loop, an agent loop) never wait on disk.
+
+    A request is written once no newer one has arrived for ``delay_ms``, or
+    at the latest ``max_delay_ms`` after the first unsaved request, so a
+    continuous stream of moves still reaches disk. Writes go through
+    ``SaveManager.save_game`` (temp file, fsync, rename). Pending state is
+    flushed by ``close``, which also runs at interpreter exit.
+    """
+
+    def __init__(self, save_manager: Optional[SaveManager] = None, filename: Optional[str] = None,
+                 delay_ms: Optional[float] = None, max_delay_ms: Optional[float] = None):
+        """
+        Start the writer thread.
+
+        Args:
+            save_manager: Where to write (default: paths.save_dir from config)
+            filename: Save file name (default from config)
+            delay_ms: Quiet period before a write (default from config)
+            max_delay_ms: Longest a request may wait while newer ones keep arriving
+        """
+        config = load_config() or {}
+        autosave_config = config.get('autosave', {})
+        self.save_manager = save_manager or SaveManager(config.get('paths', {}).get('save_dir', 'saves'))
+        self.filename = filename or autosave_config.get('filename', 'autosave.json')
+        self.delay = (delay_ms if delay_ms is not None else autosave_config.get('delay_ms', 500)) / 1000.0
+        self.max_delay = (max_delay_ms if max_delay_ms is not None
+                          else autosave_config.get('max_delay_ms', 5000)) / 1000.0
+
+        self._condition = threading.Condition()
+        self._pending: Optional[Dict] = None
+        self._first_request = 0.0
+        self._last_request = 0.0
+        self._writing = False
+        self._flush = False
+        self._stopped = False
+
+        # Statistics
+        self.requests = 0
+        self.writes = 0
+        self.failures = 0
+        self.last_write_ms = 0.0
+        self.max_write_ms = 0.0
+        self.total_write_ms = 0.0
+
+        self._thread = threading.Thread(target=self._run, name="autosave-writer", daemon=True)
+        self._thread.start()
+        atexit.register(self.close)
+
+    def request(self, game_state: Dict):
+        """
+        Schedule a save of ``game_state``, replacing any unsaved earlier one.
+
+        The dict is written later on another thread; pass a fresh one (e.g.
+        ``GameManager.get_state()``) rather than one that keeps changing.
+        """
+        now = time.perf_counter()
+        with self._condition:
+            if self._stopped:
+                return
+            if self._pending is None:
+                self._first_request = now
+            self._pending = game_state
+            self._last_request = now
+            self.requests += 1
+            self._condition.notify()
+
+    def _run(self):
+        while True:
+            with self._condition:
+                while True:
+                    if self._pending is not None:
+                        now = time.perf_counter()
+                        due = min(self._last_request + self.delay, self._first_request + self.max_delay)
+                        if self._flush or self._stopped or now >= due:
+                            break
+                        self._condition.wait(due - now)
+                    elif self._stopped:
+                        return
+                    else:
+                        self._condition.wait()
+                game_state, self._pending = self._pending, None
+                self._writing = True
+
+            start = time.perf_counter()
+            saved = self.save_manager.save_game(game_state, self.filename)
+            elapsed_ms = (time.perf_counter() - start) * 1000.0
+
+            with self._condition:
+                self._writing = False
+                if saved:
+                    self.writes += 1
+                    self.last_write_ms = elapsed_ms
+                    self.max_write_ms = max(self.max_write_ms, elapsed_ms)
+                    self.total_write_ms += elapsed_ms
+                else:
+                    self.failures += 1
+                self._condition.notify_all()
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """
+        Write any pending state now and wait until it is on disk.
+
+        Returns:
+            False if ``timeout`` seconds passed first
+        """
+        with self._condition:
+            self._flush = True
+            self._condition.notify_all()
+            done = self._condition.wait_for(lambda: self._pending is None and not self._writing, timeout)
+            self._flush = False
+        return done
+
+    def close(self):
+        """Flush pending state and stop the thread (safe to call twice)"""
+        with self._condition:
+            if self._stopped:
+                return
+            self._stopped = True
+            self._condition.notify_all()
+        self._thread.join()
+        atexit.unregister(self.close)
+        logger.info(f"Autosave closed: {self.stats()}")
+
+    def stats(self) -> Dict:
+        """Request and write counts and write latency in milliseconds"""
+        return {
+            "requests": self.requests,
+            "writes": self.writes,
+            "coalesced": max(0, self.requests - self.writes - self.failures - (self._pending is not None)),
+            "failures": self.failures,
+            "last_write_ms": self.last_write_ms,
+            "max_write_ms": self.max_write_ms,
+            "mean_write_ms": self.total_write_ms / self.writes if self.writes else 0.0,
+        }
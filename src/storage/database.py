@@ -0,0 +1,210 @@
+"""SQLite store of finished games with indexed leaderboard queries"""
+
+import json
+import sqlite3
+import time
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Union
+
+from src.utils.helpers import load_config
+from src.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+# Schema steps applied in order; PRAGMA user_version holds how many have run
+MIGRATIONS = [
+    """
+    CREATE TABLE games (
+        id INTEGER PRIMARY KEY,
+        score INTEGER NOT NULL,
+        max_tile INTEGER NOT NULL,
+        moves INTEGER NOT NULL,
+        board_size INTEGER NOT NULL DEFAULT 4,
+        agent TEXT NOT NULL DEFAULT 'human',
+        checkpoint TEXT,
+        won INTEGER NOT NULL DEFAULT 0,
+        finished_at REAL NOT NULL,
+        final_grid TEXT,
+        record BLOB,
+        source TEXT UNIQUE
+    );
+    CREATE INDEX games_score ON games (score DESC);
+    CREATE INDEX games_max_tile_score ON games (max_tile, score DESC);
+    CREATE INDEX games_finished_at ON games (finished_at);
+    CREATE INDEX games_agent_score ON games (agent, score DESC);
+    """,
+]
+
+COLUMNS = ("score", "max_tile", "moves", "board_size", "agent", "checkpoint", "won",
+           "finished_at", "final_grid", "record", "source")
+
+
+class GameDatabase:
+    """
+    Finished games in one SQLite file (WAL journal, so readers do not block
+    the writer). Inserts are buffered and committed ``batch_size`` at a time
+    in one transaction; queries flush the buffer first.
+    """
+
+    def __init__(self, path: Union[str, Path] = ":memory:", batch_size: int = 256):
+        """
+        Open or create the database and bring its schema up to date.
+
+        Args:
+            path: Database file (":memory:" for a throwaway store)
+            batch_size: Buffered games per insert transaction
+        """
+        self.path = str(path)
+        if self.path != ":memory:":
+            Path(self.path).parent.mkdir(parents=True, exist_ok=True)
+        self.batch_size = batch_size
+        self._pending: List[tuple] = []
+        self.connection = sqlite3.connect(self.path)
+        self.connection.row_factory = sqlite3.Row
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute("PRAGMA synchronous=NORMAL")
+        self._migrate()
+
+    def _migrate(self):
+        version = self.connection.execute("PRAGMA user_version").fetchone()[0]
+        for step, script in enumerate(MIGRATIONS[version:], start=version + 1):
+            with self.connection:
+                self.connection.executescript(script)
+                self.connection.execute(f"PRAGMA user_version = {step}")
+            logger.info(f"Game database migrated to schema {step}")
+
+    def add_game(self, score: int, max_tile: int, moves: int, board_size: int = 4, agent: str = "human",
+                 checkpoint: Optional[str] = None, won: bool = False, finished_at: Optional[float] = None,
+                 final_grid=None, record: Optional[bytes] = None, source: Optional[str] = None):
+        """
+        Queue one finished game.
+
+        Args:
+            score: Final score
+            max_tile: Largest tile value reached
+            moves: Moves played
+            board_size: Board size
+            agent: Who played ('human', 'dqn', 'expectimax', ...)
+            checkpoint: Model file or checkpoint the agent played with
+            won: Whether 2048 was reached
+            finished_at: Unix time (default now)
+            final_grid: Final board as nested lists (stored as JSON)
+            record: ``GameRecord.to_bytes()`` of the game, to replay it later
+            source: Unique origin key (e.g. an imported file); duplicates are skipped
+        """
+        self._pending.append((
+            int(score), int(max_tile), int(moves), int(board_size), agent, checkpoint, int(bool(won)),
+            time.time() if finished_at is None else finished_at,
+            None if final_grid is None else json.dumps(final_grid), record, source,
+        ))
+        if len(self._pending) >= self.batch_size:
+            self.flush()
+
+    def add_games(self, games: Iterable[Dict]):
+        """Queue many games given as ``add_game`` keyword dicts"""
+        for game in games:
+            self.add_game(**game)
+
+    def flush(self):
+        """Commit the buffered games in one transaction"""
+        if not self._pending:
+            return
+        placeholders = ", ".join("?" * len(COLUMNS))
+        with self.connection:
+            self.connection.executemany(
+                f"INSERT OR IGNORE INTO games ({', '.join(COLUMNS)}) VALUES ({placeholders})", self._pending)
+        self._pending = []
+
+    def leaderboard(self, limit: int = 100, min_max_tile: Optional[int] = None, since: Optional[float] = None,
+                    agent: Optional[str] = None, board_size: Optional[int] = None) -> List[Dict]:
+        """
+        Best games by score, optionally filtered.
+
+        Args:
+            limit: Games returned
+            min_max_tile: Only games whose largest tile is at least this
+            since: Only games finished at or after this Unix time
+            agent: Only games of this agent
+            board_size: Only games on this board size
+
+        Returns:
+            One dict per game (without the record blob), best first
+        """
+        self.flush()
+        conditions, params = [], []
+        for column, operator, value in (("max_tile", ">=", min_max_tile), ("finished_at", ">=", since),
+                                        ("agent", "=", agent), ("board_size", "=", board_size)):
+            if value is not None:
+                conditions.append(f"{column} {operator} ?")
+                params.append(value)
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+        rows = self.connection.execute(
+            f"SELECT id, score, max_tile, moves, board_size, agent, checkpoint, won, finished_at, final_grid "
+            f"FROM games {where} ORDER BY score DESC LIMIT ?", (*params, limit)).fetchall()
+        return [dict(row) for row in rows]
+
+    def best_score(self, agent: Optional[str] = None, board_size: Optional[int] = None) -> int:
+        """Highest recorded score (0 when there is none)"""
+        best = self.leaderboard(1, agent=agent, board_size=board_size)
+        return best[0]["score"] if best else 0
+
+    def statistics(self) -> List[Dict]:
+        """Games, mean and best score, and win rate per agent and board size"""
+        self.flush()
+        rows = self.connection.execute(
+            "SELECT agent, board_size, COUNT(*) AS games, AVG(score) AS mean_score, MAX(score) AS best_score, "
+            "MAX(max_tile) AS max_tile, AVG(won) AS win_rate FROM games GROUP BY agent, board_size "
+            "ORDER BY agent, board_size").fetchall()
+        return [dict(row) for row in rows]
+
+    def get_record(self, game_id: int) -> Optional[bytes]:
+        """The stored GameRecord bytes of a game, if any"""
+        self.flush()
+        row = self.connection.execute("SELECT record FROM games WHERE id = ?", (game_id,)).fetchone()
+        return row["record"] if row else None
+
+    def import_json_saves(self, save_dir: Union[str, Path], agent: str = "human") -> int:
+        """
+        Migrate JSON saves (``GameManager.get_state`` dicts) into the store.
+
+        Each file is keyed by its path, so importing twice adds nothing.
+        Files without a grid and score are skipped.
+
+        Returns:
+            Number of games imported
+        """
+        before = self.count()
+        for path in sorted(Path(save_dir).glob("*.json")):
+            try:
+                with open(path, "r") as f:
+                    state = json.load(f)
+                grid = state["grid"]
+                score = state["score"]
+            except (OSError, ValueError, KeyError, TypeError) as e:
+                logger.warning(f"Skipping {path}: {e}")
+                continue
+            self.add_game(score=score, max_tile=max(max(row) for row in grid), moves=state.get("move_count", 0),
+                          board_size=len(grid), agent=agent, won=state.get("is_won", False),
+                          finished_at=path.stat().st_mtime, final_grid=grid, source=str(path.resolve()))
+        self.flush()
+        imported = self.count() - before
+        logger.info(f"Imported {imported} games from {save_dir}")
+        return imported
+
+    def count(self) -> int:
+        """Number of stored games"""
+        self.flush()
+        return self.connection.execute("SELECT COUNT(*) FROM games").fetchone()[0]
+
+    def close(self):
+        """Commit buffered games and close the connection"""
+        self.flush()
+        self.connection.close()
+
+
+def open_database() -> Optional[GameDatabase]:
+    """The database configured under ``database`` in config.yaml, or None when disabled"""
+    database_config = (load_config() or {}).get('database', {})
+    if not database_config.get('enabled', False):
+        return None
+    return GameDatabase(database_config.get('path', 'data/games.sqlite'), database_config.get('batch_size', 256))
@@ -0,0 +1,286 @@
+"""Append-only binary game records: start state, keyframes and a 2-bit action stream"""
+
+import struct
+from pathlib import Path
+from typing import BinaryIO, Iterator, List, Optional, Tuple, Union
+
+import numpy as np
+
+from src.game.board import Board
+from src.utils.constants import DIRECTIONS
+from src.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+RECORD_MAGIC = b"G2048REC"
+RECORD_FORMAT_VERSION = 1
+# Bump when the move or spawn rules change: older records would replay differently
+ENGINE_VERSION = 1
+# Moves between keyframes; seeking replays at most this many moves
+KEYFRAME_INTERVAL = 256
+
+# File: magic, format version, engine version
+FILE_HEADER = struct.Struct("<8sHH")
+# Record: total bytes, board size, keyframe interval, moves, final score, PCG64 increment (2 words)
+RECORD_HEADER = struct.Struct("<IBHIQQQ")
+# Keyframe: PCG64 state (2 words), has_uint32, uinteger, score; the cells follow
+KEYFRAME_HEADER = struct.Struct("<QQBIQ")
+
+_MASK64 = 0xFFFFFFFFFFFFFFFF
+_ACTION_SHIFTS = np.array([0, 2, 4, 6], dtype=np.uint8)
+
+
+class Keyframe:
+    """Board exponents, score and spawn-generator state at one move of a game"""
+
+    __slots__ = ("exponents", "score", "rng_state", "has_uint32", "uinteger")
+
+    def __init__(self, exponents: np.ndarray, score: int, rng_state: int, has_uint32: int = 0, uinteger: int = 0):
+        self.exponents = exponents
+        self.score = score
+        self.rng_state = rng_state
+        self.has_uint32 = has_uint32
+        self.uinteger = uinteger
+
+
+class GameRecord:
+    """
+    One game: the board size, the generator increment (which with keyframe
+    0 acts as the seed), a keyframe every ``keyframe_interval`` moves and
+    the index (DIRECTIONS order) of every move that changed the board.
+    """
+
+    def __init__(self, size: int, rng_inc: int, keyframes: List[Keyframe], actions: np.ndarray,
+                 final_score: int, keyframe_interval: int = KEYFRAME_INTERVAL):
+        self.size = size
+        self.rng_inc = rng_inc
+        self.keyframes = keyframes
+        self.actions = np.asarray(actions, dtype=np.uint8)
+        self.final_score = final_score
+        self.keyframe_interval = keyframe_interval
+
+    def __len__(self) -> int:
+        return len(self.actions)
+
+    def to_bytes(self) -> bytes:
+        """Encode the record (header, keyframes, packed actions)"""
+        parts = []
+        for keyframe in self.keyframes:
+            parts.append(KEYFRAME_HEADER.pack(keyframe.rng_state >> 64, keyframe.rng_state & _MASK64,
+                                              keyframe.has_uint32, keyframe.uinteger, keyframe.score))
+            parts.append(np.asarray(keyframe.exponents, dtype=np.uint8).tobytes())
+        parts.append(pack_actions(self.actions).tobytes())
+        body = b"".join(parts)
+        header = RECORD_HEADER.pack(RECORD_HEADER.size + len(body), self.size, self.keyframe_interval,
+                                    len(self.actions), self.final_score, self.rng_inc >> 64, self.rng_inc & _MASK64)
+        return header + body
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> "GameRecord":
+        """Decode a record written by ``to_bytes``"""
+        _, size, interval, moves, final_score, inc_high, inc_low = RECORD_HEADER.unpack_from(data)
+        offset = RECORD_HEADER.size
+        cells = size * size
+        keyframes = []
+        for _ in range(moves // interval + 1):
+            state_high, state_low, has_uint32, uinteger, score = KEYFRAME_HEADER.unpack_from(data, offset)
+            offset += KEYFRAME_HEADER.size
+            exponents = np.frombuffer(data, dtype=np.uint8, count=cells, offset=offset).reshape(size, size)
+            offset += cells
+            keyframes.append(Keyframe(exponents, score, (state_high << 64) | state_low, has_uint32, uinteger))
+        packed = np.frombuffer(data, dtype=np.uint8, count=(moves + 3) // 4, offset=offset)
+        return cls(size, (inc_high << 64) | inc_low, keyframes, unpack_actions(packed, moves),
+                   final_score, interval)
+
+
+def pack_actions(actions: np.ndarray) -> np.ndarray:
+    """Pack action indices (0-3) four to a byte, first action in the low bits"""
+    padded = np.zeros((len(actions) + 3) // 4 * 4, dtype=np.uint8)
+    padded[:len(actions)] = actions
+    return (padded.reshape(-1, 4) << _ACTION_SHIFTS).sum(axis=1, dtype=np.uint8)
+
+
+def unpack_actions(packed: np.ndarray, count: int) -> np.ndarray:
+    """Inverse of ``pack_actions``"""
+    return ((packed[:, None] >> _ACTION_SHIFTS) & 3).ravel()[:count].astype(np.uint8)
+
+
+def _pcg64_state(board) -> dict:
+    state = board.rng.bit_generator.state
+    if state.get("bit_generator") != "PCG64":
+        raise ValueError(f"Game records need a PCG64 spawn generator, got {state.get('bit_generator')}")
+    return state
+
+
+class GameRecorder:
+    """Builds the record of a game while it is played"""
+
+    def __init__(self, board, keyframe_interval: int = KEYFRAME_INTERVAL):
+        """
+        Start recording from the board's current position (keyframe 0).
+
+        Args:
+            board: Board, BitBoard or PackedBoard seeded with a PCG64 generator
+            keyframe_interval: Moves between keyframes
+        """
+        self.board = board
+        self.keyframe_interval = keyframe_interval
+        self.rng_inc = _pcg64_state(board)["state"]["inc"]
+        self.keyframes = [self._keyframe()]
+        self.actions: List[int] = []
+
+    def _keyframe(self) -> Keyframe:
+        state = _pcg64_state(self.board)
+        exponents = np.log2(np.maximum(self.board.grid, 1)).astype(np.uint8)
+        return Keyframe(exponents, int(self.board.score), state["state"]["state"],
+                        state["has_uint32"], state["uinteger"])
+
+    def record(self, direction: Union[str, int]):
+        """Log a move that changed the board (call after ``board.move`` returned True)"""
+        self.actions.append(DIRECTIONS.index(direction) if isinstance(direction, str) else int(direction))
+        if len(self.actions) % self.keyframe_interval == 0:
+            self.keyframes.append(self._keyframe())
+
+    def finish(self) -> GameRecord:
+        """The record of the game so far"""
+        return GameRecord(self.board.size, self.rng_inc, list(self.keyframes),
+                          np.array(self.actions, dtype=np.uint8), int(self.board.score), self.keyframe_interval)
+
+
+def replay(record: GameRecord, move: Optional[int] = None) -> Board:
+    """
+    Rebuild the position after ``move`` moves (default: the final position).
+
+    Starts from the nearest keyframe at or before ``move`` and replays the
+    actions from there through ``Board``, so seeking costs at most
+    ``keyframe_interval`` moves.
+
+    Raises:
+        ValueError: when a recorded move does not change the board (corrupt
+            record or a different ENGINE_VERSION)
+    """
+    move = len(record) if move is None else move
+    if not 0 <= move <= len(record):
+        raise IndexError(f"Record has {len(record)} moves, got {move}")
+    k = min(move // record.keyframe_interval, len(record.keyframes) - 1)
+    keyframe = record.keyframes[k]
+
+    board = Board(record.size, seed=0)
+    exponents = keyframe.exponents.astype(np.int64)
+    board.grid = np.where(exponents > 0, np.left_shift(1, exponents), 0).astype(board.grid.dtype)
+    board.score = keyframe.score
+    board.move_count = k * record.keyframe_interval
+    board.rng.bit_generator.state = {
+        "bit_generator": "PCG64",
+        "state": {"state": keyframe.rng_state, "inc": record.rng_inc},
+        "has_uint32": keyframe.has_uint32,
+        "uinteger": keyframe.uinteger,
+    }
+    for action in record.actions[board.move_count:move].tolist():
+        if not board.move(DIRECTIONS[action]):
+            raise ValueError(f"Recorded move {board.move_count} ({DIRECTIONS[action]}) does not replay")
+    return board
+
+
+class RecordWriter:
+    """Appends records to a file, writing the file header when it is new"""
+
+    def __init__(self, filepath: Union[str, Path]):
+        self.path = Path(filepath)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._file: BinaryIO = open(self.path, "ab")
+        if self._file.tell() == 0:
+            self._file.write(FILE_HEADER.pack(RECORD_MAGIC, RECORD_FORMAT_VERSION, ENGINE_VERSION))
+        else:
+            _read_file_header(self.path)
+        self.count = 0
+
+    def write(self, record: GameRecord):
+        self._file.write(record.to_bytes())
+        self.count += 1
+
+    def write_many(self, records):
+        """Write records in one buffered call"""
+        data = [record.to_bytes() for record in records]
+        self._file.write(b"".join(data))
+        self.count += len(data)
+
+    def flush(self):
+        self._file.flush()
+
+    def close(self):
+        self._file.close()
+
+    def __enter__(self) -> "RecordWriter":
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def _read_file_header(path: Path) -> Tuple[int, int]:
+    with open(path, "rb") as f:
+        header = f.read(FILE_HEADER.size)
+    if len(header) < FILE_HEADER.size:
+        raise ValueError(f"{path} is not a game record file")
+    magic, version, engine_version = FILE_HEADER.unpack(header)
+    if magic != RECORD_MAGIC or version != RECORD_FORMAT_VERSION:
+        raise ValueError(f"{path} is not a version {RECORD_FORMAT_VERSION} game record file")
+    if engine_version != ENGINE_VERSION:
+        raise ValueError(f"{path} was recorded with engine version {engine_version}, expected {ENGINE_VERSION}")
+    return version, engine_version
+
+
+class RecordReader:
+    """
+    Streams the records of a file, or reads one by position through an
+    offset index built on first random access (only the record headers are
+    read to build it).
+    """
+
+    def __init__(self, filepath: Union[str, Path]):
+        self.path = Path(filepath)
+        _read_file_header(self.path)
+        self._offsets: Optional[List[int]] = None
+
+    def __iter__(self) -> Iterator[GameRecord]:
+        with open(self.path, "rb", buffering=1 << 20) as f:
+            f.seek(FILE_HEADER.size)
+            while True:
+                length_bytes = f.read(4)
+                if len(length_bytes) < 4:
+                    return
+                length = struct.unpack("<I", length_bytes)[0]
+                body = f.read(length - 4)
+                if len(body) < length - 4:
+                    logger.warning(f"Truncated record at the end of {self.path}")
+                    return
+                yield GameRecord.from_bytes(length_bytes + body)
+
+    def offsets(self) -> List[int]:
+        """File offset of every complete record"""
+        if self._offsets is None:
+            offsets = []
+            size = self.path.stat().st_size
+            with open(self.path, "rb") as f:
+                position = FILE_HEADER.size
+                while position + 4 <= size:
+                    f.seek(position)
+                    length = struct.unpack("<I", f.read(4))[0]
+                    if position + length > size:
+                        break
+                    offsets.append(position)
+                    position += length
+            self._offsets = offsets
+        return self._offsets
+
+    def __len__(self) -> int:
+        return len(self.offsets())
+
+    def __getitem__(self, index: int) -> GameRecord:
+        offset = self.offsets()[index]
+        with open(self.path, "rb") as f:
+            f.seek(offset)
+            length = struct.unpack("<I", f.read(4))[0]
+            f.seek(offset)
+            return GameRecord.from_bytes(f.read(length))
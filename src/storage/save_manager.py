@@ -3,13 +3,14 @@
 import json
 import os
 from pathlib import Path
-from typing import Dict, Optional
+from typing import Dict, Iterable, Iterator, Optional
 from src.utils.logger import get_logger
+from .records import GameRecord, RecordReader, RecordWriter
 
 logger = get_logger(__name__)
 
 class SaveManager:
-    """Manages game saves and loads"""
+    """Manages game saves (JSON) and game archives (binary ``.g2048`` records)"""
     
     def __init__(self, save_dir: str = "saves"):
         """
@@ -19,11 +20,13 @@ class SaveManager:
             save_dir: Directory to store save files
         """
         self.save_dir = Path(save_dir)
-        self.save_dir.mkdir(exist_ok=True)
+        self.save_dir.mkdir(parents=True, exist_ok=True)
     
     def save_game(self, game_state: Dict, filename: str = "autosave.json") -> bool:
         """
-        Save the current game state.
+        Save the current game state atomically: the JSON goes to a temp
+        file that is fsynced and renamed over the save, so a crash leaves
+        either the old save or the new one.
         
         Args:
             game_state: Dictionary containing game data
@@ -34,8 +37,12 @@ class SaveManager:
         """
         try:
             filepath = self.save_dir / filename
-            with open(filepath, 'w') as f:
+            tmp_path = filepath.with_name(filepath.name + ".tmp")
+            with open(tmp_path, 'w') as f:
                 json.dump(game_state, f, indent=2)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, filepath)
             logger.info(f"Game saved to {filepath}")
             return True
         except Exception as e:
@@ -70,6 +77,47 @@ class SaveManager:
         """Get list of all save files"""
         return [f.name for f in self.save_dir.glob("*.json")]
     
+    def get_record_files(self) -> list:
+        """Get list of all game record archives"""
+        return [f.name for f in self.save_dir.glob("*.g2048")]
+    
+    def save_records(self, records: Iterable[GameRecord], filename: str = "games.g2048") -> bool:
+        """
+        Append game records to an archive.
+        
+        Args:
+            records: Records to append (see GameRecorder)
+            filename: Name of the archive
+            
+        Returns:
+            True if the records were written, False otherwise
+        """
+        try:
+            with RecordWriter(self.save_dir / filename) as writer:
+                writer.write_many(records)
+            logger.info(f"{writer.count} games appended to {self.save_dir / filename}")
+            return True
+        except Exception as e:
+            logger.error(f"Failed to save game records: {e}")
+            return False
+    
+    def load_records(self, filename: str = "games.g2048") -> Iterator[GameRecord]:
+        """Stream the records of an archive (use ``replay`` to rebuild a board)"""
+        return iter(RecordReader(self.save_dir / filename))
+    
+    def load_record(self, filename: str, index: int) -> Optional[GameRecord]:
+        """
+        Load one game of an archive by position.
+        
+        Returns:
+            The record, or None if it could not be read
+        """
+        try:
+            return RecordReader(self.save_dir / filename)[index]
+        except Exception as e:
+            logger.error(f"Failed to load game record: {e}")
+            return None
+    
     def delete_save(self, filename: str) -> bool:
         """Delete a save file"""
         try:
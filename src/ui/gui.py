@@ -4,6 +4,9 @@ import customtkinter as ctk
 from typing import Callable, Optional
 from src.agent.agent import G2048Agent
 from src.game.game import GameManager
+from src.storage import Autosaver, open_database
+from src.utils.helpers import load_config
+from src.utils.constants import TILE_SIZE, PADDING
 from src.utils.logger import get_logger
 from .styles import (BG_COLOR, WINDOW_TITLE, TITLE_FONT, BUTTON_FONT, 
                      TEXT_PRIMARY, TEXT_SECONDARY, BUTTON_COLOR, BUTTON_HOVER_COLOR,
@@ -22,19 +25,52 @@ class GameGUI:
         Args:
             root: Optional root window. If None, a new one is created.
         """
+        agent_id, checkpoint_id = self._player_ids(agent)
+        self.game_manager = GameManager(database=open_database(), agent_id=agent_id, checkpoint_id=checkpoint_id)
+        self.board_size = self.game_manager.board.size
+        self.autosaver = self._create_autosaver()
+
+        # The window grows with the board; 4x4 keeps the original 460x700
+        board_px = self.board_size * (TILE_SIZE + 2 * PADDING)
         self.root = root or ctk.CTk()
         self.root.title(WINDOW_TITLE)
-        self.root.geometry("460x700")
+        self.root.geometry(f"{max(460, board_px + 56)}x{board_px + 296}")
         self.root.configure(fg_color=BG_COLOR)
         self.root.resizable(False, False)
         
         self.agent = agent
         self.agent_play_mode = True if agent else False
-        self.game_manager = GameManager()
         self._setup_ui()
         self._bind_keys()
         
     
+    @staticmethod
+    def _player_ids(agent) -> tuple:
+        """Player name and model file stored with finished games"""
+        if agent is None:
+            return "human", None
+        config = load_config() or {}
+        agent_id = config.get('play', {}).get('agent', 'dqn')
+        checkpoint_id = getattr(agent, 'table_path', None)
+        if agent_id == 'dqn':
+            checkpoint_id = config.get('training', {}).get('model_save_path')
+        return agent_id, checkpoint_id
+    
+    def _create_autosaver(self) -> Optional[Autosaver]:
+        """Resume the autosaved game and start saving in the background, if enabled"""
+        if not (load_config() or {}).get('autosave', {}).get('enabled', False):
+            return None
+        autosaver = Autosaver()
+        save_manager = autosaver.save_manager
+        if autosaver.filename in save_manager.get_save_files():
+            state = save_manager.load_game(autosaver.filename)
+            try:
+                if state:
+                    self.game_manager.load_state(state)
+            except (KeyError, ValueError) as e:
+                logger.warning(f"Ignoring autosave: {e}")
+        return autosaver
+    
     def _setup_ui(self):
         """Setup the user interface"""
         # Main container with padding
@@ -86,7 +122,7 @@ class GameGUI:
         board_frame = ctk.CTkFrame(parent, fg_color=BG_COLOR)
         board_frame.pack(fill="both", expand=True, pady=(0, 16))
         
-        self.board_widget = BoardWidget(board_frame, size=4)
+        self.board_widget = BoardWidget(board_frame, size=self.board_size)
         self.board_widget.pack()
     
     def _create_controls_section(self, parent):
@@ -128,7 +164,7 @@ class GameGUI:
         
         info_text = ctk.CTkLabel(
             info_frame,
-            text="↑ ↓ ← → or WASD to move",
+            text="↑ ↓ ← → or WASD to move, Ctrl+Z / Ctrl+Y to undo / redo",
             font=INFO_FONT,
             text_color=TEXT_SECONDARY
         )
@@ -178,6 +214,8 @@ class GameGUI:
         self.root.bind("<S>", lambda e: self._handle_key("down"))
         self.root.bind("<A>", lambda e: self._handle_key("left"))
         self.root.bind("<D>", lambda e: self._handle_key("right"))
+        self.root.bind("<Control-z>", lambda e: self.undo())
+        self.root.bind("<Control-y>", lambda e: self.redo())
     
     def _handle_key(self, direction: str):
         """Handle keyboard input"""
@@ -196,6 +234,8 @@ class GameGUI:
             self.game_manager.get_current_score(),
             self.game_manager.get_best_score()
         )
+        if self.autosaver is not None:
+            self.autosaver.request(self.game_manager.get_state())
     
     def new_game(self):
         """Start a new game"""
@@ -205,7 +245,13 @@ class GameGUI:
     
     def undo(self):
         """Undo the last move"""
-        self.game_manager.undo()
+        if self.game_manager.undo():
+            self._update_display()
+    
+    def redo(self):
+        """Redo the last undone move"""
+        if self.game_manager.redo():
+            self._update_display()
     
     def _show_message(self, title: str, message: str):
         """Show a message dialog"""
@@ -223,3 +269,7 @@ class GameGUI:
         if self.agent_play_mode:
             self.root.after(250, self.agent_play)
         self.root.mainloop()
+        if self.autosaver is not None:
+            self.autosaver.close()
+        if self.game_manager.database is not None:
+            self.game_manager.database.close()
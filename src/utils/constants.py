@@ -9,6 +9,9 @@ MIN_TILE_VALUE = 2
 SPAWN_TILE_VALUES = [2, 4]
 SPAWN_PROBABILITY = 0.8  # 80% chance for 2, 20% for 4
 
+# Move directions, in the action index order used by the agent
+DIRECTIONS = ["up", "down", "left", "right"]
+
 # UI configuration
 TILE_SIZE = 85
 PADDING = 8
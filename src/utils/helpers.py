@@ -81,6 +81,20 @@ def convert_action_to_numeric(action: List[str]) -> List[int]:
     action_map = {'up': 0, 'down': 1, 'left': 2, 'right': 3}
     return [action_map[a] for a in action if a in action_map]
 
+def mask_to_list(mask: int) -> List[bool]:
+    """Expand a legal-move bitmask into one bool per direction (up, down, left, right)"""
+    return [bool(mask >> i & 1) for i in range(4)]
+
+def list_to_mask(valid_moves) -> int:
+    """Pack one bool per direction (up, down, left, right) into a bitmask"""
+    return sum(1 << i for i, valid in enumerate(valid_moves) if valid)
+
+def spawn_generators(seed: Union[int, np.random.SeedSequence, None], count: int) -> List[np.random.Generator]:
+    """Split one seed into ``count`` independent generators (one per worker or board)"""
+    if not isinstance(seed, np.random.SeedSequence):
+        seed = np.random.SeedSequence(seed)
+    return [np.random.default_rng(child) for child in seed.spawn(count)]
+
 def plot_loss_curve(losses: List[float], save_path: str = 'figures/loss_curve.png'):
     """Plot and save the loss curve"""
     import matplotlib.pyplot as plt
@@ -0,0 +1,69 @@
+"""Unit tests for the background autosave"""
+
+import json
+import tempfile
+import time
+import unittest
+from pathlib import Path
+import numpy as np
+from src.game.game import GameManager
+from src.storage import Autosaver, SaveManager
+
+class TestAutosaver(unittest.TestCase):
+    """Test cases for the Autosaver class"""
+
+    def setUp(self):
+        """Set up test fixtures"""
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.save_manager = SaveManager(self.tmp_dir.name)
+
+    def tearDown(self):
+        """Clean up test fixtures"""
+        self.tmp_dir.cleanup()
+
+    def test_coalesces_rapid_requests(self):
+        """Test that a burst of requests becomes one write of the newest state"""
+        autosaver = Autosaver(self.save_manager, "auto.json", delay_ms=50, max_delay_ms=5000)
+        for score in range(100):
+            autosaver.request({"score": score})
+        autosaver.close()
+        self.assertEqual(autosaver.writes, 1)
+        self.assertEqual(autosaver.stats()["coalesced"], 99)
+        self.assertEqual(self.save_manager.load_game("auto.json"), {"score": 99})
+        self.assertFalse((Path(self.tmp_dir.name) / "auto.json.tmp").exists())
+
+    def test_max_delay_bounds_staleness(self):
+        """Test that a steady stream of requests is still written"""
+        autosaver = Autosaver(self.save_manager, "auto.json", delay_ms=1000, max_delay_ms=20)
+        deadline = time.perf_counter() + 0.5
+        while autosaver.writes == 0 and time.perf_counter() < deadline:
+            autosaver.request({"t": time.perf_counter()})
+            time.sleep(0.002)
+        self.assertGreater(autosaver.writes, 0)
+        self.assertTrue(autosaver.flush(timeout=1.0))
+        self.assertGreater(autosaver.stats()["mean_write_ms"], 0.0)
+        autosaver.close()
+
+    def test_game_state_round_trip(self):
+        """Test resuming a saved game, spawns included"""
+        manager = GameManager(engine="bitboard", seed=0)
+        for direction in manager.get_valid_moves()[:2]:
+            manager.handle_move(direction)
+        autosaver = Autosaver(self.save_manager, "auto.json", delay_ms=0)
+        autosaver.request(manager.get_state())
+        autosaver.flush()
+        autosaver.close()
+        with open(Path(self.tmp_dir.name) / "auto.json") as f:
+            state = json.load(f)
+
+        resumed = GameManager(engine="numpy")
+        resumed.load_state(state)
+        np.testing.assert_array_equal(resumed.board.grid, manager.board.grid)
+        self.assertEqual(resumed.board.score, manager.board.score)
+        direction = manager.get_valid_moves()[0]
+        manager.handle_move(direction)
+        resumed.handle_move(direction)
+        np.testing.assert_array_equal(resumed.board.grid, manager.board.grid)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,92 @@
+"""Unit tests for the BatchGameManager class"""
+
+import unittest
+import numpy as np
+from src.game.batch import BatchGameManager
+from src.game.game import GameManager
+from src.utils.constants import DIRECTIONS
+
+class TestBatchGameManager(unittest.TestCase):
+    """Test cases for the BatchGameManager class"""
+
+    def setUp(self):
+        """Set up test fixtures"""
+        self.env = BatchGameManager(num_envs=8, seed=0)
+
+    def test_initialization(self):
+        """Test that every game starts with 2 tiles"""
+        boards = self.env.get_boards()
+        self.assertEqual(boards.shape, (8, 4, 4))
+        np.testing.assert_array_equal(np.count_nonzero(boards, axis=(1, 2)), 2)
+
+    def test_step_matches_game_manager(self):
+        """Test slides, scores, rewards and masks against GameManager"""
+        rng = np.random.default_rng(1)
+        manager = GameManager(engine="numpy")
+        for _ in range(20):
+            exponents = rng.integers(0, 8, size=(8, 4, 4)).astype(np.uint8)
+            actions = rng.integers(0, 4, size=8)
+            self.env.exponents = exponents.copy()
+            self.env.scores[:] = 0
+            states, rewards, dones, masks = self.env.step(actions)
+            for i in range(8):
+                manager.restart()
+                manager.board.grid = np.where(exponents[i] > 0, 2 ** exponents[i].astype(np.int32), 0)
+                moved = manager.board.move(DIRECTIONS[actions[i]])
+                if not dones[i]:
+                    self.assertEqual(self.env.scores[i], manager.board.score)
+                # The boards may only differ in where the new tile spawned
+                self.assertLessEqual((states[i] != manager.board.grid).sum(), 2)
+
+                manager.board.grid = states[i].copy()
+                manager.is_game_over = moved and manager.board.is_game_over()
+                self.assertAlmostEqual(rewards[i], manager.reward() if moved else 0, places=4)
+                self.assertEqual(list(masks[i]), manager.get_valid_moves())
+
+    def test_auto_reset(self):
+        """Test that finished games are reset"""
+        self.env.exponents[0] = np.array([
+            [3, 4, 5, 6],
+            [6, 5, 4, 3],
+            [3, 4, 5, 6],
+            [5, 6, 7, 0]
+        ], dtype=np.uint8)
+        states, rewards, dones, masks = self.env.step(["right"] * 8)
+        self.assertTrue(dones[0])
+        self.assertEqual(rewards[0], -10.0)
+        self.assertFalse(masks[0].any())
+        self.assertEqual(np.count_nonzero(self.env.get_boards()[0]), 2)
+
+    def test_afterstates(self):
+        """Test sliding every board in every direction without a spawn"""
+        self.env.exponents[0] = np.array([
+            [1, 1, 0, 0],
+            [0, 0, 0, 0],
+            [0, 0, 0, 0],
+            [0, 0, 0, 0]
+        ], dtype=np.uint8)
+        afterstates, gains, moved = self.env.afterstates()
+        self.assertEqual(afterstates.shape, (8, 4, 16))
+        self.assertEqual(moved[0].tolist(), [False, True, True, True])
+        self.assertEqual(gains[0].tolist(), [0, 0, 4, 4])
+        self.assertEqual(afterstates[0, 2, 0], 2)
+        self.assertEqual(np.count_nonzero(afterstates[0, 2]), 1)
+
+    def test_sizes_without_tables(self):
+        """Test that the direct slide matches the table path and runs past 5x5"""
+        tabled = BatchGameManager(num_envs=8, seed=3, size=3)
+        direct = BatchGameManager(num_envs=8, seed=3, size=3)
+        direct._tables = False
+        rng = np.random.default_rng(0)
+        for _ in range(50):
+            actions = rng.integers(0, 4, size=8)
+            for a, b in zip(tabled.step(actions), direct.step(actions)):
+                np.testing.assert_array_equal(a, b)
+
+        env = BatchGameManager(num_envs=4, seed=0, size=6)
+        states, rewards, dones, masks = env.step(np.zeros(4, dtype=np.int64))
+        self.assertEqual(states.shape, (4, 6, 6))
+        self.assertEqual(env.afterstates()[0].shape, (4, 4, 36))
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,130 @@
+"""Unit tests for the packed BitBoard engine"""
+
+import unittest
+import numpy as np
+from src.game.board import Board, create_board
+from src.game.bitboard import BitBoard, move_packed, pack, spawn_outcomes, transpose, unpack
+
+def random_grid(rng: np.random.Generator) -> np.ndarray:
+    """Build a random 4x4 grid with tiles up to 1024"""
+    exponents = rng.integers(0, 11, size=(4, 4))
+    return np.where(exponents > 0, 2 ** exponents, 0).astype(np.int32)
+
+class TestBitBoard(unittest.TestCase):
+    """Test cases for the BitBoard class"""
+
+    def setUp(self):
+        """Set up test fixtures"""
+        self.board = BitBoard()
+
+    def test_board_has_tiles(self):
+        """Test that board starts with 2 tiles"""
+        self.assertEqual(np.count_nonzero(self.board.grid), 2)
+
+    def test_pack_roundtrip(self):
+        """Test packing and unpacking a grid"""
+        grid = random_grid(np.random.default_rng(0))
+        np.testing.assert_array_equal(unpack(pack(grid)), grid)
+
+    def test_transpose(self):
+        """Test transposing a packed board"""
+        grid = random_grid(np.random.default_rng(1))
+        np.testing.assert_array_equal(unpack(transpose(pack(grid))), grid.T)
+
+    def test_moves_match_reference_board(self):
+        """Test that every direction matches the reference Board"""
+        rng = np.random.default_rng(2)
+        reference = Board()
+        for _ in range(200):
+            grid = random_grid(rng)
+            for direction in ["up", "down", "left", "right"]:
+                reference.grid = grid.copy()
+                expected, expected_gain, expected_merged = reference.afterstate(direction)
+
+                result, gain, merged = move_packed(pack(grid), direction)
+                np.testing.assert_array_equal(unpack(result), expected)
+                self.assertEqual(gain, expected_gain)
+                self.assertEqual(sorted(merged), sorted(expected_merged))
+
+    def test_legal_moves_mask_matches_reference(self):
+        """Test the packed legality mask against the reference Board"""
+        rng = np.random.default_rng(3)
+        reference = Board()
+        for _ in range(200):
+            exponents = rng.integers(0, 4, size=(4, 4))
+            grid = np.where(exponents > 0, 2 ** exponents, 0).astype(np.int32)
+            reference.grid = grid
+            self.board.grid = grid
+            self.assertEqual(self.board.legal_moves_mask(), reference.legal_moves_mask())
+
+    def test_move_left(self):
+        """Test moving tiles left"""
+        self.board.grid = [
+            [2, 2, 0, 0],
+            [0, 0, 0, 0],
+            [0, 0, 0, 0],
+            [0, 0, 0, 0]
+        ]
+        self.assertTrue(self.board.move("left"))
+        self.assertEqual(self.board.grid[0][0], 4)
+        self.assertEqual(self.board.score, 4)
+        self.assertEqual(self.board.merged_values, [4])
+        self.assertEqual(np.count_nonzero(self.board.grid), 2)
+
+    def test_blocked_move(self):
+        """Test that a move which changes nothing is rejected"""
+        self.board.grid = [
+            [2, 4, 0, 0],
+            [0, 0, 0, 0],
+            [0, 0, 0, 0],
+            [0, 0, 0, 0]
+        ]
+        self.assertFalse(self.board.can_move("left"))
+        self.assertFalse(self.board.move("left"))
+        self.assertTrue(self.board.can_move("right"))
+
+    def test_game_over_detection(self):
+        """Test game over detection"""
+        self.board.grid = [
+            [2, 4, 8, 16],
+            [32, 64, 128, 256],
+            [512, 1024, 2048, 4096],
+            [8192, 16384, 32768, 2]
+        ]
+        self.assertTrue(self.board.is_game_over())
+        self.assertTrue(self.board.has_won())
+
+    def test_afterstate_does_not_mutate(self):
+        """Test that the afterstate leaves the board untouched"""
+        self.board.grid = [
+            [2, 2, 0, 0],
+            [0, 0, 0, 0],
+            [0, 0, 0, 0],
+            [0, 0, 0, 0]
+        ]
+        state = self.board.state
+        result, gain, merged = self.board.afterstate("left")
+        self.assertEqual(unpack(result)[0].tolist(), [4, 0, 0, 0])
+        self.assertEqual((gain, merged), (4, [4]))
+        self.assertEqual(self.board.state, state)
+        self.assertEqual(self.board.score, 0)
+
+    def test_spawn_outcomes(self):
+        """Test enumerating every spawn with its probability"""
+        board = pack([[2, 4, 8, 16]] * 3 + [[0, 0, 32, 64]])
+        outcomes = spawn_outcomes(board)
+        self.assertEqual(len(outcomes), 4)
+        self.assertAlmostEqual(sum(p for _, p in outcomes), 1.0)
+        probabilities = dict(outcomes)
+        self.assertAlmostEqual(probabilities[pack([[2, 4, 8, 16]] * 3 + [[4, 0, 32, 64]])], 0.1)
+        self.assertEqual(spawn_outcomes(pack([[2, 4, 8, 16]] * 4)), [])
+
+    def test_create_board(self):
+        """Test selecting the engine by name"""
+        self.assertIsInstance(create_board("bitboard"), BitBoard)
+        self.assertIsInstance(create_board("numpy"), Board)
+        with self.assertRaises(ValueError):
+            create_board("unknown")
+
+if __name__ == "__main__":
+    unittest.main()
@@ -55,6 +55,62 @@ class TestBoard(unittest.TestCase):
         ], dtype=np.int32)
         self.assertTrue(self.board.is_game_over())
     
+    def test_legal_moves_mask(self):
+        """Test the single-pass mask against actually moving a copy"""
+        rng = np.random.default_rng(0)
+        for _ in range(100):
+            exponents = rng.integers(0, 4, size=(4, 4))
+            grid = np.where(exponents > 0, 2 ** exponents, 0).astype(np.int32)
+            expected = 0
+            for i, direction in enumerate(["up", "down", "left", "right"]):
+                self.board.grid = grid.copy()
+                if self.board.move(direction):
+                    expected |= 1 << i
+            self.board.grid = grid.copy()
+            self.assertEqual(self.board.legal_moves_mask(), expected)
+    
+    def test_can_move(self):
+        """Test per-direction legality"""
+        self.board.grid = np.array([
+            [2, 4, 0, 0],
+            [0, 0, 0, 0],
+            [0, 0, 0, 0],
+            [0, 0, 0, 0]
+        ], dtype=np.int32)
+        self.assertFalse(self.board.can_move("left"))
+        self.assertFalse(self.board.can_move("up"))
+        self.assertTrue(self.board.can_move("right"))
+        self.assertTrue(self.board.can_move("down"))
+        self.assertFalse(self.board.can_move("diagonal"))
+    
+    def test_afterstate_does_not_mutate(self):
+        """Test that the afterstate matches move() without changing the board"""
+        self.board.grid = np.array([
+            [2, 0, 0, 0],
+            [2, 4, 0, 0],
+            [4, 4, 0, 0],
+            [0, 0, 0, 0]
+        ])
+        before = self.board.grid.copy()
+        result, gain, merged = self.board.afterstate("up")
+        self.assertEqual(result[:, 0].tolist(), [4, 4, 0, 0])
+        self.assertEqual(result[:, 1].tolist(), [8, 0, 0, 0])
+        self.assertEqual(gain, 12)
+        self.assertEqual(sorted(merged), [4, 8])
+        np.testing.assert_array_equal(self.board.grid, before)
+        self.assertEqual(self.board.score, 0)
+        with self.assertRaises(ValueError):
+            self.board.afterstate("diagonal")
+
+    def test_spawn_outcomes(self):
+        """Test enumerating every spawn with its probability"""
+        self.board.grid = np.full((4, 4), 2)
+        self.board.grid[3, 3] = 0
+        outcomes = self.board.spawn_outcomes()
+        self.assertEqual([grid[3, 3] for grid, _ in outcomes], [2, 4])
+        self.assertAlmostEqual(outcomes[0][1], 0.8)
+        self.assertEqual(self.board.grid[3, 3], 0)
+    
     def test_empty_cells_detection(self):
         """Test detection of empty cells"""
         self.board.grid = np.array([
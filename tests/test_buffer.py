@@ -0,0 +1,146 @@
+"""Unit tests for the replay buffers"""
+
+import tempfile
+import unittest
+import numpy as np
+import torch
+from src.agent.buffer import (G2048ReplayBuffer, MemmapReplayBuffer, PrioritizedReplayBuffer,
+                              SumTree, to_exponents)
+
+class TestReplayBuffer(unittest.TestCase):
+    """Test cases for the G2048ReplayBuffer class"""
+
+    def setUp(self):
+        """Set up test fixtures"""
+        self.buffer = G2048ReplayBuffer(capacity=4, seed=0)
+        self.state = [
+            [2, 4, 0, 0],
+            [0, 8, 0, 0],
+            [0, 0, 1024, 0],
+            [0, 0, 0, 2]
+        ]
+
+    def test_to_exponents(self):
+        """Test converting tile values to exponents"""
+        np.testing.assert_array_equal(to_exponents(self.state)[0], [1, 2, 0, 0])
+        self.assertEqual(to_exponents(self.state)[2][2], 10)
+
+    def test_add_and_sample(self):
+        """Test that sampled tensors round-trip the stored transition"""
+        self.buffer.add(self.state, "left", 1.5, self.state, False, 0b1010)
+        states, actions, rewards, next_states, dones, next_valid_moves = self.buffer.sample(3)
+        self.assertEqual(states.shape, (3, 4, 4))
+        self.assertEqual(states.dtype, torch.float32)
+        np.testing.assert_array_equal(states[0].numpy(), self.state)
+        self.assertEqual(actions.tolist(), [2, 2, 2])
+        self.assertAlmostEqual(rewards[0].item(), 1.5)
+        self.assertEqual(dones[0].item(), 0.0)
+        self.assertEqual(next_valid_moves[0].tolist(), [False, True, False, True])
+
+    def test_ring_overwrite(self):
+        """Test that the oldest transitions are overwritten at capacity"""
+        for reward in range(6):
+            self.buffer.add(self.state, 0, reward, self.state, False, 1)
+        self.assertEqual(len(self.buffer), 4)
+        self.assertEqual(sorted(self.buffer.rewards.tolist()), [2, 3, 4, 5])
+
+    def test_add_batch(self):
+        """Test adding several transitions at once"""
+        boards = np.array([self.state] * 3)
+        self.buffer.add(self.state, "up", 0.0, self.state, False, 1)
+        self.buffer.add_batch(boards, ["up", "down", "right"], [1.0, 2.0, 3.0],
+                              boards, [False, False, True], [1, 2, 3])
+        self.assertEqual(len(self.buffer), 4)
+        self.assertEqual(self.buffer.actions.tolist(), [0, 0, 1, 3])
+        self.assertEqual(self.buffer.dones.tolist(), [False, False, False, True])
+
+    def test_symmetry_augmentation(self):
+        """Test that augmented samples are consistent images of the stored transition"""
+        buffer = G2048ReplayBuffer(capacity=4, seed=0, augment=True)
+        buffer.add(self.state, "left", 1.0, self.state, False, 0b0100)
+        states, actions, _, _, _, next_valid_moves = buffer.sample(64)
+        self.assertGreater(len({tuple(s.flatten().tolist()) for s in states}), 1)
+        for state, action, moves in zip(states, actions, next_valid_moves):
+            self.assertEqual(sorted(state.flatten().tolist()), sorted(np.ravel(self.state).tolist()))
+            self.assertEqual(moves.nonzero().flatten().tolist(), [action.item()])
+
+class TestMemmapReplayBuffer(unittest.TestCase):
+    """Test cases for the MemmapReplayBuffer class"""
+
+    def setUp(self):
+        """Set up test fixtures"""
+        self.tmp_dir = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        """Remove temporary files"""
+        self.tmp_dir.cleanup()
+
+    def test_reopen_existing_store(self):
+        """Test that a reopened store keeps its transitions"""
+        boards = np.arange(16, dtype=np.uint8).reshape(1, 4, 4).repeat(3, axis=0)
+        buffer = MemmapReplayBuffer(capacity=10, directory=self.tmp_dir.name, seed=0)
+        buffer.add_batch(boards, [0, 1, 2], [0.5, 1.5, 2.5], boards, [False, False, True], [15, 7, 0])
+        buffer.close()
+
+        reopened = MemmapReplayBuffer(capacity=10, directory=self.tmp_dir.name, seed=0)
+        self.assertEqual(len(reopened), 3)
+        states, actions, rewards, _, dones, _ = reopened.gather(np.array([2]))
+        self.assertEqual(actions.tolist(), [2])
+        self.assertEqual(rewards.tolist(), [2.5])
+        self.assertEqual(dones.tolist(), [1.0])
+        self.assertEqual(states[0, 0, 1].item(), 2.0)
+        reopened.close()
+
+    def test_capacity_change_starts_empty(self):
+        """Test that a store with another capacity is not reused"""
+        buffer = MemmapReplayBuffer(capacity=10, directory=self.tmp_dir.name)
+        buffer.add(np.zeros((4, 4)), 0, 1.0, np.zeros((4, 4)), False, 1)
+        buffer.close()
+        resized = MemmapReplayBuffer(capacity=20, directory=self.tmp_dir.name)
+        self.assertEqual(len(resized), 0)
+        resized.close()
+
+    def test_board_size_change_starts_empty(self):
+        """Test that a store of another board size is not reused"""
+        buffer = MemmapReplayBuffer(capacity=10, directory=self.tmp_dir.name)
+        buffer.add(np.zeros((4, 4)), 0, 1.0, np.zeros((4, 4)), False, 1)
+        buffer.close()
+        resized = MemmapReplayBuffer(capacity=10, directory=self.tmp_dir.name, board_size=5)
+        self.assertEqual(len(resized), 0)
+        resized.add(np.full((5, 5), 2), 0, 1.0, np.zeros((5, 5)), False, 1)
+        self.assertEqual(resized.sample(2)[0].shape, (2, 5, 5))
+        resized.close()
+
+class TestSumTree(unittest.TestCase):
+    """Test cases for the SumTree class"""
+
+    def test_total_and_find(self):
+        """Test prefix-sum search over the leaves"""
+        tree = SumTree(5)
+        tree.update(np.arange(5), [1.0, 2.0, 0.0, 3.0, 4.0])
+        self.assertEqual(tree.total, 10.0)
+        np.testing.assert_array_equal(tree.find([0.5, 1.0, 2.9, 3.0, 9.9]), [0, 1, 1, 3, 4])
+
+    def test_scalar_update(self):
+        """Test that single and batched updates agree"""
+        tree = SumTree(8)
+        tree.update(np.arange(8), np.ones(8))
+        tree.update([3], 5.0)
+        self.assertEqual(tree.total, 12.0)
+
+class TestPrioritizedReplayBuffer(unittest.TestCase):
+    """Test cases for the PrioritizedReplayBuffer class"""
+
+    def test_sampling_follows_priorities(self):
+        """Test that high-TD-error transitions dominate the samples"""
+        buffer = PrioritizedReplayBuffer(capacity=8, alpha=1.0, seed=0)
+        board = np.zeros((8, 4, 4), dtype=np.int64)
+        buffer.add_batch(board, np.zeros(8, dtype=int), np.arange(8), board, np.zeros(8, dtype=bool), np.ones(8, dtype=int))
+        buffer.update_priorities(np.arange(8), [0, 0, 0, 0, 0, 0, 0, 100.0])
+        batch, weights, indices = buffer.sample_with_weights(64)
+        self.assertGreater(np.mean(indices == 7), 0.95)
+        self.assertAlmostEqual(weights.max().item(), 1.0)
+        self.assertEqual(batch[2].shape, (64,))
+
+if __name__ == "__main__":
+    unittest.main()
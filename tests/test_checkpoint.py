@@ -0,0 +1,67 @@
+"""Unit tests for training checkpoints"""
+
+import os
+import random
+import tempfile
+import unittest
+import numpy as np
+import torch
+from src.agent.buffer import PrioritizedReplayBuffer
+from src.agent.checkpoint import (CheckpointWriter, atomic_save, capture_rng_state,
+                                  restore_rng_state, snapshot)
+
+class TestCheckpoint(unittest.TestCase):
+    """Test cases for checkpoint writing and restoring"""
+
+    def setUp(self):
+        """Set up test fixtures"""
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp_dir.name, "nested", "checkpoint.pt")
+
+    def tearDown(self):
+        """Remove temporary files"""
+        self.tmp_dir.cleanup()
+
+    def test_atomic_save(self):
+        """Test that the file is written without leaving a temp file behind"""
+        atomic_save({"value": torch.ones(3)}, self.path)
+        self.assertTrue(torch.equal(torch.load(self.path)["value"], torch.ones(3)))
+        self.assertFalse(os.path.exists(self.path + ".tmp"))
+
+    def test_snapshot_is_independent(self):
+        """Test that snapshots do not follow later in-place updates"""
+        weights = {"w": torch.zeros(2)}
+        copy = snapshot(weights)
+        weights["w"] += 1
+        self.assertTrue(torch.equal(copy["w"], torch.zeros(2)))
+
+    def test_writer_flushes_on_close(self):
+        """Test that close() waits for the background write"""
+        writer = CheckpointWriter()
+        writer.save({self.path: {"episode": 7}})
+        writer.close()
+        self.assertEqual(torch.load(self.path)["episode"], 7)
+        self.assertEqual(writer.writes, 1)
+
+    def test_rng_roundtrip(self):
+        """Test that restored RNG states replay the same draws"""
+        state = capture_rng_state()
+        expected = (random.random(), np.random.random(), torch.rand(1).item())
+        restore_rng_state(state)
+        self.assertEqual((random.random(), np.random.random(), torch.rand(1).item()), expected)
+
+    def test_buffer_roundtrip(self):
+        """Test restoring a prioritized buffer with its priorities"""
+        buffer = PrioritizedReplayBuffer(capacity=8, seed=0)
+        boards = np.ones((5, 4, 4), dtype=np.int64) * 2
+        buffer.add_batch(boards, np.arange(5) % 4, np.arange(5), boards, np.zeros(5, dtype=bool), np.ones(5, dtype=int))
+        buffer.update_priorities(np.arange(5), np.arange(5) + 1.0)
+
+        restored = PrioritizedReplayBuffer(capacity=8)
+        restored.load_state_dict(buffer.state_dict())
+        self.assertEqual(len(restored), 5)
+        self.assertEqual(restored.tree.total, buffer.tree.total)
+        np.testing.assert_array_equal(restored.sample_indices(16), buffer.sample_indices(16))
+
+if __name__ == "__main__":
+    unittest.main()
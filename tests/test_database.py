@@ -0,0 +1,80 @@
+"""Unit tests for the SQLite game store"""
+
+import json
+import tempfile
+import time
+import unittest
+from pathlib import Path
+from src.game.game import GameManager
+from src.storage import GameDatabase
+
+class TestGameDatabase(unittest.TestCase):
+    """Test cases for the GameDatabase class"""
+
+    def setUp(self):
+        """Set up test fixtures"""
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.database = GameDatabase(Path(self.tmp_dir.name) / "games.sqlite", batch_size=4)
+
+    def tearDown(self):
+        """Clean up test fixtures"""
+        self.database.close()
+        self.tmp_dir.cleanup()
+
+    def test_leaderboard_filters(self):
+        """Test ordering and the tile, time and agent filters"""
+        now = time.time()
+        self.database.add_games([
+            {"score": 20000, "max_tile": 2048, "moves": 900, "agent": "dqn", "finished_at": now},
+            {"score": 60000, "max_tile": 4096, "moves": 2500, "agent": "expectimax", "finished_at": now},
+            {"score": 70000, "max_tile": 4096, "moves": 2800, "agent": "expectimax",
+             "finished_at": now - 30 * 86400},
+            {"score": 3000, "max_tile": 256, "moves": 250},
+            {"score": 55000, "max_tile": 4096, "moves": 2400, "agent": "dqn", "finished_at": now},
+        ])
+        top = self.database.leaderboard(100, min_max_tile=4096, since=now - 7 * 86400)
+        self.assertEqual([game["score"] for game in top], [60000, 55000])
+        self.assertEqual(self.database.leaderboard(1, agent="dqn")[0]["score"], 55000)
+        self.assertEqual(self.database.best_score(), 70000)
+        statistics = {row["agent"]: row for row in self.database.statistics()}
+        self.assertEqual(statistics["expectimax"]["games"], 2)
+        self.assertEqual(statistics["human"]["win_rate"], 0.0)
+
+    def test_reopen_and_schema_version(self):
+        """Test that games persist and the schema is migrated once"""
+        self.database.add_game(score=100, max_tile=16, moves=12)
+        self.database.close()
+        self.database = GameDatabase(Path(self.tmp_dir.name) / "games.sqlite")
+        self.assertEqual(self.database.count(), 1)
+        version = self.database.connection.execute("PRAGMA user_version").fetchone()[0]
+        self.assertEqual(version, 1)
+
+    def test_import_json_saves(self):
+        """Test migrating JSON saves, skipping unreadable ones and repeats"""
+        save_dir = Path(self.tmp_dir.name) / "saves"
+        save_dir.mkdir()
+        manager = GameManager(seed=0)
+        manager.handle_move(manager.get_valid_moves()[0])
+        with open(save_dir / "autosave.json", "w") as f:
+            json.dump(manager.get_state(), f)
+        (save_dir / "broken.json").write_text("{")
+        self.assertEqual(self.database.import_json_saves(save_dir), 1)
+        self.assertEqual(self.database.import_json_saves(save_dir), 0)
+        game = self.database.leaderboard()[0]
+        self.assertEqual(game["score"], manager.board.score)
+        self.assertEqual(json.loads(game["final_grid"]), manager.get_board())
+
+    def test_game_manager_stores_finished_games(self):
+        """Test that GameManager stores each game once and reads its best score"""
+        manager = GameManager(seed=1, database=self.database, agent_id="random")
+        for _ in range(3):
+            while not manager.is_game_over:
+                manager.handle_move(manager.get_valid_moves()[0])
+            manager.start_new_game()
+        manager.start_new_game()
+        games = self.database.leaderboard(agent="random")
+        self.assertEqual(len(games), 3)
+        self.assertEqual(GameManager(database=self.database).best_score, games[0]["score"])
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,44 @@
+"""Unit tests for the expectimax search player"""
+
+import unittest
+from src.agent.expectimax import ExpectimaxAgent
+from src.game.bitboard import legal_moves_mask, pack
+from src.game.game import GameManager
+from src.utils.constants import DIRECTIONS
+
+class TestExpectimaxAgent(unittest.TestCase):
+    """Test cases for the ExpectimaxAgent class"""
+
+    def setUp(self):
+        """Set up test fixtures"""
+        self.agent = ExpectimaxAgent(time_budget_ms=20, max_depth=3)
+
+    def test_evaluate_prefers_open_boards(self):
+        """Test that the heuristic rewards empty cells"""
+        sparse = pack([[2, 0, 0, 0], [0, 0, 0, 0], [0, 0, 0, 0], [0, 0, 0, 0]])
+        crowded = pack([[2, 4, 2, 4], [4, 2, 4, 2], [2, 4, 2, 4], [0, 0, 0, 0]])
+        evaluate = self.agent.heuristic.evaluate_packed
+        self.assertGreater(evaluate(sparse), evaluate(crowded))
+
+    def test_best_action_is_legal(self):
+        """Test that the chosen move always changes the board"""
+        board = pack([[2, 4, 8, 16], [4, 8, 16, 32], [8, 16, 32, 64], [0, 0, 2, 0]])
+        action = self.agent.best_action(board)
+        self.assertTrue(legal_moves_mask(board) >> action & 1)
+        self.assertGreaterEqual(self.agent.last_depth, 1)
+
+    def test_single_legal_move(self):
+        """Test that a forced move is returned without searching"""
+        board = pack([[2, 4, 8, 16], [4, 8, 16, 32], [8, 16, 32, 64], [0, 0, 0, 0]])
+        self.assertEqual(DIRECTIONS[self.agent.best_action(board)], "down")
+        self.assertEqual(self.agent.last_depth, 0)
+
+    def test_select_move(self):
+        """Test playing a move through the GameManager interface"""
+        game_manager = GameManager()
+        move = self.agent.select_move(game_manager)
+        valid_moves = game_manager.get_valid_moves()
+        self.assertTrue(valid_moves[DIRECTIONS.index(move)])
+
+if __name__ == "__main__":
+    unittest.main()
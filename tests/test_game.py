@@ -2,6 +2,7 @@
 
 import unittest
 from src.game.game import GameManager
+from src.utils.helpers import spawn_generators
 
 class TestGameManager(unittest.TestCase):
     """Test cases for the GameManager class"""
@@ -36,5 +37,38 @@ class TestGameManager(unittest.TestCase):
         self.manager.handle_move("left")
         self.assertGreater(self.manager.board.move_count, initial_count)
 
+    def test_step_returns_valid_mask(self):
+        """Test that step returns the legal-move mask of the new state"""
+        self.manager.board.grid = [
+            [2, 2, 0, 0],
+            [0, 0, 0, 0],
+            [0, 0, 0, 0],
+            [0, 0, 0, 0]
+        ]
+        state, reward, done, valid_mask = self.manager.step("left")
+        self.assertFalse(done)
+        self.assertEqual(valid_mask, self.manager.get_valid_mask())
+        self.assertEqual(self.manager.get_valid_moves(),
+                         [bool(valid_mask >> i & 1) for i in range(4)])
+
+    def test_seed_replays_game(self):
+        """Test that a seed and the same moves reproduce a game on either engine"""
+        moves = ["left", "up", "right", "down"] * 25
+        grids = []
+        for engine in ["numpy", "bitboard", "bitboard"]:
+            manager = GameManager(engine=engine, seed=7)
+            for move in moves:
+                manager.handle_move(move)
+            grids.append((manager.board.get_grid(), manager.board.score))
+        self.assertEqual(grids[0], grids[1])
+        self.assertEqual(grids[1], grids[2])
+
+    def test_spawn_generators_are_independent(self):
+        """Test that split streams differ from each other but not across runs"""
+        first = [rng.random() for rng in spawn_generators(3, 4)]
+        second = [rng.random() for rng in spawn_generators(3, 4)]
+        self.assertEqual(first, second)
+        self.assertEqual(len(set(first)), 4)
+
 if __name__ == "__main__":
     unittest.main()
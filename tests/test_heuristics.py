@@ -0,0 +1,76 @@
+"""Unit tests for the table-driven heuristics"""
+
+import unittest
+import numpy as np
+from src.game.bitboard import pack
+from src.game.heuristics import SNAKE_WEIGHTS, Heuristic, get_term_tables, snake_weights
+
+def pack_row(cells) -> int:
+    """Pack four exponents into a row index"""
+    return sum(c << (4 * i) for i, c in enumerate(cells))
+
+class TestHeuristics(unittest.TestCase):
+    """Test cases for the Heuristic class"""
+
+    def setUp(self):
+        """Set up test fixtures"""
+        self.grid = np.array([
+            [1024, 512, 2, 0],
+            [64, 128, 0, 2],
+            [32, 0, 4, 0],
+            [2, 2, 0, 0]
+        ])
+
+    def test_term_tables(self):
+        """Test the raw terms of single rows"""
+        tables = get_term_tables()
+        row = pack_row([1, 0, 1, 1])
+        self.assertEqual(tables["empty"][row], 1)
+        self.assertEqual(tables["merges"][row], 3)
+        self.assertEqual(tables["smoothness"][pack_row([3, 1, 0, 2])], 3)
+        self.assertEqual(tables["monotonicity"][pack_row([4, 3, 2, 1])], 0)
+        self.assertGreater(tables["monotonicity"][pack_row([1, 4, 2, 3])], 0)
+
+    def test_matches_direct_formula(self):
+        """Test empty and snake terms against the direct computation"""
+        heuristic = Heuristic({"empty": 0.5, "snake": 0.01})
+        exponents = np.where(self.grid > 0, np.log2(np.maximum(self.grid, 1)), 0)
+        expected = 0.5 * np.sum(self.grid == 0) + 0.01 * np.sum(exponents * SNAKE_WEIGHTS)
+        self.assertAlmostEqual(heuristic.evaluate(self.grid), expected)
+
+    def test_packed_batch_and_grid_agree(self):
+        """Test that the three entry points give the same value"""
+        heuristic = Heuristic({"empty": 2.0, "merges": 1.0, "monotonicity": -0.5,
+                               "smoothness": -1.0, "sum": -0.1, "snake": 0.3}, constant=10.0)
+        rng = np.random.default_rng(0)
+        exponents = rng.integers(0, 12, size=(32, 4, 4))
+        values = heuristic.evaluate_batch(exponents)
+        for board, value in zip(exponents, values):
+            grid = np.where(board > 0, 2 ** board, 0)
+            self.assertAlmostEqual(heuristic.evaluate_packed(pack(grid)), value, places=6)
+            self.assertAlmostEqual(heuristic.evaluate(grid), value, places=6)
+
+    def test_unknown_term(self):
+        """Test that a misspelled term is rejected"""
+        with self.assertRaises(ValueError):
+            Heuristic({"emptiness": 1.0})
+
+    def test_sizes_without_tables(self):
+        """Test the snake weights and the direct evaluation against the tables"""
+        np.testing.assert_array_equal(snake_weights(4), np.log2([
+            [65536, 32768, 16384, 8192],
+            [512, 1024, 2048, 4096],
+            [256, 128, 64, 32],
+            [2, 4, 8, 16]
+        ]))
+        weights = {"empty": 2.0, "merges": 1.0, "monotonicity": -0.5, "smoothness": -1.0,
+                   "sum": -0.1, "snake": 0.3}
+        for size in (3, 4):
+            heuristic = Heuristic(weights, constant=10.0, size=size)
+            exponents = np.random.default_rng(size).integers(0, 12, size=(16, size, size))
+            np.testing.assert_allclose(heuristic.evaluate_batch(exponents),
+                                       10.0 + heuristic._evaluate_terms(exponents), rtol=1e-9)
+        self.assertIsNone(Heuristic(weights, size=6).row_tables)
+
+if __name__ == "__main__":
+    unittest.main()
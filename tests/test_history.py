@@ -0,0 +1,71 @@
+"""Unit tests for the undo/redo history"""
+
+import unittest
+import numpy as np
+from src.game.board import create_board
+from src.game.game import GameManager
+from src.game.history import GameHistory
+from src.utils.constants import DIRECTIONS
+
+def play(manager: GameManager, rng: np.random.Generator) -> bool:
+    """Play one random legal move; False once the game is over"""
+    legal = manager.get_valid_moves()
+    if not legal or manager.is_game_over:
+        return False
+    return manager.handle_move(legal[rng.integers(len(legal))])
+
+class TestGameHistory(unittest.TestCase):
+    """Test cases for the GameHistory class"""
+
+    def test_undo_redo_every_engine(self):
+        """Test that undo restores each earlier position and redo replays it"""
+        for engine, size in (("bitboard", 4), ("bitboard", 3), ("numpy", 4)):
+            manager = GameManager(engine=engine, seed=0, size=size)
+            rng = np.random.default_rng(1)
+            grids = [manager.board.grid.copy()]
+            scores = [manager.board.score]
+            while len(grids) < 8 and play(manager, rng):
+                grids.append(manager.board.grid.copy())
+                scores.append(manager.board.score)
+
+            for grid, score in zip(grids[-2::-1], scores[-2::-1]):
+                self.assertTrue(manager.undo())
+                np.testing.assert_array_equal(manager.board.grid, grid)
+                self.assertEqual(manager.board.score, score)
+            self.assertFalse(manager.undo())
+            self.assertEqual(manager.board.move_count, 0)
+
+            for grid in grids[1:]:
+                self.assertTrue(manager.redo())
+                np.testing.assert_array_equal(manager.board.grid, grid)
+            self.assertFalse(manager.redo())
+
+    def test_branch_replays_spawns(self):
+        """Test that replaying a move after undo spawns the same tile"""
+        manager = GameManager(engine="bitboard", seed=3)
+        direction = manager.get_valid_moves()[0]
+        manager.handle_move(direction)
+        after = manager.board.grid.copy()
+        manager.undo()
+        manager.handle_move(direction)
+        np.testing.assert_array_equal(manager.board.grid, after)
+        self.assertFalse(manager.redo())
+
+    def test_capacity_keeps_latest(self):
+        """Test that a full ring drops the oldest snapshots"""
+        board = create_board("bitboard", seed=0)
+        history = GameHistory(3, board)
+        states = [board.state]
+        for direction in DIRECTIONS * 3:
+            if board.move(direction):
+                history.record(board)
+                states.append(board.state)
+        self.assertEqual(len(history), 3)
+        while history.undo(board):
+            pass
+        self.assertEqual(board.state, states[-3])
+        with self.assertRaises(IndexError):
+            history.seek(board, history.start - 1)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,75 @@
+"""Unit tests for the n-tuple network agent"""
+
+import os
+import tempfile
+import unittest
+import numpy as np
+from src.agent.ntuple import NTupleAgent, NTupleNetwork, unpack_exponents
+from src.game.bitboard import pack
+from src.game.game import GameManager
+from src.utils.constants import DIRECTIONS
+
+PATTERNS = [(0, 1, 2, 3), (4, 5, 6, 7)]
+
+class TestNTupleNetwork(unittest.TestCase):
+    """Test cases for the NTupleNetwork class"""
+
+    def setUp(self):
+        """Set up test fixtures"""
+        self.network = NTupleNetwork(PATTERNS)
+        self.board = unpack_exponents([pack([[2, 4, 0, 0], [0, 8, 0, 0], [0, 0, 16, 0], [0, 0, 0, 2]])])
+
+    def test_unpack_exponents(self):
+        """Test unpacking packed boards to flat exponents"""
+        np.testing.assert_array_equal(self.board[0, :4], [1, 2, 0, 0])
+        self.assertEqual(self.board[0, 10], 4)
+
+    def test_symmetric_boards_share_values(self):
+        """Test that a rotated board gets the same value"""
+        self.network.td_update(self.board, [10.0], learning_rate=0.5)
+        rotated = np.rot90(self.board.reshape(4, 4)).reshape(1, 16)
+        self.assertAlmostEqual(self.network.value(rotated)[0], self.network.value(self.board)[0], places=5)
+
+    def test_td_update_moves_towards_target(self):
+        """Test that the learning rate is the fraction of error removed"""
+        network = NTupleNetwork(PATTERNS, symmetric=False)
+        errors = network.td_update(self.board, [10.0], learning_rate=0.5)
+        self.assertAlmostEqual(errors[0], 10.0)
+        self.assertAlmostEqual(network.value(self.board)[0], 5.0, places=4)
+
+    def test_invalid_pattern(self):
+        """Test that repeated or out-of-range cells are rejected"""
+        with self.assertRaises(ValueError):
+            NTupleNetwork([(0, 0, 1)])
+        with self.assertRaises(ValueError):
+            NTupleNetwork([(0, 16)])
+
+    def test_save_and_load(self):
+        """Test that tables round-trip through the binary file"""
+        self.network.td_update(self.board, [3.0], learning_rate=1.0)
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = os.path.join(tmp_dir, "ntuple.npz")
+            self.network.save(path)
+            loaded = NTupleNetwork.load(path)
+        self.assertEqual(loaded.patterns, PATTERNS)
+        self.assertTrue(loaded.symmetric)
+        self.assertEqual(loaded.value(self.board)[0], self.network.value(self.board)[0])
+
+class TestNTupleAgent(unittest.TestCase):
+    """Test cases for the NTupleAgent class"""
+
+    def test_train_and_play(self):
+        """Test a short training run and a legal greedy move"""
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            agent = NTupleAgent(NTupleNetwork(PATTERNS), learning_rate=0.1)
+            agent.table_path = os.path.join(tmp_dir, "ntuple.npz")
+            scores = agent.train(episodes=4, num_envs=4, seed=0, report_freq=4)
+            self.assertGreaterEqual(len(scores), 4)
+            self.assertTrue(os.path.exists(agent.table_path))
+
+        game_manager = GameManager()
+        move = agent.select_move(game_manager)
+        self.assertTrue(game_manager.get_valid_moves()[DIRECTIONS.index(move)])
+
+if __name__ == "__main__":
+    unittest.main()
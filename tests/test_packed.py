@@ -0,0 +1,55 @@
+"""Unit tests for the NxN packed engine"""
+
+import unittest
+import numpy as np
+from src.game.board import Board, create_board
+from src.game.bitboard import BitBoard, get_tables
+from src.game.packed import PackedBoard, can_slide_left, get_size_tables, slide_rows_left
+from src.utils.constants import DIRECTIONS
+
+class TestPackedBoard(unittest.TestCase):
+    """Test cases for PackedBoard and the per-size row tables"""
+
+    def test_tables_match_bitboard(self):
+        """Test that the size-4 tables equal the 64-bit engine's"""
+        tables = get_tables()
+        size_tables = get_size_tables(4)
+        np.testing.assert_array_equal(size_tables["left"], tables["left_np"])
+        np.testing.assert_array_equal(size_tables["right"], tables["right_np"])
+        np.testing.assert_array_equal(size_tables["score"], tables["score_np"])
+        np.testing.assert_array_equal(size_tables["can_left"], tables["can_left_np"])
+
+    def test_slide_rows_left(self):
+        """Test the vectorized slide on a few rows"""
+        rows = np.array([[1, 1, 1, 0, 1], [2, 0, 2, 3, 3], [0, 0, 0, 0, 0]], dtype=np.uint8)
+        slid, gains, merge_log = slide_rows_left(rows)
+        np.testing.assert_array_equal(slid, [[2, 2, 0, 0, 0], [3, 4, 0, 0, 0], [0, 0, 0, 0, 0]])
+        self.assertEqual(gains.tolist(), [8, 24, 0])
+        self.assertEqual(merge_log.tolist(), [4, 7, 0])
+        self.assertEqual(can_slide_left(rows).tolist(), [True, True, False])
+
+    def test_seeded_games_match_numpy_board(self):
+        """Test that a seed replays the same 3x3 and 5x5 games on both engines"""
+        for size in (3, 5):
+            rng = np.random.default_rng(size)
+            reference = Board(size, seed=7)
+            packed = PackedBoard(size, seed=7)
+            np.testing.assert_array_equal(packed.grid, reference.grid)
+            while not reference.is_game_over():
+                direction = DIRECTIONS[rng.integers(4)]
+                self.assertEqual(packed.move(direction), reference.move(direction))
+                np.testing.assert_array_equal(packed.grid, reference.grid)
+                self.assertEqual(packed.score, reference.score)
+                self.assertEqual(sorted(packed.merged_values), sorted(reference.merged_values))
+            self.assertTrue(packed.is_game_over())
+
+    def test_create_board_by_size(self):
+        """Test the engine picked for each size"""
+        self.assertIsInstance(create_board("bitboard", 4), BitBoard)
+        self.assertIsInstance(create_board("bitboard", 3), PackedBoard)
+        board = create_board("bitboard", 6)
+        self.assertIsInstance(board, Board)
+        self.assertEqual(board.grid.shape, (6, 6))
+
+if __name__ == "__main__":
+    unittest.main()
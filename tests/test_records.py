@@ -0,0 +1,84 @@
+"""Unit tests for the binary game records"""
+
+import tempfile
+import unittest
+from pathlib import Path
+import numpy as np
+from src.game.board import create_board
+from src.storage import GameRecorder, RecordReader, RecordWriter, SaveManager, replay
+from src.storage.records import pack_actions, unpack_actions
+from src.utils.constants import DIRECTIONS
+
+def play_recorded(engine: str, seed: int, size: int = 4, keyframe_interval: int = 16):
+    """Play a random game to the end, recording it"""
+    board = create_board(engine, size, seed=seed)
+    recorder = GameRecorder(board, keyframe_interval)
+    rng = np.random.default_rng(seed)
+    while not board.is_game_over():
+        direction = DIRECTIONS[rng.integers(4)]
+        if board.move(direction):
+            recorder.record(direction)
+    return board, recorder.finish()
+
+class TestGameRecords(unittest.TestCase):
+    """Test cases for the record format, reader, writer and replay"""
+
+    def setUp(self):
+        """Set up test fixtures"""
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.path = Path(self.tmp_dir.name) / "games.g2048"
+
+    def tearDown(self):
+        """Clean up test fixtures"""
+        self.tmp_dir.cleanup()
+
+    def test_action_packing(self):
+        """Test the 2-bit action stream round-trip"""
+        actions = np.random.default_rng(0).integers(0, 4, size=37).astype(np.uint8)
+        packed = pack_actions(actions)
+        self.assertEqual(len(packed), 10)
+        np.testing.assert_array_equal(unpack_actions(packed, 37), actions)
+
+    def test_replay_and_seek(self):
+        """Test rebuilding the final and intermediate positions from a file"""
+        board, record = play_recorded("bitboard", seed=1)
+        with RecordWriter(self.path) as writer:
+            writer.write(record)
+        loaded = RecordReader(self.path)[0]
+        final = replay(loaded)
+        np.testing.assert_array_equal(final.grid, board.grid)
+        self.assertEqual(final.score, board.score)
+        self.assertEqual(loaded.final_score, board.score)
+
+        middle = replay(loaded, 21)
+        self.assertEqual(middle.move_count, 21)
+        for direction in np.array(DIRECTIONS)[loaded.actions[21:]]:
+            self.assertTrue(middle.move(direction))
+        np.testing.assert_array_equal(middle.grid, board.grid)
+
+    def test_streaming_many_games(self):
+        """Test appending across writers and streaming every record back"""
+        records = [play_recorded("numpy", seed, size=3)[1] for seed in range(5)]
+        with RecordWriter(self.path) as writer:
+            writer.write_many(records[:3])
+        with RecordWriter(self.path) as writer:
+            writer.write_many(records[3:])
+        reader = RecordReader(self.path)
+        self.assertEqual(len(reader), 5)
+        for original, loaded in zip(records, reader):
+            np.testing.assert_array_equal(loaded.actions, original.actions)
+            self.assertEqual(replay(loaded).score, original.final_score)
+
+    def test_save_manager_lists_records(self):
+        """Test that SaveManager writes, lists and loads archives beside JSON saves"""
+        manager = SaveManager(self.tmp_dir.name)
+        manager.save_game({"score": 4})
+        _, record = play_recorded("bitboard", seed=2)
+        self.assertTrue(manager.save_records([record]))
+        self.assertEqual(manager.get_record_files(), ["games.g2048"])
+        self.assertEqual(manager.get_save_files(), ["autosave.json"])
+        self.assertEqual(len(manager.load_record("games.g2048", 0)), len(record))
+        self.assertEqual(len(list(manager.load_records())), 1)
+
+if __name__ == "__main__":
+    unittest.main()
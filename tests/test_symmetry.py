@@ -0,0 +1,82 @@
+"""Unit tests for board symmetries and canonicalization"""
+
+import unittest
+import numpy as np
+from src.game.bitboard import move_packed, pack, unpack
+from src.game.symmetry import (ACTION_MAPS, INVERSE_ACTION_MAPS, canonical_key, canonicalize,
+                               canonicalize_batch, symmetries, transform_batch, transform_moves)
+from src.utils.constants import DIRECTIONS
+
+def random_exponents(rng: np.random.Generator, n: int) -> np.ndarray:
+    """Build n random (4, 4) exponent boards"""
+    return rng.integers(0, 8, size=(n, 4, 4)).astype(np.uint8)
+
+def to_packed(exponents: np.ndarray) -> int:
+    """Pack one exponent board"""
+    return sum(int(e) << (4 * i) for i, e in enumerate(exponents.ravel()))
+
+class TestSymmetry(unittest.TestCase):
+    """Test cases for the symmetry helpers"""
+
+    def setUp(self):
+        """Set up test fixtures"""
+        self.grid = np.array([
+            [2, 4, 0, 0],
+            [0, 8, 0, 0],
+            [0, 0, 16, 0],
+            [0, 0, 0, 32]
+        ])
+
+    def test_images_are_rotations_and_reflections(self):
+        """Test that the eight images are exactly the dihedral group"""
+        expected = [np.rot90(g, k) for g in (self.grid, self.grid.T) for k in range(4)]
+        images = [unpack(image) for image in symmetries(pack(self.grid))]
+        for grid in expected:
+            self.assertTrue(any(np.array_equal(grid, image) for image in images))
+
+    def test_action_maps_commute_with_moves(self):
+        """Test that moving then transforming equals transforming then moving the mapped way"""
+        for exponents in random_exponents(np.random.default_rng(0), 50):
+            board = to_packed(exponents)
+            images = symmetries(board)
+            for g in range(8):
+                for a, direction in enumerate(DIRECTIONS):
+                    moved = symmetries(move_packed(board, direction)[0])[g]
+                    self.assertEqual(moved, move_packed(images[g], DIRECTIONS[ACTION_MAPS[g, a]])[0])
+                    self.assertEqual(INVERSE_ACTION_MAPS[g, ACTION_MAPS[g, a]], a)
+
+    def test_canonical_form_is_shared(self):
+        """Test that every image has the same canonical form"""
+        canonical, _ = canonicalize(pack(self.grid))
+        for image in symmetries(pack(self.grid)):
+            self.assertEqual(canonical_key(image), canonical)
+        grid, g = canonicalize(self.grid)
+        self.assertEqual(pack(grid), canonical)
+        self.assertEqual(symmetries(pack(self.grid))[g], canonical)
+
+    def test_batch_matches_single(self):
+        """Test the vectorized canonicalization against the packed one"""
+        boards = random_exponents(np.random.default_rng(1), 64)
+        canonical, symmetry = canonicalize_batch(boards)
+        for i, exponents in enumerate(boards):
+            expected, g = canonicalize(to_packed(exponents))
+            self.assertEqual(to_packed(canonical[i]), expected)
+            self.assertEqual(symmetry[i], g)
+        np.testing.assert_array_equal(transform_batch(boards, symmetry), canonical)
+
+    def test_transform_moves(self):
+        """Test permuting per-direction values into each board's frame"""
+        moves = np.array([[True, False, False, False]] * 8)
+        transformed = transform_moves(moves, np.arange(8))
+        np.testing.assert_array_equal(transformed.argmax(axis=1), ACTION_MAPS[:, 0])
+
+    def test_transform_other_sizes(self):
+        """Test that 3x3 permutations match NumPy reflections and rotations"""
+        boards = np.arange(9).reshape(1, 3, 3)
+        expected = [boards[0], boards[0][:, ::-1], boards[0][::-1], np.rot90(boards[0], 2)]
+        expected += [image.T for image in expected]
+        for g, image in enumerate(expected):
+            np.testing.assert_array_equal(transform_batch(boards, np.array([g]))[0], image)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,8 +1,25 @@
-from src.agent.agent import G2048Agent
+import argparse
 
+from src.agent.agent import G2048Agent, training_config
+from src.agent.ntuple import NTupleAgent
 
-# Create agent instance
-agent = G2048Agent()
 
-# Train the model
-agent.train_model()
\ No newline at end of file
+parser = argparse.ArgumentParser(description="Train the 2048 agent")
+parser.add_argument("--resume", action="store_true",
+                    help="Continue from training.checkpoint_path instead of starting over")
+parser.add_argument("--agent", choices=["dqn", "ntuple"], default="dqn",
+                    help="Learner to train: the Q2048 network or the n-tuple tables")
+args = parser.parse_args()
+
+if args.agent == "ntuple":
+    # Continues from ntuple.table_path when it exists
+    NTupleAgent().train()
+else:
+    # Create agent instance
+    agent = G2048Agent()
+
+    # Train the model (actor/learner processes or the serial loop)
+    if training_config.get('actor_learner', False):
+        agent.train_parallel()
+    else:
+        agent.train_model(resume=args.resume)